@@ -0,0 +1,186 @@
+"""
+Módulo de teste de carga do servidor de inferência (inference.server).
+
+As requisições são disparadas em uma taxa fixa (open-loop), independente das respostas: a
+latência de cada uma é medida a partir do instante em que deveria ter sido enviada, então
+as filas formadas quando o servidor não acompanha a taxa aparecem nos percentis, em vez de
+apenas reduzirem a vazão (coordinated omission).
+
+Uso (a partir de src/):
+    python -m benchmark.load_test --rate 200 --seconds 30 --connections 64 --output load.json
+"""
+
+import argparse
+import asyncio
+import collections
+import json
+import logging
+import tempfile
+import time
+from typing import Any, Counter, Dict, List, Optional
+
+import numpy as np
+from benchmark.pipeline_benchmark import make_synthetic_audio
+
+async def _send(
+    connections: asyncio.Queue,
+    host: str,
+    port: int,
+    request: bytes
+) -> int:
+    """
+    Envia uma requisição por uma conexão keep-alive livre e lê a resposta.
+
+    :return: O status HTTP da resposta.
+    """
+    reader, writer = await connections.get()
+
+    try:
+        if reader is None:
+            reader, writer = await asyncio.open_connection(host, port)
+
+        writer.write(request)
+        status = int((await reader.readline()).split()[1])
+
+        length = 0
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            if name.strip().lower() == 'content-length':
+                length = int(value)
+
+        await reader.readexactly(length)
+        connections.put_nowait((reader, writer))
+        return status
+    except (ConnectionError, asyncio.IncompleteReadError, IndexError):
+        if writer is not None:
+            writer.close()
+        # A conexão é reaberta na próxima requisição
+        connections.put_nowait((None, None))
+        raise
+
+async def run_load(
+    host: str,
+    port: int,
+    bodies: List[bytes],
+    rate: float,
+    seconds: float,
+    connections: int = 64
+) -> Dict[str, Any]:
+    """
+    Dispara requisições POST /predict na taxa indicada e mede as latências.
+
+    :param host: Endereço do servidor.
+    :param port: Porta do servidor.
+    :param bodies: Corpos (arquivos WAV) enviados em rodízio.
+    :param rate: Requisições por segundo.
+    :param seconds: Duração do teste.
+    :param connections: Número máximo de conexões keep-alive simultâneas.
+    :return: Relatório com os percentis de latência, a vazão atingida e os status recebidos.
+    """
+    pool: asyncio.Queue = asyncio.Queue()
+    for _ in range(connections):
+        pool.put_nowait((None, None))
+
+    requests = [
+        (
+            'POST /predict HTTP/1.1\r\n'
+            f'Host: {host}:{port}\r\n'
+            'Content-Type: audio/wav\r\n'
+            f'Content-Length: {len(body)}\r\n\r\n'
+        ).encode('latin-1') + body
+        for body in bodies
+    ]
+
+    latencies: List[float] = []
+    statuses: Counter[str] = collections.Counter()
+
+    async def fire(scheduled: float, request: bytes) -> None:
+        try:
+            status = str(await _send(pool, host, port, request))
+        except (OSError, asyncio.IncompleteReadError, IndexError) as e:
+            status = type(e).__name__
+        statuses[status] += 1
+        if status == '200':
+            latencies.append(time.perf_counter() - scheduled)
+
+    total = int(rate * seconds)
+    tasks = []
+    started = time.perf_counter()
+
+    for i in range(total):
+        scheduled = started + i / rate
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.create_task(fire(scheduled, requests[i % len(requests)])))
+
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - started
+
+    while not pool.empty():
+        _, writer = pool.get_nowait()
+        if writer is not None:
+            writer.close()
+
+    latencies_ms = np.array(latencies) * 1000 if latencies else np.zeros(1)
+    return {
+        'target_rps': rate,
+        'achieved_rps': len(latencies) / elapsed,
+        'requests': total,
+        'statuses': dict(statuses),
+        'latency_ms': {
+            'p50': float(np.percentile(latencies_ms, 50)),
+            'p95': float(np.percentile(latencies_ms, 95)),
+            'p99': float(np.percentile(latencies_ms, 99)),
+            'max': float(latencies_ms.max()),
+        },
+    }
+
+def main(argv: Optional[List[str]] = None) -> Dict[str, Any]:
+    """
+    Ponto de entrada do teste de carga.
+    """
+    parser = argparse.ArgumentParser(description='Teste de carga do servidor de inferência.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--rate', type=float, default=100.0, help='Requisições por segundo.')
+    parser.add_argument('--seconds', type=float, default=10.0, help='Duração do teste.')
+    parser.add_argument('--connections', type=int, default=64, help='Conexões keep-alive simultâneas.')
+    parser.add_argument('--duration', type=float, default=4.0, help='Duração de cada áudio, em segundos.')
+    parser.add_argument('--count', type=int, default=16, help='Número de áudios sintéticos distintos.')
+    parser.add_argument('--output', default=None, help='Arquivo JSON de saída.')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        bodies = []
+        for path in make_synthetic_audio(workdir, args.count, args.duration):
+            with open(path, 'rb') as f:
+                bodies.append(f.read())
+
+    report = asyncio.run(run_load(args.host, args.port, bodies, args.rate, args.seconds, args.connections))
+
+    logging.info(
+        'Vazão %.1f/%.1f req/s  p50 %.1f ms  p95 %.1f ms  p99 %.1f ms  máx %.1f ms  status %s',
+        report['achieved_rps'],
+        report['target_rps'],
+        report['latency_ms']['p50'],
+        report['latency_ms']['p95'],
+        report['latency_ms']['p99'],
+        report['latency_ms']['max'],
+        report['statuses']
+    )
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        logging.info('Resultados gravados em %s.', args.output)
+
+    return report
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,384 @@
+"""
+Módulo de benchmark do pipeline completo, do download ao forward/backward do modelo,
+usando áudios sintéticos.
+
+Cada etapa é medida separadamente (vazão, percentis de latência e pico de memória) e o
+resultado é gravado em JSON, para comparar execuções de commits diferentes.
+
+Uso (a partir de src/):
+    python -m benchmark.pipeline_benchmark --count 64 --duration 4 --output bench.json
+    python -m benchmark.pipeline_benchmark --baseline bench.json
+"""
+
+import argparse
+import functools
+import http.server
+import json
+import logging
+import os
+import platform
+import subprocess
+import tarfile
+import tempfile
+import threading
+import time
+from dataclasses import asdict
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+import numpy as np
+import soundfile as sf
+import torch
+import torch.nn as nn
+from torch.utils.data import DataLoader
+from midi.midi_converter import MidiConverter
+from controller.wav_controller import WavController
+from data.downloader import ResumableDownloader
+from data.spectogram_dataset import SpectrogramDataset
+from model.cnn import build_model
+from telemetry.stage_timing import StageResult, measure
+
+STAGES = ('download', 'extract', 'decode', 'stft', 'getitem', 'collate', 'forward_backward')
+
+def make_synthetic_audio(
+    output_dir: str,
+    count: int,
+    duration: float,
+    sample_rate: int = 16000,
+    seed: int = 0
+) -> List[str]:
+    """
+    Gera arquivos .wav com tons harmônicos em notas MIDI aleatórias, nomeados
+    no mesmo padrão do NSynth ('<instrumento>-<pitch>-<velocidade>.wav').
+
+    :param output_dir: Diretório onde os arquivos serão gravados.
+    :param count: Número de arquivos.
+    :param duration: Duração de cada arquivo, em segundos.
+    :param sample_rate: Taxa de amostragem.
+    :param seed: Semente do gerador aleatório.
+    :return: Lista dos caminhos gerados.
+    """
+    rng = np.random.default_rng(seed)
+    time_axis = np.arange(int(duration * sample_rate)) / sample_rate
+    envelope = np.exp(-time_axis * 2.0)
+    paths = []
+
+    os.makedirs(output_dir, exist_ok=True)
+
+    for i in range(count):
+        midi = int(rng.integers(21, 109))
+        frequency = 440.0 * 2 ** ((midi - 69) / 12)
+        waveform = sum(
+            np.sin(2 * np.pi * frequency * harmonic * time_axis) / harmonic for harmonic in range(1, 5)
+        ) * envelope * 0.3
+        waveform += rng.normal(0, 0.01, len(time_axis))
+
+        path = os.path.join(output_dir, f'synthetic_{i:05d}-{midi:03d}-100.wav')
+        sf.write(path, waveform.astype(np.float32), sample_rate)
+        paths.append(path)
+
+    return paths
+
+class _QuietHandler(http.server.SimpleHTTPRequestHandler):
+    """
+    Handler HTTP sem log de cada requisição.
+    """
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        pass
+
+class PipelineBenchmark:
+    """
+    Classe responsável por executar o benchmark de todas as etapas do pipeline.
+
+    As etapas rodam na ordem do pipeline real e cada uma consome a saída da anterior:
+    o arquivo .tar.gz é servido por um servidor HTTP local, baixado, extraído, decodificado
+    e convertido em espectrogramas, que alimentam o dataset, o DataLoader e o modelo.
+    """
+
+    def __init__(
+        self,
+        count: int = 64,
+        duration: float = 4.0,
+        batch_size: int = 16,
+        architecture: str = 'pooled',
+        sample_rate: int = 16000,
+        repeats: int = 3,
+        trace_memory: bool = True
+    ) -> None:
+        """
+        Instancia um novo objeto PipelineBenchmark.
+
+        :param count: Número de áudios sintéticos.
+        :param duration: Duração de cada áudio, em segundos.
+        :param batch_size: Tamanho do lote no DataLoader e no modelo.
+        :param architecture: Arquitetura do modelo (ver model.cnn.MODEL_ARCHITECTURES).
+        :param sample_rate: Taxa de amostragem dos áudios.
+        :param repeats: Número de repetições das etapas de download e extração.
+        :param trace_memory: Se True, mede o pico de memória de cada etapa.
+        """
+        self.count = count
+        self.duration = duration
+        self.batch_size = batch_size
+        self.architecture = architecture
+        self.sample_rate = sample_rate
+        self.repeats = repeats
+        self.trace_memory = trace_memory
+        self.wav_controller = WavController(MidiConverter())
+
+    def run(self, stages: Iterable[str] = STAGES) -> Dict[str, Any]:
+        """
+        Executa o benchmark.
+
+        :param stages: Etapas a serem reportadas. As etapas anteriores necessárias
+            para produzir as entradas são executadas mesmo quando não reportadas.
+        :return: Relatório com o ambiente, a configuração e o resultado de cada etapa.
+        """
+        stages = set(stages)
+        unknown = stages - set(STAGES)
+        if unknown:
+            raise ValueError(f'Etapas desconhecidas: {sorted(unknown)}. Use {STAGES}.')
+
+        results: List[StageResult] = []
+
+        with tempfile.TemporaryDirectory() as workdir:
+            archive_path = self.__make_archive(workdir)
+
+            results.append(self.__bench_download(workdir, archive_path))
+            results.append(self.__bench_extract(workdir, archive_path))
+
+            files = sorted(
+                os.path.join(root, name)
+                for root, _, names in os.walk(os.path.join(workdir, 'extracted'))
+                for name in names if name.endswith('.wav')
+            )
+            contents = []
+            for path in files:
+                with open(path, 'rb') as f:
+                    contents.append(f.read())
+
+            waveforms = []
+            results.append(self.__measure(
+                'decode',
+                lambda data: waveforms.append(self.wav_controller.decode_audio(data)),
+                contents,
+                unit='áudio'
+            ))
+
+            # A primeira chamada do librosa compila funções (numba) e não representa o regime normal
+            self.wav_controller.compute_spectrogram(waveforms[0])
+
+            dataset = SpectrogramDataset()
+            labels = [self.wav_controller.extract_pitch_from_filename(path) for path in files]
+            results.append(self.__measure(
+                'stft',
+                lambda item: dataset.add_sample(self.wav_controller.compute_spectrogram(item[0]), item[1]),
+                zip(waveforms, labels),
+                unit='áudio'
+            ))
+
+        results.append(self.__measure('getitem', dataset.__getitem__, range(len(dataset)), unit='amostra'))
+
+        loader = DataLoader(dataset, batch_size=self.batch_size, shuffle=False)
+        batches = []
+        results.append(self.__measure('collate', batches.append, loader, unit='lote'))
+
+        results.append(self.__bench_forward_backward(batches))
+
+        return {
+            'environment': self.environment(),
+            'config': {
+                'count': self.count,
+                'duration': self.duration,
+                'batch_size': self.batch_size,
+                'architecture': self.architecture,
+                'sample_rate': self.sample_rate,
+                'repeats': self.repeats,
+                'feature_params': self.wav_controller.feature_params(),
+            },
+            'stages': {result.name: asdict(result) for result in results if result.name in stages},
+        }
+
+    @staticmethod
+    def environment() -> Dict[str, Any]:
+        """
+        Retorna os dados do ambiente da execução, para contextualizar a comparação entre resultados.
+        """
+        try:
+            commit = subprocess.run(
+                ['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True, timeout=10
+            ).stdout.strip()
+        except (OSError, subprocess.SubprocessError):
+            commit = None
+
+        return {
+            'commit': commit,
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'python': platform.python_version(),
+            'torch': torch.__version__,
+            'numpy': np.__version__,
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'torch_threads': torch.get_num_threads(),
+        }
+
+    def __measure(self, name: str, func: Callable[[Any], Any], items: Iterable[Any], unit: str) -> StageResult:
+        """
+        Atalho para measure com a configuração de memória do benchmark.
+        """
+        return measure(name, func, items, unit=unit, trace_memory=self.trace_memory)
+
+    def __make_archive(self, workdir: str) -> str:
+        """
+        Gera os áudios sintéticos e os compacta em um .tar.gz, como o dataset original.
+        """
+        audio_dir = os.path.join(workdir, 'source', 'audio')
+        make_synthetic_audio(audio_dir, self.count, self.duration, self.sample_rate)
+
+        archive_path = os.path.join(workdir, 'synthetic.tar.gz')
+        with tarfile.open(archive_path, 'w:gz') as tar:
+            tar.add(audio_dir, arcname='synthetic/audio')
+
+        return archive_path
+
+    def __bench_download(self, workdir: str, archive_path: str) -> StageResult:
+        """
+        Baixa o arquivo de um servidor HTTP local, medindo cada download completo.
+        """
+        handler = functools.partial(_QuietHandler, directory=os.path.dirname(archive_path))
+        server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+
+        url = f'http://127.0.0.1:{server.server_address[1]}/{os.path.basename(archive_path)}'
+        downloader = ResumableDownloader()
+        target = os.path.join(workdir, 'downloaded.tar.gz')
+
+        def download(_):
+            downloader.download(url, target)
+            os.remove(target)
+
+        try:
+            # O downloader registra o progresso em INFO, o que distorceria as medições
+            level = logging.getLogger().level
+            logging.getLogger().setLevel(max(level, logging.WARNING))
+            try:
+                result = self.__measure('download', download, range(self.repeats), unit='arquivo')
+            finally:
+                logging.getLogger().setLevel(level)
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        size_mb = os.path.getsize(archive_path) / 1024 ** 2
+        result.extra = {'size_mb': size_mb, 'mb_per_second': size_mb * result.throughput}
+        return result
+
+    def __bench_extract(self, workdir: str, archive_path: str) -> StageResult:
+        """
+        Descompacta o arquivo, medindo cada extração completa.
+        """
+        target = os.path.join(workdir, 'extracted')
+
+        def extract(_):
+            with tarfile.open(archive_path) as tar:
+                tar.extractall(target)
+
+        result = self.__measure('extract', extract, range(self.repeats), unit='arquivo')
+        result.extra = {'files_per_second': self.count * result.throughput}
+        return result
+
+    def __bench_forward_backward(self, batches: List[Any]) -> StageResult:
+        """
+        Executa um passo de treinamento (forward, backward e otimizador) por lote.
+        """
+        spectrogram = batches[0][0]
+        kwargs = {'input_shape': tuple(spectrogram.shape[-2:])} if self.architecture == 'flatten' else {}
+        model = build_model(self.architecture, **kwargs)
+        model.train()
+
+        criterion = nn.MSELoss()
+        optimizer = torch.optim.Adam(model.parameters(), lr=0.001)
+
+        def step(batch):
+            inputs, labels = batch[0], batch[1]
+            optimizer.zero_grad()
+            loss = criterion(model(inputs).squeeze(1), labels.float())
+            loss.backward()
+            optimizer.step()
+
+        # Aquecimento, para não medir alocações e inicializações da primeira execução
+        step(batches[0])
+
+        result = self.__measure('forward_backward', step, batches, unit='lote')
+        result.extra = {'samples_per_second': result.throughput * self.batch_size}
+        return result
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any]) -> Dict[str, Dict[str, float]]:
+    """
+    Compara dois relatórios, retornando a variação percentual da vazão e do p95 de cada etapa.
+
+    :param current: Relatório atual.
+    :param baseline: Relatório de referência.
+    :return: Variações por etapa (positivo em throughput = mais rápido; positivo em p95 = mais lento).
+    """
+    deltas = {}
+
+    for name, stage in current['stages'].items():
+        reference = baseline['stages'].get(name)
+        if reference is None:
+            continue
+
+        def change(new: float, old: float) -> float:
+            return (new - old) / old * 100 if old else 0.0
+
+        deltas[name] = {
+            'throughput_pct': change(stage['throughput'], reference['throughput']),
+            'p95_pct': change(stage['latency_ms']['p95'], reference['latency_ms']['p95']),
+        }
+        logging.info(
+            '%-16s vazão %+7.1f%%  p95 %+7.1f%%',
+            name,
+            deltas[name]['throughput_pct'],
+            deltas[name]['p95_pct']
+        )
+
+    return deltas
+
+def main(argv: Optional[List[str]] = None) -> Dict[str, Any]:
+    """
+    Ponto de entrada do benchmark.
+    """
+    parser = argparse.ArgumentParser(description='Benchmark do pipeline com áudios sintéticos.')
+    parser.add_argument('--count', type=int, default=64, help='Número de áudios sintéticos.')
+    parser.add_argument('--duration', type=float, default=4.0, help='Duração de cada áudio, em segundos.')
+    parser.add_argument('--batch-size', type=int, default=16)
+    parser.add_argument('--architecture', default='pooled', help='Arquitetura do modelo.')
+    parser.add_argument('--repeats', type=int, default=3, help='Repetições do download e da extração.')
+    parser.add_argument('--stages', nargs='+', default=list(STAGES), choices=STAGES)
+    parser.add_argument('--no-memory', action='store_true', help='Desativa o tracemalloc (menos overhead).')
+    parser.add_argument('--output', default='benchmark_results.json', help='Arquivo JSON de saída.')
+    parser.add_argument('--baseline', default=None, help='Relatório anterior para comparação.')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+
+    report = PipelineBenchmark(
+        count=args.count,
+        duration=args.duration,
+        batch_size=args.batch_size,
+        architecture=args.architecture,
+        repeats=args.repeats,
+        trace_memory=not args.no_memory
+    ).run(args.stages)
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            report['comparison'] = compare(report, json.load(f))
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+
+    logging.info('Resultados gravados em %s.', args.output)
+    return report
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,161 @@
+"""
+Módulo para extrair os espectrogramas de vários áudios em paralelo.
+"""
+
+import collections
+import itertools
+import logging
+import multiprocessing
+import os
+import time
+from typing import Any, Dict, Iterable, Optional, Sequence, Tuple
+
+import numpy as np
+from tqdm import tqdm
+from controller.wav_controller import WavController
+from data.spectogram_dataset import SpectrogramDataset
+from telemetry.instrumentation import NULL_INSTRUMENTATION, Instrumentation
+
+# Estado de cada processo do pool, preenchido pelo initializer
+_worker_state: Dict[str, Any] = {}
+
+def _init_worker(wav_controller: WavController, source: Optional[Sequence], dtype: str) -> None:
+    """
+    Inicializa um processo do pool com o WavController e a fonte dos dados.
+    """
+    _worker_state['wav_controller'] = wav_controller
+    _worker_state['source'] = source
+    _worker_state['dtype'] = np.dtype(dtype)
+
+def _extract(task: Any) -> Tuple[np.ndarray, float, bool, float]:
+    """
+    Decodifica o áudio e calcula o espectrograma de um item.
+    A tarefa é um índice da fonte (quando ela é indexável) ou o próprio item.
+    """
+    started = time.perf_counter()
+    wav_controller = _worker_state['wav_controller']
+    source = _worker_state['source']
+    item = source[task] if source is not None else task
+
+    cache = wav_controller.feature_cache
+    hits = cache.hits if cache is not None else 0
+
+    spectrogram, label = wav_controller.load_wav(item['audio'])
+    cached = cache is not None and cache.hits > hits
+
+    # A conversão é feita no worker, para que o array volte ao processo pai uma única vez
+    spectrogram = np.ascontiguousarray(spectrogram, dtype=_worker_state['dtype'])
+    return spectrogram, label, cached, time.perf_counter() - started
+
+class FeatureExtractor:
+    """
+    Classe responsável por distribuir a decodificação e a STFT de vários áudios
+    entre um pool de processos, mantendo a ordem original dos itens.
+    """
+
+    def __init__(
+        self,
+        wav_controller: WavController,
+        num_workers: Optional[int] = None,
+        chunk_size: int = 16,
+        dtype: str = 'float32',
+        instrumentation: Optional[Instrumentation] = None
+    ) -> None:
+        """
+        Instancia um novo objeto FeatureExtractor.
+
+        :param wav_controller: WavController usado para calcular os espectrogramas.
+        :param num_workers: Número de processos. Por padrão, usa todos os núcleos disponíveis.
+        :param chunk_size: Número de itens enviados de uma vez para cada processo.
+        :param dtype: Tipo dos espectrogramas retornados.
+        :param instrumentation: Métricas do tempo de extração por áudio (opcional).
+        """
+        if chunk_size < 1:
+            raise ValueError('O chunk_size deve ser maior que zero.')
+
+        self.wav_controller = wav_controller
+        self.num_workers = num_workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self.dtype = dtype
+        self.instrumentation = instrumentation or NULL_INSTRUMENTATION
+
+    def extract(
+        self,
+        items: Iterable[Dict[str, Any]],
+        dataset: Optional[SpectrogramDataset] = None
+    ) -> SpectrogramDataset:
+        """
+        Calcula os espectrogramas de todos os itens e os adiciona ao dataset.
+
+        Quando os itens são indexáveis (ex. um split do Hugging Face), apenas os índices
+        são enviados aos processos, que decodificam o áudio por conta própria.
+
+        :param items: Itens contendo a chave 'audio' no formato esperado por WavController.load_wav.
+        :param dataset: Dataset que receberá as amostras. Se None, um novo é criado.
+        :return: O dataset preenchido, na mesma ordem dos itens.
+        """
+        if dataset is None:
+            dataset = SpectrogramDataset()
+
+        indexable = hasattr(items, '__getitem__') and hasattr(items, '__len__')
+        total = len(items) if hasattr(items, '__len__') else None
+
+        source = items if indexable else None
+        tasks = range(total) if indexable else items
+
+        cache = self.wav_controller.feature_cache
+        metrics = self.instrumentation
+
+        with tqdm(total=total, unit='áudio', desc='Extraindo features') as pbar:
+            for spectrogram, label, cached, seconds in self.__run(tasks, source):
+                dataset.add_sample(spectrogram, label)
+
+                # Tempo medido dentro do worker: decodificação + STFT (ou leitura do cache) de um áudio
+                metrics.observe('feature_extraction', seconds)
+                metrics.increment('feature_cache_hits' if cached else 'features_computed')
+
+                if cache is not None and self.num_workers > 1:
+                    # Os contadores do cache de cada processo são agregados no processo pai
+                    cache.hits += int(cached)
+                    cache.misses += int(not cached)
+
+                pbar.update(1)
+
+        logging.info('Features de %s áudios extraídas com %s processos.', len(dataset), self.num_workers)
+        metrics.record_memory()
+        metrics.flush(stage='feature_extraction')
+        return dataset
+
+    def __run(self, tasks: Iterable[Any], source: Optional[Sequence]):
+        """
+        Executa a extração, usando o pool de processos apenas quando há mais de um worker.
+        """
+        if self.num_workers <= 1:
+            _init_worker(self.wav_controller, source, self.dtype)
+            yield from map(_extract, tasks)
+            return
+
+        with multiprocessing.Pool(
+            processes=self.num_workers,
+            initializer=_init_worker,
+            initargs=(self.wav_controller, source, self.dtype)
+        ) as pool:
+            # imap preserva a ordem dos itens, mantendo a saída determinística
+            if source is not None:
+                yield from pool.imap(_extract, tasks, chunksize=self.chunk_size)
+                return
+
+            # Itens não indexáveis carregam o próprio áudio: um número limitado de tarefas fica em
+            # andamento, para que o pool não consuma o iterável inteiro para a memória de uma vez.
+            # Uma nova tarefa é enviada a cada resultado entregue, então os workers não ficam
+            # ociosos esperando o fim de uma janela
+            iterator = iter(tasks)
+            max_pending = self.num_workers * self.chunk_size * 4
+            pending = collections.deque(
+                pool.apply_async(_extract, (task,)) for task in itertools.islice(iterator, max_pending)
+            )
+            while pending:
+                result = pending.popleft().get()
+                for task in itertools.islice(iterator, 1):
+                    pending.append(pool.apply_async(_extract, (task,)))
+                yield result
@@ -2,14 +2,27 @@
 Módulo para obter os dados de áudio a serem utilizados.
 """
 
+import io
 import logging
 import os
-from typing import Tuple, Dict, Any
+from typing import Tuple, Dict, Any, Optional
 
 import numpy as np
 import librosa
 import librosa.display
+import soundfile as sf
 from midi.midi_converter import MidiConverter
+from data.feature_cache import FeatureCache
+
+# Tipos de espectrograma: 'stft' (linear, n_fft // 2 + 1 frequências), 'mel' e 'cqt' (n_bins faixas)
+FEATURE_TYPES = ('stft', 'mel', 'cqt')
+
+# Número padrão de faixas de cada tipo compacto. A CQT cobre, com uma faixa por semitom,
+# as 88 notas do piano a partir de MIN_MIDI (A0)
+DEFAULT_BINS = {'mel': 128, 'cqt': 88}
+MIN_MIDI = 21
+
+SUPPORTED_DTYPES = ('float32', 'float16')
 
 class WavController:
     """
@@ -19,28 +32,185 @@ class WavController:
 
     def __init__(
         self,
-        midi_converter: MidiConverter
+        midi_converter: MidiConverter,
+        n_fft: int = 2048,
+        hop_length: int = 512,
+        top_db: Optional[float] = 80.0,
+        feature_cache: Optional[FeatureCache] = None,
+        feature_type: str = 'stft',
+        n_bins: Optional[int] = None,
+        bins_per_octave: int = 12,
+        sample_rate: int = 16000,
+        dtype: str = 'float32'
     ) -> None:
         """
         Instancia um novo objeto WavController.
-        :param file_paths: Lista de caminhos de arquivos de áudio.
         :param midi_converter: Instância de MidiConverter para converter pitches em notas musicais.
-        :param save_path: Caminho para salvar os espectrogramas e notas (opcional).
+        :param n_fft: Tamanho da janela da STFT.
+        :param hop_length: Número de amostras entre janelas consecutivas da STFT.
+        :param top_db: Limite inferior (em dB abaixo do pico) do espectrograma.
+        :param feature_cache: Cache em disco dos espectrogramas já calculados (opcional).
+        :param feature_type: Tipo de espectrograma: 'stft', 'mel' ou 'cqt'.
+        :param n_bins: Número de faixas dos espectrogramas mel e CQT. Por padrão, 128 (mel) ou 88 (CQT).
+        :param bins_per_octave: Faixas por oitava da CQT.
+        :param sample_rate: Taxa de amostragem dos áudios, usada pelos espectrogramas mel e CQT.
+        :param dtype: Tipo dos espectrogramas gerados ('float32' ou 'float16').
         """
+        if feature_type not in FEATURE_TYPES:
+            raise ValueError(f'Tipo de feature {feature_type} inválido. Use um de {FEATURE_TYPES}.')
+
+        if dtype not in SUPPORTED_DTYPES:
+            raise ValueError(f'Tipo {dtype} não suportado. Use um de {SUPPORTED_DTYPES}.')
+
         self.midi_converter = midi_converter
+        self.n_fft = n_fft
+        self.hop_length = hop_length
+        self.top_db = top_db
+        self.feature_cache = feature_cache
+        self.feature_type = feature_type
+        self.n_bins = n_bins or DEFAULT_BINS.get(feature_type)
+        self.bins_per_octave = bins_per_octave
+        self.sample_rate = sample_rate
+        self.dtype = np.dtype(dtype)
+        self.fmin = float(self.midi_converter.midi_to_frequency(MIN_MIDI))
+
+        # Filtros mel calculados uma única vez
+        self._mel_basis = None
+        if feature_type == 'mel':
+            self._mel_basis = librosa.filters.mel(
+                sr=sample_rate,
+                n_fft=n_fft,
+                n_mels=self.n_bins,
+                dtype=np.float32
+            )
+
+    def feature_params(self) -> Dict[str, Any]:
+        """
+        Retorna os parâmetros que definem o espectrograma gerado.
+        Qualquer mudança nesses valores invalida o cache de features.
+        :return: Dicionário com os parâmetros de extração.
+        """
+        params = {
+            'n_fft': self.n_fft,
+            'hop_length': self.hop_length,
+            'top_db': self.top_db,
+            'ref': 'max',
+        }
+
+        # Os parâmetros novos só entram quando diferem do padrão, para não invalidar os caches existentes
+        if self.feature_type != 'stft':
+            params.update({
+                'feature_type': self.feature_type,
+                'n_bins': self.n_bins,
+                'sample_rate': self.sample_rate,
+            })
+
+        if self.feature_type == 'cqt':
+            params.update({'bins_per_octave': self.bins_per_octave, 'fmin': self.fmin})
+
+        if self.dtype != np.float32:
+            params['dtype'] = self.dtype.name
+
+        return params
+
+    def feature_shape(self, num_samples: int) -> Tuple[int, int]:
+        """
+        Retorna o formato do espectrograma de um áudio, sem calculá-lo.
+        :param num_samples: Número de amostras do áudio.
+        :return: Número de frequências (ou faixas) e de frames.
+        """
+        n_freqs = self.n_fft // 2 + 1 if self.feature_type == 'stft' else self.n_bins
+        return n_freqs, 1 + num_samples // self.hop_length
 
     def load_wav(self, audio_data: Dict[str, Any]) -> Tuple[np.ndarray, int]:
         """
         Método responsável por carregar arquivos de áudio .wav 
-        Ou carregar espectrogramas e notas salvas.
-        :param regenerate: Se True, regera os dados, mesmo que existam salvos.
+        Ou carregar espectrogramas salvos no cache de features.
+        :param audio_data: Dicionário com o caminho ('path') e as amostras ('array') do áudio,
+            ou o conteúdo do arquivo ainda codificado ('bytes').
+        :return: Espectrograma e pitch do áudio.
         """
         pitch = self.extract_pitch_from_filename(audio_data['path'])
 
-        stft = librosa.stft(audio_data['array'], n_fft=2048, hop_length=512)
-        spectrogram = librosa.amplitude_to_db(np.abs(stft), ref=np.max)
+        if audio_data.get('array') is not None:
+            waveform = audio_data['array']
+        else:
+            waveform = self.decode_audio(audio_data['bytes'])
+
+        if self.feature_cache is not None:
+            params = self.feature_params()
+            spectrogram = self.feature_cache.get(waveform, params)
+
+            if spectrogram is None:
+                spectrogram = self.compute_spectrogram(waveform)
+                self.feature_cache.put(waveform, params, spectrogram)
+
+            return spectrogram, pitch
+
+        return self.compute_spectrogram(waveform), pitch
+
+    def decode_audio(self, audio_bytes: bytes) -> np.ndarray:
+        """
+        Decodifica o conteúdo de um arquivo de áudio em memória.
+        :param audio_bytes: Conteúdo do arquivo (ex. .wav).
+        :return: Array mono com as amostras do áudio, na taxa de amostragem do controller.
+        """
+        waveform, sample_rate = sf.read(io.BytesIO(audio_bytes), dtype='float32', always_2d=True)
+        waveform = waveform.mean(axis=1)
+
+        # Arquivos em outra taxa gerariam features com frequências e durações erradas
+        if sample_rate != self.sample_rate:
+            logging.debug('Reamostrando áudio de %s Hz para %s Hz.', sample_rate, self.sample_rate)
+            waveform = librosa.resample(waveform, orig_sr=sample_rate, target_sr=self.sample_rate)
+
+        return waveform
+
+    def compute_spectrogram(self, waveform: np.ndarray) -> np.ndarray:
+        """
+        Calcula o espectrograma (em dB) de um áudio, no tipo configurado.
+        :param waveform: Array com as amostras do áudio.
+        :return: Espectrograma do áudio.
+        """
+        # Em float32 a STFT sai em complex64, metade da memória de um áudio em float64
+        waveform = np.asarray(waveform, dtype=np.float32)
+
+        if self.feature_type == 'cqt':
+            magnitude = np.abs(librosa.cqt(
+                waveform,
+                sr=self.sample_rate,
+                hop_length=self.hop_length,
+                fmin=self.fmin,
+                n_bins=self.n_bins,
+                bins_per_octave=self.bins_per_octave
+            ))
+        else:
+            magnitude = np.abs(librosa.stft(waveform, n_fft=self.n_fft, hop_length=self.hop_length))
+
+            if self._mel_basis is not None:
+                magnitude = self._mel_basis @ magnitude
+
+        return self.amplitude_to_db(magnitude).astype(self.dtype, copy=False)
+
+    def amplitude_to_db(self, magnitude: np.ndarray, amin: float = 1e-5) -> np.ndarray:
+        """
+        Converte a magnitude em dB relativos ao pico, sobrescrevendo o próprio array.
+        Equivale a librosa.amplitude_to_db(magnitude, ref=np.max, top_db=top_db), sem os
+        arrays temporários do tamanho do espectrograma.
+        :param magnitude: Magnitude do espectrograma (float32), alterada in-place.
+        :param amin: Amplitude mínima, para evitar log de zero.
+        :return: O mesmo array, em dB.
+        """
+        ref_db = 20.0 * np.log10(max(float(magnitude.max(initial=0.0)), amin))
+
+        np.maximum(magnitude, amin, out=magnitude)
+        np.log10(magnitude, out=magnitude)
+        magnitude *= 20.0
+        magnitude -= ref_db
+
+        if self.top_db is not None:
+            np.maximum(magnitude, magnitude.max(initial=-np.inf) - self.top_db, out=magnitude)
 
-        return spectrogram, pitch
+        return magnitude
 
     def extract_pitch_from_filename(self, file_path: str) -> float:
         """
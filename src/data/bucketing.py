@@ -0,0 +1,201 @@
+"""
+Módulo para agrupar espectrogramas de durações parecidas no mesmo lote,
+preenchendo apenas até o maior espectrograma de cada lote.
+"""
+
+import random
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+import torch
+from torch.utils.data import Sampler
+
+def padding_stats(lengths: Sequence[int], batches: Sequence[Sequence[int]]) -> Dict[str, float]:
+    """
+    Calcula o desperdício de padding de uma divisão em lotes.
+
+    :param lengths: Número de frames de cada amostra.
+    :param batches: Lotes, como listas de índices das amostras.
+    :return: Frames reais, frames após o padding e fração desperdiçada.
+    """
+    real_frames = 0
+    padded_frames = 0
+
+    for batch in batches:
+        batch_lengths = [lengths[idx] for idx in batch]
+        real_frames += sum(batch_lengths)
+        padded_frames += max(batch_lengths, default=0) * len(batch_lengths)
+
+    return {
+        'real_frames': real_frames,
+        'padded_frames': padded_frames,
+        'waste_ratio': 1 - real_frames / padded_frames if padded_frames else 0.0,
+    }
+
+class BucketBatchSampler(Sampler[List[int]]):
+    """
+    Batch sampler que agrupa as amostras por número de frames.
+
+    As amostras são ordenadas pela duração e divididas em buckets contíguos. Os lotes são
+    formados dentro de cada bucket e a ordem dos lotes é embaralhada a cada época.
+    No treinamento distribuído, cada processo recebe uma fatia dos lotes da época.
+    """
+
+    def __init__(
+        self,
+        lengths: Sequence[int],
+        batch_size: int,
+        num_buckets: int = 10,
+        shuffle: bool = True,
+        drop_last: bool = False,
+        seed: int = 0,
+        num_replicas: int = 1,
+        rank: int = 0
+    ) -> None:
+        """
+        Instancia um novo objeto BucketBatchSampler.
+
+        :param lengths: Número de frames de cada amostra do dataset.
+        :param batch_size: Número de amostras por lote.
+        :param num_buckets: Número de buckets de duração.
+        :param shuffle: Se True, embaralha as amostras dentro dos buckets e a ordem dos lotes.
+        :param drop_last: Se True, descarta o último lote incompleto de cada bucket.
+        :param seed: Semente do embaralhamento.
+        :param num_replicas: Número de processos do treinamento distribuído.
+        :param rank: Índice do processo atual.
+        """
+        super().__init__()
+
+        if batch_size < 1 or num_buckets < 1:
+            raise ValueError('batch_size e num_buckets devem ser maiores que zero.')
+
+        if not 0 <= rank < num_replicas:
+            raise ValueError(f'Rank {rank} inválido para {num_replicas} processos.')
+
+        self.lengths = list(lengths)
+        self.batch_size = batch_size
+        self.num_buckets = num_buckets
+        self.shuffle = shuffle
+        self.drop_last = drop_last
+        self.seed = seed
+        self.num_replicas = num_replicas
+        self.rank = rank
+        self.epoch = 0
+
+    def set_epoch(self, epoch: int) -> None:
+        """
+        Define a época atual, para que cada época tenha uma ordem diferente.
+
+        :param epoch: Número da época.
+        """
+        self.epoch = epoch
+
+    def batches(self) -> List[List[int]]:
+        """
+        Retorna os lotes da época atual do processo.
+        :return: Lista de lotes, cada um com os índices das amostras.
+        """
+        batches = self.__all_batches()
+
+        if self.num_replicas > 1:
+            # Todos os processos precisam do mesmo número de lotes (cada passo faz um all-reduce):
+            # os primeiros lotes são repetidos para completar, como no DistributedSampler
+            padding = -len(batches) % self.num_replicas
+            batches = (batches + batches[:padding])[self.rank::self.num_replicas]
+
+        return batches
+
+    def __all_batches(self) -> List[List[int]]:
+        """
+        Retorna os lotes da época atual, de todos os processos.
+        """
+        rng = random.Random(self.seed + self.epoch)
+
+        indices = list(range(len(self.lengths)))
+        if self.shuffle:
+            # Desempata amostras de mesma duração de forma aleatória
+            rng.shuffle(indices)
+        indices.sort(key=lambda idx: self.lengths[idx])
+
+        bucket_size = -(-len(indices) // self.num_buckets)
+        batches = []
+
+        for start in range(0, len(indices), bucket_size):
+            bucket = indices[start:start + bucket_size]
+            if self.shuffle:
+                rng.shuffle(bucket)
+
+            for batch_start in range(0, len(bucket), self.batch_size):
+                batch = bucket[batch_start:batch_start + self.batch_size]
+                if len(batch) < self.batch_size and self.drop_last:
+                    continue
+                batches.append(batch)
+
+        if self.shuffle:
+            rng.shuffle(batches)
+
+        return batches
+
+    def padding_stats(self) -> Dict[str, float]:
+        """
+        Compara o desperdício de padding dos lotes da época atual com o de lotes aleatórios.
+        :return: Estatísticas dos lotes por bucket e dos lotes aleatórios ('naive_*').
+        """
+        rng = random.Random(self.seed + self.epoch)
+        indices = list(range(len(self.lengths)))
+        rng.shuffle(indices)
+        naive = [indices[i:i + self.batch_size] for i in range(0, len(indices), self.batch_size)]
+
+        stats = padding_stats(self.lengths, self.__all_batches())
+        stats.update({f'naive_{key}': value for key, value in padding_stats(self.lengths, naive).items()})
+        return stats
+
+    def __iter__(self) -> Iterator[List[int]]:
+        return iter(self.batches())
+
+    def __len__(self) -> int:
+        bucket_size = -(-len(self.lengths) // self.num_buckets)
+        total = 0
+
+        for start in range(0, len(self.lengths), bucket_size):
+            size = min(bucket_size, len(self.lengths) - start)
+            total += size // self.batch_size if self.drop_last else -(-size // self.batch_size)
+
+        return -(-total // self.num_replicas)
+
+class PadCollate:
+    """
+    Função de collate que preenche os espectrogramas até o maior frame do lote
+    e gera a máscara dos frames válidos.
+    """
+
+    def __init__(self, pad_value: float = -80.0) -> None:
+        """
+        Instancia um novo objeto PadCollate.
+
+        :param pad_value: Valor usado no padding. O padrão é o piso do espectrograma em dB (silêncio).
+        """
+        self.pad_value = pad_value
+
+    def __call__(
+        self,
+        batch: Sequence[Tuple[torch.Tensor, torch.Tensor]]
+    ) -> Tuple[torch.Tensor, torch.Tensor, torch.Tensor]:
+        """
+        Junta as amostras em um lote.
+
+        :param batch: Lista de (espectrograma (1, frequências, frames), rótulo).
+        :return: Espectrogramas (lote, 1, frequências, max_frames), rótulos e máscara (lote, max_frames).
+        """
+        spectrograms, labels = zip(*batch)
+        lengths = torch.tensor([spectrogram.shape[-1] for spectrogram in spectrograms])
+        max_length = int(lengths.max())
+
+        # Preenche um único tensor pré-alocado, sem criar uma cópia com padding de cada amostra
+        first = spectrograms[0]
+        padded = first.new_full((len(spectrograms), *first.shape[:-1], max_length), self.pad_value)
+        for i, spectrogram in enumerate(spectrograms):
+            padded[i, ..., :spectrogram.shape[-1]] = spectrogram
+
+        mask = torch.arange(max_length).unsqueeze(0) < lengths.unsqueeze(1)
+
+        return padded, torch.stack(labels), mask
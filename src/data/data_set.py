@@ -7,10 +7,13 @@ E vamos fazer a obtenção dos dados por um link de download
 import logging
 import tarfile
 import os
-from typing import List
+from typing import List, Optional
 
 import requests
-from tqdm import tqdm
+from data.downloader import ChecksumError, ResumableDownloader, verify_checksum
+from data.memmap_dataset import MemmapSpectrogramDataset
+from data.tar_ingest import TarIngestor
+from controller.feature_extractor import FeatureExtractor
 from repositories.huggingface_repository import HugginfaceRepository
 from datasets import Dataset
 
@@ -23,16 +26,25 @@ class DataSet:
         self,
         data_set_url: str,
         hub_repo: HugginfaceRepository,
-        update_dataset: bool = False
+        update_dataset: bool = False,
+        streaming: bool = False,
+        checksum: Optional[str] = None,
+        download_segments: int = 4
     ) -> None:
         """
         Instancia um novo objeto DataSet.
 
         :param data_set_url: URL do dataset a ser utilizado.
         :param train: Se True, carrega o dataset de treinamento, caso contrário, o de dataset de teste.
+        :param streaming: Se True, o dataset do Hugging Face é carregado em modo streaming.
+        :param checksum: Checksum esperado do arquivo baixado ('<algoritmo>:<hex>'), opcional.
+        :param download_segments: Número de segmentos baixados em paralelo.
         """
         self.hub_repository = hub_repo
         self.update_dataset = update_dataset
+        self.streaming = streaming
+        self.checksum = checksum
+        self.download_segments = download_segments
 
         if not data_set_url:
             raise ValueError('O link do dataset não pode ser vazio.')
@@ -55,12 +67,15 @@ class DataSet:
         logging.info('Obtendo dataset...')
 
         if not self.update_dataset and self.hub_repository.check_existing_datasets(self.type_data):
-            return self.hub_repository.get_dataset_from_huggingface(self.type_data)
+            return self.hub_repository.get_dataset_from_huggingface(
+                self.type_data,
+                streaming=self.streaming
+            )
         else:
             if os.path.exists(self.audios_path):
                 logging.info('Dataset já existe.')
 
-            elif os.path.exists(self.file_path):
+            elif os.path.exists(self.file_path) and self.__verify_download():
                 logging.info('Dataset já existe.')
                 self.__uncompress_data_set()
 
@@ -75,38 +90,84 @@ class DataSet:
                 private=False
             )
 
-    def __download_data_set(self) -> None:
+    def ingest_features(
+        self,
+        feature_extractor: FeatureExtractor,
+        storage_path: str,
+        dtype: str = 'float32'
+    ) -> MemmapSpectrogramDataset:
+        """
+        Método responsável por gerar os espectrogramas direto do arquivo .tar.gz,
+        sem descompactar os áudios no disco nem passar pelo Hugging Face.
+        Se o armazenamento já existe e foi gerado com os mesmos parâmetros de extração, ele é reaberto.
+
+        :param feature_extractor: FeatureExtractor usado para calcular os espectrogramas.
+        :param storage_path: Diretório do armazenamento dos espectrogramas.
+        :param dtype: Tipo usado para armazenar os espectrogramas.
+        :return O dataset com os espectrogramas.
+        """
+        if not self.update_dataset and os.path.exists(os.path.join(storage_path, TarIngestor.MEMBERS_FILE)):
+            feature_params = feature_extractor.wav_controller.feature_params()
+
+            if MemmapSpectrogramDataset.is_compatible(storage_path, feature_params, dtype):
+                logging.info('Features já extraídas em %s.', storage_path)
+                return MemmapSpectrogramDataset.open(storage_path)
+
+            logging.info('Features em %s geradas com outros parâmetros, extraindo novamente.', storage_path)
+
+        if not (os.path.exists(self.file_path) and self.__verify_download()):
+            self.__download_data_set(uncompress=False)
+
+        return TarIngestor(feature_extractor).ingest(self.file_path, storage_path, dtype=dtype)
+
+    def __download_data_set(self, uncompress: bool = True) -> None:
         """
         Método responsável por fazer o download do dataset com barra de progresso.
+
+        :param uncompress: Se True, descompacta o dataset depois do download.
         """
         logging.info('Baixando dataset...')
 
         os.makedirs(self.download_path, exist_ok=True)
 
         try:
-            with requests.get(self.download_url, stream=True, timeout=60) as r:
-                r.raise_for_status()
-                total_size = int(r.headers.get('content-length', 0))  # Obtém o tamanho do arquivo
-                block_size = 8192  # Tamanho do chunk (8KB)
-
-                with open(self.file_path, 'wb') as f, tqdm(
-                    total=total_size, unit='iB', unit_scale=True, desc=self.file_path
-                ) as pbar:
-                    for chunk in r.iter_content(chunk_size=block_size):
-                        f.write(chunk)
-                        pbar.update(len(chunk))
+            ResumableDownloader(num_segments=self.download_segments).download(
+                self.download_url,
+                self.file_path,
+                checksum=self.checksum
+            )
 
             logging.info('Dataset baixado com sucesso no caminho: %s', self.file_path)
-            self.__uncompress_data_set()
+
+            if uncompress:
+                self.__uncompress_data_set()
 
         except requests.HTTPError as e:
             logging.error(
                 'Erro ao baixar dataset. Status code: %s. Message %s',
-                e.response.status_code,
-                e.response.text
+                e.response.status_code if e.response is not None else None,
+                e.response.text if e.response is not None else e
             )
             raise
 
+    def __verify_download(self) -> bool:
+        """
+        Método responsável por verificar o checksum de um arquivo já baixado.
+        Um arquivo corrompido é removido para ser baixado novamente.
+
+        :return True se o arquivo é válido (ou se não há checksum configurado).
+        """
+        if not self.checksum:
+            return True
+
+        try:
+            verify_checksum(self.file_path, self.checksum)
+            return True
+        except ChecksumError as e:
+            logging.warning('%s Baixando novamente.', e)
+            os.remove(self.file_path)
+            return False
+
     def __uncompress_data_set(self) -> None:
         """
         Método responsável por descompactar o dataset.
@@ -0,0 +1,364 @@
+"""
+Módulo para baixar arquivos grandes com retomada, download paralelo em segmentos
+e verificação de integridade.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+import requests
+import urllib3
+from tqdm import tqdm
+
+RETRYABLE_ERRORS = (
+    requests.ConnectionError,
+    requests.Timeout,
+    requests.exceptions.ChunkedEncodingError,
+    # Erros levantados ao ler response.raw diretamente
+    urllib3.exceptions.ProtocolError,
+    urllib3.exceptions.ReadTimeoutError,
+)
+
+RETRYABLE_STATUS = {408, 429, 500, 502, 503, 504}
+
+# Pede o conteúdo sem compressão: com Content-Encoding, os offsets do Range se referem aos
+# bytes codificados e não às posições do arquivo
+IDENTITY_ENCODING = {'Accept-Encoding': 'identity'}
+
+class ChecksumError(ValueError):
+    """
+    Erro lançado quando o arquivo baixado não corresponde ao checksum esperado.
+    """
+
+def file_checksum(file_path: str, algorithm: str = 'sha256', block_size: int = 8 * 1024 ** 2) -> str:
+    """
+    Calcula o checksum de um arquivo, lendo-o em blocos.
+
+    :param file_path: Caminho do arquivo.
+    :param algorithm: Algoritmo do hashlib (ex. 'sha256', 'md5').
+    :param block_size: Tamanho de cada bloco lido.
+    :return: O checksum em hexadecimal.
+    """
+    hasher = hashlib.new(algorithm)
+
+    with open(file_path, 'rb') as f:
+        while block := f.read(block_size):
+            hasher.update(block)
+
+    return hasher.hexdigest()
+
+def verify_checksum(file_path: str, checksum: str) -> None:
+    """
+    Verifica o checksum de um arquivo.
+
+    :param file_path: Caminho do arquivo.
+    :param checksum: Checksum esperado, no formato '<algoritmo>:<hex>' ou apenas '<hex>' (sha256).
+    """
+    algorithm, _, expected = checksum.rpartition(':')
+    algorithm = algorithm or 'sha256'
+
+    actual = file_checksum(file_path, algorithm)
+
+    if actual.lower() != expected.lower():
+        raise ChecksumError(
+            f'Checksum inválido para {file_path}: esperado {algorithm}:{expected}, obtido {actual}.'
+        )
+
+    logging.info('Checksum %s de %s verificado.', algorithm, file_path)
+
+class ResumableDownloader:
+    """
+    Classe responsável por baixar arquivos com suporte a HTTP Range.
+
+    Quando o servidor aceita Range, o arquivo é dividido em segmentos baixados em paralelo.
+    O progresso de cada segmento é salvo em um arquivo de estado, de modo que um download
+    interrompido continua de onde parou. Erros de rede são repetidos com backoff exponencial.
+    """
+
+    def __init__(
+        self,
+        session: Optional[requests.Session] = None,
+        num_segments: int = 4,
+        max_retries: int = 5,
+        backoff: float = 1.0,
+        timeout: float = 60.0
+    ) -> None:
+        """
+        Instancia um novo objeto ResumableDownloader.
+
+        :param session: Sessão HTTP a ser usada (permite testes com servidores locais).
+        :param num_segments: Número de segmentos baixados em paralelo.
+        :param max_retries: Número máximo de tentativas por segmento.
+        :param backoff: Espera inicial entre tentativas, em segundos (dobrada a cada falha).
+        :param timeout: Timeout de cada requisição, em segundos.
+        """
+        self.session = session or requests.Session()
+        self.num_segments = max(1, num_segments)
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.timeout = timeout
+
+        # Limites do tamanho adaptativo dos chunks
+        self.min_chunk_size = 64 * 1024
+        self.max_chunk_size = 8 * 1024 ** 2
+
+        self._lock = threading.Lock()
+
+    def download(self, url: str, file_path: str, checksum: Optional[str] = None) -> str:
+        """
+        Baixa um arquivo, retomando um download anterior quando possível.
+
+        O conteúdo é gravado em '<file_path>.part' e só é renomeado para file_path
+        depois de completo e com o checksum verificado.
+
+        :param url: URL do arquivo.
+        :param file_path: Caminho final do arquivo.
+        :param checksum: Checksum esperado ('<algoritmo>:<hex>'), opcional.
+        :return: O caminho do arquivo baixado.
+        """
+        part_path = f'{file_path}.part'
+        state_path = f'{file_path}.state.json'
+
+        total_size, accepts_ranges = self.__probe(url)
+
+        if total_size is None or not accepts_ranges:
+            logging.info('Servidor não suporta Range, baixando em um único segmento.')
+            segments = [{'start': 0, 'end': None, 'done': 0}]
+            for path in (part_path, state_path):
+                if os.path.exists(path):
+                    os.remove(path)
+        else:
+            segments = None
+            if os.path.exists(part_path):
+                segments = self.__load_state(state_path, total_size)
+            segments = segments or self.__split(total_size)
+            self.__prepare_file(part_path, total_size)
+
+        downloaded = sum(segment['done'] for segment in segments)
+
+        with tqdm(
+            total=total_size, initial=downloaded, unit='iB', unit_scale=True, desc=file_path
+        ) as pbar:
+            def run(segment: Dict[str, Any]) -> None:
+                self.__download_segment(url, part_path, segment, segments, state_path, pbar)
+
+            with ThreadPoolExecutor(max_workers=len(segments)) as executor:
+                # list() propaga a exceção de qualquer segmento
+                list(executor.map(run, segments))
+
+        if checksum:
+            try:
+                verify_checksum(part_path, checksum)
+            except ChecksumError:
+                # Um arquivo corrompido não deve ser retomado na próxima tentativa
+                os.remove(part_path)
+                if os.path.exists(state_path):
+                    os.remove(state_path)
+                raise
+
+        os.replace(part_path, file_path)
+        if os.path.exists(state_path):
+            os.remove(state_path)
+
+        logging.info('Arquivo baixado com sucesso no caminho: %s', file_path)
+        return file_path
+
+    def __probe(self, url: str):
+        """
+        Descobre o tamanho do arquivo e se o servidor aceita requisições com Range.
+        """
+        response = self.__with_retries(
+            lambda: self.session.head(url, headers=IDENTITY_ENCODING, allow_redirects=True, timeout=self.timeout)
+        )
+        response.raise_for_status()
+
+        length = response.headers.get('content-length')
+        accepts_ranges = response.headers.get('accept-ranges', '').lower() == 'bytes'
+        return (int(length) if length else None), accepts_ranges
+
+    def __split(self, total_size: int) -> List[Dict[str, Any]]:
+        """
+        Divide o arquivo em segmentos de tamanhos iguais.
+        """
+        # Arquivos pequenos não compensam o paralelismo
+        num_segments = min(self.num_segments, max(1, total_size // self.max_chunk_size))
+        segment_size = -(-total_size // num_segments) if total_size else 0
+        segments = []
+
+        for start in range(0, total_size, segment_size or 1):
+            end = min(start + segment_size, total_size) - 1
+            segments.append({'start': start, 'end': end, 'done': 0})
+
+        return segments or [{'start': 0, 'end': -1, 'done': 0}]
+
+    @staticmethod
+    def __load_state(state_path: str, total_size: int) -> Optional[List[Dict[str, Any]]]:
+        """
+        Carrega o progresso de um download anterior do mesmo arquivo.
+        """
+        if not os.path.exists(state_path):
+            return None
+
+        try:
+            with open(state_path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+
+        if state.get('total_size') != total_size:
+            logging.info('Arquivo remoto mudou, reiniciando o download.')
+            return None
+
+        logging.info('Retomando download a partir do estado salvo em %s.', state_path)
+        return state['segments']
+
+    @staticmethod
+    def __prepare_file(part_path: str, total_size: int) -> None:
+        """
+        Cria (ou mantém) o arquivo parcial com o tamanho final, para escrita em posições arbitrárias.
+        """
+        mode = 'r+b' if os.path.exists(part_path) else 'wb'
+        with open(part_path, mode) as f:
+            f.truncate(total_size)
+
+    def __save_state(self, state_path: str, segments: List[Dict[str, Any]]) -> None:
+        """
+        Salva o progresso dos segmentos de forma atômica.
+        """
+        total_size = sum(segment['end'] - segment['start'] + 1 for segment in segments)
+        tmp_path = f'{state_path}.tmp'
+
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'total_size': total_size, 'segments': segments}, f)
+        os.replace(tmp_path, state_path)
+
+    def __download_segment(
+        self,
+        url: str,
+        part_path: str,
+        segment: Dict[str, Any],
+        segments: List[Dict[str, Any]],
+        state_path: str,
+        pbar: tqdm
+    ) -> None:
+        """
+        Baixa um segmento, retomando do último byte gravado a cada nova tentativa.
+        """
+        ranged = segment['end'] is not None
+        attempt = 0
+
+        while True:
+            start = segment['start'] + segment['done']
+
+            if ranged and start > segment['end']:
+                return
+
+            headers = dict(IDENTITY_ENCODING)
+            if ranged:
+                headers['Range'] = f"bytes={start}-{segment['end']}"
+
+            try:
+                with self.session.get(url, headers=headers, stream=True, timeout=self.timeout) as r:
+                    if r.status_code in RETRYABLE_STATUS:
+                        raise requests.ConnectionError(f'Status {r.status_code}')
+                    r.raise_for_status()
+
+                    encoding = r.headers.get('content-encoding', 'identity').lower()
+                    if encoding != 'identity':
+                        raise requests.HTTPError(
+                            f'Servidor ignorou Accept-Encoding: identity (Content-Encoding {encoding}).', response=r
+                        )
+
+                    if ranged and r.status_code != 206:
+                        raise requests.HTTPError(
+                            f'Servidor ignorou o cabeçalho Range (status {r.status_code}).', response=r
+                        )
+
+                    # Sem buffer: o que o estado marca como baixado já foi entregue ao sistema operacional
+                    mode = 'r+b' if ranged else 'ab'
+                    with open(part_path, mode, buffering=0) as f:
+                        if ranged:
+                            f.seek(start)
+                        self.__copy_stream(r, f, segment, segments, state_path, pbar)
+                return
+            except RETRYABLE_ERRORS as e:
+                attempt += 1
+                if attempt > self.max_retries:
+                    raise
+
+                delay = self.backoff * 2 ** (attempt - 1)
+                logging.warning(
+                    'Falha no segmento %s-%s (%s). Tentativa %s/%s em %.1fs.',
+                    segment['start'], segment['end'], e, attempt, self.max_retries, delay
+                )
+                time.sleep(delay)
+
+                if not ranged:
+                    # Sem Range não é possível continuar de onde parou
+                    pbar.update(-segment['done'])
+                    segment['done'] = 0
+                    open(part_path, 'wb').close()  # pylint: disable=consider-using-with
+
+    def __copy_stream(
+        self,
+        response: requests.Response,
+        f,
+        segment: Dict[str, Any],
+        segments: List[Dict[str, Any]],
+        state_path: str,
+        pbar: tqdm
+    ) -> None:
+        """
+        Copia a resposta para o arquivo com chunks de tamanho adaptativo: o chunk dobra
+        enquanto as leituras são rápidas e cai pela metade quando ficam lentas.
+        """
+        chunk_size = self.min_chunk_size
+        last_save = time.monotonic()
+
+        while True:
+            started = time.monotonic()
+            # Bytes crus: os offsets do Range e do estado se referem ao conteúdo sem codificação
+            chunk = response.raw.read(chunk_size, decode_content=False)
+            if not chunk:
+                break
+
+            f.write(chunk)
+            elapsed = time.monotonic() - started
+
+            if elapsed < 0.1 and len(chunk) == chunk_size:
+                chunk_size = min(chunk_size * 2, self.max_chunk_size)
+            elif elapsed > 1.0:
+                chunk_size = max(chunk_size // 2, self.min_chunk_size)
+
+            with self._lock:
+                segment['done'] += len(chunk)
+                pbar.update(len(chunk))
+
+                if segment['end'] is not None and time.monotonic() - last_save > 1.0:
+                    self.__save_state(state_path, segments)
+                    last_save = time.monotonic()
+
+        if segment['end'] is not None:
+            with self._lock:
+                self.__save_state(state_path, segments)
+
+    def __with_retries(self, request):
+        """
+        Executa uma requisição simples com backoff exponencial.
+        """
+        for attempt in range(self.max_retries + 1):
+            try:
+                response = request()
+                if response.status_code not in RETRYABLE_STATUS or attempt == self.max_retries:
+                    return response
+            except RETRYABLE_ERRORS:
+                if attempt == self.max_retries:
+                    raise
+            time.sleep(self.backoff * 2 ** attempt)
+        return None
@@ -0,0 +1,254 @@
+"""
+Módulo para armazenar em disco os espectrogramas já calculados,
+evitando refazer a extração de features a cada execução.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+class FeatureCache:
+    """
+    Cache persistente de features em disco.
+
+    Cada entrada é indexada pelo hash do conteúdo do áudio somado aos parâmetros
+    de extração (n_fft, hop_length, dB...). Os arquivos ficam agrupados em um
+    diretório por conjunto de parâmetros, de modo que uma mudança nos parâmetros
+    nunca reaproveita entradas antigas. Os diretórios de parâmetros antigos são
+    removidos aos poucos pela remoção LRU, ou de uma vez com invalidate_stale.
+    """
+
+    PARAMS_FILE = 'params.json'
+
+    # Fração de max_bytes que um processo pode gravar antes de recontar o disco
+    RESCAN_RATIO = 0.01
+
+    def __init__(self, cache_dir: str, max_bytes: int = 20 * 1024 ** 3, invalidate_stale: bool = False) -> None:
+        """
+        Instancia um novo objeto FeatureCache.
+
+        :param cache_dir: Diretório raiz do cache.
+        :param max_bytes: Tamanho máximo do cache em bytes. Ao ultrapassar esse limite,
+            as entradas usadas há mais tempo são removidas.
+        :param invalidate_stale: Se True, remove os diretórios de outros parâmetros no primeiro
+            uso de cada conjunto de parâmetros. Só deve ser usado quando nenhum outro processo
+            usa o cache com parâmetros diferentes, pois os arquivos são apagados sem lock.
+        """
+        if max_bytes <= 0:
+            raise ValueError('O tamanho máximo do cache deve ser positivo.')
+
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.invalidate_stale = invalidate_stale
+        self.hits = 0
+        self.misses = 0
+
+        self._namespaces: Dict[str, str] = {}
+        self._size_bytes: Optional[int] = None
+        self._unscanned_bytes = 0
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    @staticmethod
+    def fingerprint(params: Dict[str, Any]) -> str:
+        """
+        Calcula a impressão digital de um conjunto de parâmetros de extração.
+
+        :param params: Parâmetros usados para calcular o espectrograma.
+        :return: Hash hexadecimal dos parâmetros.
+        """
+        encoded = json.dumps(params, sort_keys=True, default=str).encode('utf-8')
+        return hashlib.blake2b(encoded, digest_size=8).hexdigest()
+
+    @staticmethod
+    def make_key(waveform: np.ndarray, params: Dict[str, Any]) -> str:
+        """
+        Gera a chave do cache a partir do conteúdo do áudio e dos parâmetros.
+
+        :param waveform: Array com as amostras do áudio.
+        :param params: Parâmetros usados para calcular o espectrograma.
+        :return: Chave hexadecimal da entrada.
+        """
+        waveform = np.ascontiguousarray(waveform)
+
+        hasher = hashlib.blake2b(digest_size=20)
+        hasher.update(FeatureCache.fingerprint(params).encode('utf-8'))
+        hasher.update(f'{waveform.dtype.str}{waveform.shape}'.encode('utf-8'))
+        hasher.update(memoryview(waveform).cast('B'))
+
+        return hasher.hexdigest()
+
+    def get(self, waveform: np.ndarray, params: Dict[str, Any]) -> Optional[np.ndarray]:
+        """
+        Busca o espectrograma de um áudio no cache.
+
+        :param waveform: Array com as amostras do áudio.
+        :param params: Parâmetros usados para calcular o espectrograma.
+        :return: O espectrograma salvo ou None se não existir.
+        """
+        entry_path = self.__entry_path(self.make_key(waveform, params), params)
+
+        try:
+            spectrogram = np.load(entry_path, allow_pickle=False)
+        except (FileNotFoundError, ValueError, EOFError):
+            self.misses += 1
+            return None
+
+        # Atualiza o mtime para que a remoção siga a ordem de uso (LRU)
+        try:
+            os.utime(entry_path)
+        except OSError:
+            pass
+
+        self.hits += 1
+        return spectrogram
+
+    def put(self, waveform: np.ndarray, params: Dict[str, Any], spectrogram: np.ndarray) -> None:
+        """
+        Salva o espectrograma de um áudio no cache.
+
+        :param waveform: Array com as amostras do áudio.
+        :param params: Parâmetros usados para calcular o espectrograma.
+        :param spectrogram: Espectrograma a ser salvo.
+        """
+        entry_path = self.__entry_path(self.make_key(waveform, params), params)
+        entry_dir = os.path.dirname(entry_path)
+        os.makedirs(entry_dir, exist_ok=True)
+
+        # Ao sobrescrever uma entrada, o tamanho antigo deixa de contar
+        size_bytes = self.size_bytes()
+        try:
+            size_bytes -= os.path.getsize(entry_path)
+        except FileNotFoundError:
+            pass
+
+        # Escrita atômica: grava em um arquivo temporário e renomeia
+        fd, tmp_path = tempfile.mkstemp(dir=entry_dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                np.save(f, spectrogram, allow_pickle=False)
+            os.replace(tmp_path, entry_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        entry_size = os.path.getsize(entry_path)
+        self._size_bytes = size_bytes + entry_size
+        self._unscanned_bytes += entry_size
+
+        # Outros processos (workers do DataLoader) gravam no mesmo diretório sem passar por
+        # este contador. Recontar o disco periodicamente limita o excesso de N processos a
+        # N * RESCAN_RATIO * max_bytes, em vez de N * max_bytes.
+        if self._unscanned_bytes >= self.max_bytes * self.RESCAN_RATIO:
+            self._size_bytes = None
+
+        if self.size_bytes() > self.max_bytes:
+            self.evict()
+
+    def size_bytes(self) -> int:
+        """
+        Retorna o tamanho ocupado pelo cache em disco.
+
+        :return: Tamanho em bytes.
+        """
+        if self._size_bytes is None:
+            self._size_bytes = sum(os.path.getsize(path) for path, _ in self.__iter_entries())
+            self._unscanned_bytes = 0
+        return self._size_bytes
+
+    def evict(self, target_ratio: float = 0.9) -> None:
+        """
+        Remove as entradas usadas há mais tempo até o cache ficar abaixo do limite.
+
+        :param target_ratio: Fração de max_bytes a ser atingida após a remoção.
+        """
+        entries = sorted(self.__iter_entries(), key=lambda entry: entry[1])
+        size = sum(os.path.getsize(path) for path, _ in entries)
+        target = self.max_bytes * target_ratio
+        removed = 0
+
+        for path, _ in entries:
+            if size <= target:
+                break
+            try:
+                entry_size = os.path.getsize(path)
+                os.remove(path)
+            except FileNotFoundError:
+                # Outro processo já removeu a entrada
+                continue
+            size -= entry_size
+            removed += 1
+
+        self._size_bytes = size
+        self._unscanned_bytes = 0
+        logging.info('Cache de features: %s entradas removidas (%s bytes em uso).', removed, size)
+
+    def clear(self) -> None:
+        """
+        Remove todas as entradas do cache.
+        """
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._namespaces.clear()
+        self._size_bytes = 0
+        self._unscanned_bytes = 0
+
+    def __namespace(self, params: Dict[str, Any]) -> str:
+        """
+        Retorna o diretório das entradas de um conjunto de parâmetros.
+        Com invalidate_stale, na primeira utilização as entradas geradas com outros parâmetros são removidas.
+        """
+        fingerprint = self.fingerprint(params)
+
+        if fingerprint in self._namespaces:
+            return self._namespaces[fingerprint]
+
+        namespace = os.path.join(self.cache_dir, fingerprint)
+        os.makedirs(namespace, exist_ok=True)
+
+        with open(os.path.join(namespace, self.PARAMS_FILE), 'w', encoding='utf-8') as f:
+            json.dump(params, f, sort_keys=True, default=str)
+
+        if self.invalidate_stale:
+            self.__remove_stale(fingerprint)
+
+        self._namespaces[fingerprint] = namespace
+        return namespace
+
+    def __remove_stale(self, fingerprint: str) -> None:
+        """
+        Remove os diretórios das entradas geradas com outros parâmetros.
+        """
+        for name in os.listdir(self.cache_dir):
+            stale_path = os.path.join(self.cache_dir, name)
+            if name != fingerprint and name not in self._namespaces and os.path.isdir(stale_path):
+                logging.info('Parâmetros de extração alterados, invalidando cache %s.', name)
+                shutil.rmtree(stale_path, ignore_errors=True)
+                self._size_bytes = None
+
+    def __entry_path(self, key: str, params: Dict[str, Any]) -> str:
+        """
+        Retorna o caminho do arquivo de uma entrada do cache.
+        """
+        return os.path.join(self.__namespace(params), key[:2], f'{key}.npy')
+
+    def __iter_entries(self):
+        """
+        Itera sobre as entradas do cache, retornando o caminho e o mtime de cada uma.
+        """
+        for root, _, files in os.walk(self.cache_dir):
+            for file in files:
+                if not file.endswith('.npy'):
+                    continue
+                path = os.path.join(root, file)
+                try:
+                    yield path, os.path.getmtime(path)
+                except FileNotFoundError:
+                    continue
@@ -0,0 +1,302 @@
+"""
+Módulo para exportar os espectrogramas já calculados em shards Arrow e lê-los
+de volta via memory-map, sem refazer a decodificação e a STFT.
+"""
+
+import json
+import logging
+import multiprocessing
+import os
+import warnings
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pyarrow as pa
+import torch
+from torch.utils.data import Dataset
+from tqdm import tqdm
+from controller.wav_controller import WavController
+
+MANIFEST_FILE = 'manifest.json'
+
+SHARD_SCHEMA = pa.schema([
+    ('spectrogram', pa.large_binary()),
+    ('n_freqs', pa.int32()),
+    ('n_frames', pa.int32()),
+    ('label', pa.int64()),
+    ('path', pa.string()),
+])
+
+# Estado de cada processo do pool, preenchido pelo initializer
+_worker_state: Dict[str, Any] = {}
+
+def _init_worker(wav_controller: WavController, source: Sequence, settings: Dict[str, Any]) -> None:
+    """
+    Inicializa um processo do pool com o WavController e a fonte dos dados.
+    """
+    _worker_state['wav_controller'] = wav_controller
+    _worker_state['source'] = source
+    _worker_state['settings'] = settings
+
+def _write_shard(task: Tuple[int, int, int]) -> Dict[str, Any]:
+    """
+    Calcula os espectrogramas de um intervalo de itens e grava um shard.
+    :return: O nome do shard e o número de amostras.
+    """
+    shard_id, start, end = task
+    wav_controller: WavController = _worker_state['wav_controller']
+    source = _worker_state['source']
+    settings = _worker_state['settings']
+    dtype = np.dtype(settings['dtype'])
+
+    columns: Dict[str, List[Any]] = {name: [] for name in SHARD_SCHEMA.names}
+
+    for idx in range(start, end):
+        audio = source[idx]['audio']
+        spectrogram, label = wav_controller.load_wav(audio)
+        spectrogram = np.ascontiguousarray(spectrogram, dtype=dtype)
+
+        columns['spectrogram'].append(spectrogram.tobytes())
+        columns['n_freqs'].append(spectrogram.shape[0])
+        columns['n_frames'].append(spectrogram.shape[1])
+        columns['label'].append(label)
+        columns['path'].append(audio.get('path') or '')
+
+    schema = SHARD_SCHEMA.with_metadata({
+        'feature_params': json.dumps(wav_controller.feature_params(), sort_keys=True),
+        'dtype': dtype.name,
+    })
+    table = pa.table(columns, schema=schema)
+
+    name = f"shard-{shard_id:05d}-of-{settings['num_shards']:05d}.arrow"
+    path = os.path.join(settings['output_dir'], name)
+    tmp_path = f'{path}.tmp'
+
+    # Um único record batch por shard: no memory-map, cada coluna vira um buffer contíguo
+    with pa.OSFile(tmp_path, 'wb') as sink:
+        with pa.ipc.new_file(sink, schema) as writer:
+            writer.write_table(table, max_chunksize=max(1, len(table)))
+    os.replace(tmp_path, path)
+
+    return {'file': name, 'num_samples': len(table)}
+
+class FeatureShardWriter:
+    """
+    Classe responsável por exportar um dataset de áudios para shards Arrow (IPC) com os
+    espectrogramas já calculados.
+
+    Cada shard guarda os espectrogramas em float16 (por padrão), o formato de cada um, os
+    rótulos e, nos metadados do schema, os parâmetros de extração. Os shards são gerados em
+    paralelo, um por processo, e o diretório final pode ser enviado ao Hugging Face Hub.
+    """
+
+    def __init__(
+        self,
+        wav_controller: WavController,
+        shard_size: int = 1000,
+        num_workers: Optional[int] = None,
+        dtype: str = 'float16'
+    ) -> None:
+        """
+        Instancia um novo objeto FeatureShardWriter.
+
+        :param wav_controller: WavController usado para calcular os espectrogramas.
+        :param shard_size: Número de amostras por shard.
+        :param num_workers: Número de processos. Por padrão, usa todos os núcleos disponíveis.
+        :param dtype: Tipo usado para armazenar os espectrogramas ('float16' ou 'float32').
+        """
+        if shard_size < 1:
+            raise ValueError('O shard_size deve ser maior que zero.')
+
+        self.wav_controller = wav_controller
+        self.shard_size = shard_size
+        self.num_workers = num_workers or os.cpu_count() or 1
+        self.dtype = dtype
+
+    def write(self, items: Sequence[Dict[str, Any]], output_dir: str) -> Dict[str, Any]:
+        """
+        Calcula os espectrogramas de todos os itens e grava os shards e o manifesto.
+
+        :param items: Itens indexáveis contendo a chave 'audio' (ex. um split do Hugging Face).
+        :param output_dir: Diretório onde os shards serão gravados.
+        :return: O manifesto gravado.
+        """
+        os.makedirs(output_dir, exist_ok=True)
+
+        num_shards = max(1, -(-len(items) // self.shard_size))
+        tasks = [
+            (shard_id, start, min(start + self.shard_size, len(items)))
+            for shard_id, start in enumerate(range(0, max(len(items), 1), self.shard_size))
+        ]
+        settings = {'output_dir': output_dir, 'num_shards': num_shards, 'dtype': self.dtype}
+
+        with tqdm(total=len(tasks), unit='shard', desc='Gravando shards') as pbar:
+            shards = []
+            for shard in self.__run(tasks, items, settings):
+                shards.append(shard)
+                pbar.update(1)
+
+        manifest = {
+            'feature_params': self.wav_controller.feature_params(),
+            'dtype': self.dtype,
+            'num_samples': sum(shard['num_samples'] for shard in shards),
+            'shards': shards,
+        }
+
+        with open(os.path.join(output_dir, MANIFEST_FILE), 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2)
+
+        logging.info(
+            '%s espectrogramas gravados em %s shards no diretório %s.',
+            manifest['num_samples'],
+            len(shards),
+            output_dir
+        )
+        return manifest
+
+    def __run(self, tasks: List[Tuple[int, int, int]], source: Sequence, settings: Dict[str, Any]):
+        """
+        Grava os shards, usando o pool de processos apenas quando há mais de um worker.
+        """
+        if self.num_workers <= 1 or len(tasks) <= 1:
+            _init_worker(self.wav_controller, source, settings)
+            yield from map(_write_shard, tasks)
+            return
+
+        with multiprocessing.Pool(
+            processes=min(self.num_workers, len(tasks)),
+            initializer=_init_worker,
+            initargs=(self.wav_controller, source, settings)
+        ) as pool:
+            # imap mantém a ordem dos shards no manifesto
+            yield from pool.imap(_write_shard, tasks)
+
+class ShardedSpectrogramDataset(Dataset):
+    """
+    Dataset que lê os shards gravados pelo FeatureShardWriter via memory-map.
+
+    Os espectrogramas são retornados como views dos arquivos mapeados, sem cópia e sem
+    decodificação, então a leitura é limitada apenas pelo disco.
+    """
+
+    def __init__(self, storage_path: str, expected_params: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Instancia um novo objeto ShardedSpectrogramDataset.
+
+        :param storage_path: Diretório com os shards e o manifesto.
+        :param expected_params: Parâmetros de extração esperados (ex. WavController.feature_params()).
+            Se informados, shards gerados com outros parâmetros são rejeitados.
+        """
+        manifest_path = os.path.join(storage_path, MANIFEST_FILE)
+
+        if not os.path.exists(manifest_path):
+            raise FileNotFoundError(f'Shards não encontrados em {storage_path}.')
+
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+
+        if expected_params is not None and manifest['feature_params'] != json.loads(json.dumps(expected_params)):
+            raise ValueError(
+                f"Shards gerados com parâmetros {manifest['feature_params']}, "
+                f'diferentes dos esperados {expected_params}.'
+            )
+
+        self.storage_path = storage_path
+        self.feature_params = manifest['feature_params']
+        self.dtype = np.dtype(manifest['dtype'])
+        self.files = [shard['file'] for shard in manifest['shards']]
+
+        # Posição global da primeira amostra de cada shard
+        self.offsets = np.cumsum([0] + [shard['num_samples'] for shard in manifest['shards']])
+
+        self._shards: Dict[int, Dict[str, np.ndarray]] = {}
+
+    def finalize(self) -> 'ShardedSpectrogramDataset':
+        """
+        Os shards já são somente leitura. Mantido para a mesma interface dos outros datasets.
+
+        :return: O próprio dataset.
+        """
+        return self
+
+    def lengths(self) -> List[int]:
+        """
+        Retorna o número de frames de cada espectrograma, usado para agrupar lotes por duração.
+        :return: Lista com o número de frames de cada amostra.
+        """
+        return np.concatenate([
+            self.__shard(shard_id)['n_frames'] for shard_id in range(len(self.files))
+        ]).tolist() if self.files else []
+
+    def __len__(self) -> int:
+        """
+        Retorna o número total de amostras no dataset.
+        :return: Número de amostras.
+        """
+        return int(self.offsets[-1])
+
+    def __getitem__(self, idx: int) -> Tuple[torch.Tensor, torch.Tensor]:
+        """
+        Retorna o espectrograma e o rótulo na posição idx.
+
+        :param idx: Índice da amostra.
+        :return: Espectrograma (tensor) e rótulo (tensor) correspondentes.
+        """
+        if idx < 0:
+            idx += len(self)
+        if not 0 <= idx < len(self):
+            raise IndexError(f'Índice {idx} fora do dataset de {len(self)} amostras.')
+
+        shard_id = int(np.searchsorted(self.offsets, idx, side='right')) - 1
+        shard = self.__shard(shard_id)
+        row = idx - self.offsets[shard_id]
+
+        start, end = shard['value_offsets'][row], shard['value_offsets'][row + 1]
+        spectrogram = shard['data'][start:end].view(self.dtype)
+        spectrogram = spectrogram.reshape(shard['n_freqs'][row], shard['n_frames'][row])
+
+        with warnings.catch_warnings():
+            # O mapa é somente leitura; o tensor nunca é alterado in-place (o lote é uma cópia)
+            warnings.simplefilter('ignore', UserWarning)
+            tensor = torch.from_numpy(spectrogram)
+
+        # Adicionando o canal para CNN
+        return tensor.unsqueeze(0), torch.tensor(shard['label'][row], dtype=torch.long)
+
+    def __getstate__(self) -> Dict[str, Any]:
+        """
+        Remove os shards abertos do estado serializado, para que cada processo
+        (ex. workers do DataLoader) mapeie os arquivos por conta própria.
+        """
+        state = self.__dict__.copy()
+        state['_shards'] = {}
+        return state
+
+    def __shard(self, shard_id: int) -> Dict[str, np.ndarray]:
+        """
+        Mapeia um shard em memória sob demanda e expõe os buffers das colunas como arrays.
+        """
+        if shard_id not in self._shards:
+            source = pa.memory_map(os.path.join(self.storage_path, self.files[shard_id]), 'r')
+            table = pa.ipc.open_file(source).read_all().combine_chunks()
+
+            spectrograms = table.column('spectrogram').chunk(0) if table.num_rows else None
+            if spectrograms is not None:
+                # Buffers de um large_binary: [validade, offsets (int64), dados]
+                _, offsets, data = spectrograms.buffers()
+                value_offsets = np.frombuffer(offsets, dtype=np.int64)[
+                    spectrograms.offset:spectrograms.offset + len(spectrograms) + 1
+                ]
+                data = np.frombuffer(data, dtype=np.uint8)
+            else:
+                value_offsets, data = np.zeros(1, dtype=np.int64), np.zeros(0, dtype=np.uint8)
+
+            self._shards[shard_id] = {
+                'value_offsets': value_offsets,
+                'data': data,
+                'n_freqs': table.column('n_freqs').to_numpy(),
+                'n_frames': table.column('n_frames').to_numpy(),
+                'label': table.column('label').to_numpy(),
+            }
+
+        return self._shards[shard_id]
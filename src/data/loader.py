@@ -0,0 +1,190 @@
+"""
+Módulo para criar os DataLoaders do treinamento com workers, memória fixada e prefetch.
+"""
+
+import itertools
+import logging
+import multiprocessing
+import random
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable, Iterator, List, Optional
+
+import numpy as np
+import torch
+from torch.utils.data import DataLoader, Dataset, IterableDataset, Sampler
+from torch.utils.data.distributed import DistributedSampler
+
+@dataclass
+class LoaderConfig:
+    """
+    Configurações do pipeline de entrada.
+
+    :param num_workers: Número de processos que montam os lotes. 0 monta no processo principal.
+    :param persistent_workers: Se True, os workers são mantidos entre as épocas.
+    :param pin_memory: Se True, os lotes são copiados para memória fixada, acelerando a cópia
+        para a GPU. Se None, é habilitado apenas quando há CUDA disponível.
+    :param prefetch_factor: Número de lotes preparados antecipadamente por worker.
+    :param seed: Semente do embaralhamento e dos geradores aleatórios dos workers.
+    """
+    num_workers: int = 0
+    persistent_workers: bool = True
+    pin_memory: Optional[bool] = None
+    prefetch_factor: int = 2
+    seed: int = 0
+
+    def __post_init__(self) -> None:
+        if self.num_workers < 0:
+            raise ValueError('O número de workers não pode ser negativo.')
+
+        if self.prefetch_factor < 1:
+            raise ValueError('O prefetch_factor deve ser maior que zero.')
+
+def seed_worker(worker_id: int) -> None:  # pylint: disable=unused-argument
+    """
+    Inicializa os geradores aleatórios de um worker a partir da semente que o PyTorch
+    atribui a ele. Como essa semente deriva do gerador do DataLoader, o resultado é
+    determinístico para a mesma semente, e diferente entre os workers.
+
+    :param worker_id: Índice do worker (não usado; a semente já é única por worker).
+    """
+    worker_seed = torch.initial_seed() % 2 ** 32
+    np.random.seed(worker_seed)
+    random.seed(worker_seed)
+
+def build_data_loader(
+    dataset: Dataset,
+    config: Optional[LoaderConfig] = None,
+    batch_size: Optional[int] = 1,
+    shuffle: bool = False,
+    sampler: Optional[Sampler] = None,
+    batch_sampler: Optional[Sampler] = None,
+    collate_fn: Optional[Callable[[Any], Any]] = None
+) -> DataLoader:
+    """
+    Cria um DataLoader com a configuração de entrada informada.
+
+    :param dataset: Dataset de origem.
+    :param config: Configurações do pipeline de entrada. Por padrão, sem workers.
+    :param batch_size: Tamanho do lote (ignorado quando há batch_sampler).
+    :param shuffle: Se True, embaralha as amostras a cada época (ignorado quando há sampler).
+    :param sampler: Sampler das amostras (ex. DistributedSampler), opcional.
+    :param batch_sampler: Sampler que gera os lotes (ex. BucketBatchSampler), opcional.
+    :param collate_fn: Função que monta cada lote, opcional.
+    :return: O DataLoader configurado.
+    """
+    config = config or LoaderConfig()
+
+    pin_memory = config.pin_memory
+    if pin_memory is None:
+        pin_memory = torch.cuda.is_available()
+
+    kwargs = {
+        'num_workers': config.num_workers,
+        'pin_memory': pin_memory,
+        'collate_fn': collate_fn,
+        'generator': torch.Generator().manual_seed(config.seed),
+    }
+
+    # Sem allow_none, get_start_method fixaria o método global e um set_start_method posterior falharia.
+    # Se ainda não foi definido, vale o padrão da plataforma (o primeiro de get_all_start_methods)
+    start_method = multiprocessing.get_start_method(allow_none=True) or multiprocessing.get_all_start_methods()[0]
+
+    if config.num_workers > 0 and start_method != 'fork' and hasattr(dataset, 'share_memory'):
+        # Com spawn, o dataset é serializado para cada worker: em memória compartilhada, só o handle é copiado
+        dataset.share_memory()
+
+    if config.num_workers > 0:
+        # Essas opções só existem com workers
+        kwargs.update({
+            'persistent_workers': config.persistent_workers,
+            'prefetch_factor': config.prefetch_factor,
+            'worker_init_fn': seed_worker,
+        })
+
+    if batch_sampler is not None:
+        kwargs['batch_sampler'] = batch_sampler
+    elif sampler is not None:
+        kwargs['batch_size'] = batch_size
+        kwargs['sampler'] = sampler
+    elif shuffle and not isinstance(dataset, IterableDataset):
+        kwargs['batch_size'] = batch_size
+        # A ordem depende apenas da semente e da época (set_epoch), e não de quanto o gerador do
+        # DataLoader já foi consumido: com workers persistentes, só o primeiro iterador tira a
+        # semente dos workers do gerador, então o embaralhamento padrão mudaria ao retomar um treinamento
+        kwargs['sampler'] = DistributedSampler(dataset, num_replicas=1, rank=0, shuffle=True, seed=config.seed)
+    else:
+        # Datasets iteráveis fazem o próprio embaralhamento
+        kwargs['batch_size'] = batch_size
+
+    logging.info(
+        'DataLoader com %s workers (pin_memory=%s, prefetch=%s, persistentes=%s).',
+        config.num_workers,
+        pin_memory,
+        config.prefetch_factor if config.num_workers > 0 else None,
+        config.persistent_workers if config.num_workers > 0 else None
+    )
+
+    return DataLoader(dataset, **kwargs)
+
+class SkipBatchSampler(Sampler):
+    """
+    Sampler que descarta os primeiros lotes de outro batch sampler. Apenas os índices dos
+    lotes descartados são gerados, nenhuma amostra é lida.
+    """
+
+    def __init__(self, batch_sampler: Sampler, skip_batches: int) -> None:
+        """
+        Instancia um novo objeto SkipBatchSampler.
+
+        :param batch_sampler: Batch sampler de origem.
+        :param skip_batches: Número de lotes descartados no início.
+        """
+        super().__init__()
+        self.batch_sampler = batch_sampler
+        self.skip_batches = skip_batches
+
+    def __iter__(self) -> Iterator[List[int]]:
+        return itertools.islice(iter(self.batch_sampler), self.skip_batches, None)
+
+    def __len__(self) -> int:
+        return max(0, len(self.batch_sampler) - self.skip_batches)
+
+def skip_batches(data_loader: DataLoader, num_batches: int) -> Iterable[Any]:
+    """
+    Retorna os lotes de uma época a partir do lote num_batches, para retomar um treinamento.
+
+    Em datasets indexáveis, os lotes são descartados no batch sampler: como os samplers embaralham
+    a partir da semente e da época (set_epoch), um DataLoader equivalente produz os mesmos lotes
+    que o original, sem que os workers leiam as amostras já treinadas. Datasets iteráveis não permitem pular amostras sem lê-las, então os
+    lotes são gerados e descartados.
+
+    :param data_loader: DataLoader da época.
+    :param num_batches: Número de lotes já processados.
+    :return: Os lotes restantes da época.
+    """
+    if num_batches <= 0:
+        return data_loader
+
+    if isinstance(data_loader.dataset, IterableDataset) or data_loader.batch_sampler is None:
+        return itertools.islice(data_loader, num_batches, None)
+
+    kwargs = {
+        'num_workers': data_loader.num_workers,
+        'collate_fn': data_loader.collate_fn,
+        'pin_memory': data_loader.pin_memory,
+        'timeout': data_loader.timeout,
+        'worker_init_fn': data_loader.worker_init_fn,
+        'multiprocessing_context': data_loader.multiprocessing_context,
+        'generator': data_loader.generator,
+    }
+
+    if data_loader.num_workers > 0:
+        # Usado por uma única época: os workers não precisam ser persistentes
+        kwargs['prefetch_factor'] = data_loader.prefetch_factor
+
+    logging.info('Pulando %s lotes já treinados no batch sampler.', num_batches)
+    return DataLoader(
+        data_loader.dataset,
+        batch_sampler=SkipBatchSampler(data_loader.batch_sampler, num_batches),
+        **kwargs
+    )
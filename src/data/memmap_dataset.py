@@ -0,0 +1,257 @@
+"""
+Módulo para armazenar os espectrogramas em um único arquivo contíguo em disco,
+acessado por memory-map.
+"""
+
+import json
+import logging
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import torch
+from torch.utils.data import Dataset
+
+class MemmapSpectrogramDataset(Dataset):
+    """
+    Dataset de espectrogramas armazenados em um arquivo binário contíguo.
+
+    Os espectrogramas são gravados um após o outro em 'spectrograms.bin', com um índice
+    de offsets e formatos em 'index.npy' e os rótulos em um array paralelo 'labels.npy'.
+    Após a finalização, o arquivo é mapeado em memória e cada amostra é retornada
+    como uma view do mapa, sem cópia.
+    """
+
+    DATA_FILE = 'spectrograms.bin'
+    INDEX_FILE = 'index.npy'
+    LABELS_FILE = 'labels.npy'
+    META_FILE = 'meta.json'
+
+    SUPPORTED_DTYPES = ('float32', 'float16')
+
+    def __init__(
+        self,
+        storage_path: str,
+        dtype: str = 'float32',
+        feature_params: Optional[Dict[str, Any]] = None
+    ) -> None:
+        """
+        Cria um novo armazenamento vazio, sobrescrevendo um existente no mesmo caminho.
+
+        :param storage_path: Diretório onde os arquivos do dataset serão gravados.
+        :param dtype: Tipo usado para armazenar os espectrogramas ('float32' ou 'float16').
+        :param feature_params: Parâmetros de extração (ex. WavController.feature_params()), gravados
+            nos metadados para que um armazenamento de outras features não seja reaproveitado.
+        """
+        if dtype not in self.SUPPORTED_DTYPES:
+            raise ValueError(f'Tipo {dtype} não suportado. Use um de {self.SUPPORTED_DTYPES}.')
+
+        self.storage_path = storage_path
+        self.dtype = np.dtype(dtype)
+        self.feature_params = feature_params
+
+        self._offsets: List[int] = []
+        self._shapes: List[Tuple[int, int]] = []
+        self._labels: List[float] = []
+        self._next_offset = 0
+
+        self._index: Optional[np.ndarray] = None
+        self._label_array: Optional[np.ndarray] = None
+        self._data: Optional[np.memmap] = None
+        self._writer = None
+
+        os.makedirs(self.storage_path, exist_ok=True)
+        self._writer = open(self.__path(self.DATA_FILE), 'wb')  # pylint: disable=consider-using-with
+
+    @classmethod
+    def open(cls, storage_path: str) -> 'MemmapSpectrogramDataset':
+        """
+        Abre um armazenamento já finalizado, somente para leitura.
+
+        :param storage_path: Diretório do dataset.
+        :return: O dataset mapeado em memória.
+        """
+        meta_path = os.path.join(storage_path, cls.META_FILE)
+
+        if not os.path.exists(meta_path):
+            raise FileNotFoundError(f'Dataset não encontrado em {storage_path}.')
+
+        with open(meta_path, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+
+        dataset = cls.__new__(cls)
+        dataset.storage_path = storage_path
+        dataset.dtype = np.dtype(meta['dtype'])
+        dataset.feature_params = meta.get('feature_params')
+        dataset._writer = None
+        dataset._data = None
+        dataset._index = np.load(dataset.__path(cls.INDEX_FILE))
+        dataset._label_array = np.load(dataset.__path(cls.LABELS_FILE))
+        return dataset
+
+    @classmethod
+    def is_compatible(
+        cls,
+        storage_path: str,
+        feature_params: Dict[str, Any],
+        dtype: Optional[str] = None
+    ) -> bool:
+        """
+        Verifica se existe um armazenamento finalizado com os parâmetros de extração informados.
+        Armazenamentos gravados sem os parâmetros são considerados incompatíveis.
+
+        :param storage_path: Diretório do dataset.
+        :param feature_params: Parâmetros de extração esperados (ex. WavController.feature_params()).
+        :param dtype: Tipo esperado dos espectrogramas (opcional).
+        :return: True se o armazenamento pode ser reaberto.
+        """
+        meta_path = os.path.join(storage_path, cls.META_FILE)
+
+        if not os.path.exists(meta_path):
+            return False
+
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return False
+
+        # Ida e volta pelo JSON, para comparar tuplas e listas da mesma forma
+        if meta.get('feature_params') != json.loads(json.dumps(feature_params)):
+            return False
+
+        return dtype is None or meta['dtype'] == np.dtype(dtype).name
+
+    def add_sample(self, spectrogram: np.ndarray, label: float) -> None:
+        """
+        Adiciona um espectrograma e rótulo ao final do arquivo.
+
+        :param spectrogram: Espectrograma 2D (frequências x frames) a ser adicionado.
+        :param label: Rótulo correspondente ao espectrograma.
+        """
+        if self._writer is None:
+            raise RuntimeError('O dataset já foi finalizado e é somente leitura.')
+
+        spectrogram = np.ascontiguousarray(spectrogram, dtype=self.dtype)
+
+        if spectrogram.ndim != 2:
+            raise ValueError(f'Espectrograma deve ter 2 dimensões, recebido {spectrogram.shape}.')
+
+        self._writer.write(memoryview(spectrogram).cast('B'))
+
+        self._offsets.append(self._next_offset)
+        self._shapes.append(spectrogram.shape)
+        self._labels.append(label)
+        self._next_offset += spectrogram.size
+
+    def finalize(self) -> 'MemmapSpectrogramDataset':
+        """
+        Fecha o arquivo de escrita e grava o índice e os rótulos.
+        A partir daqui o dataset passa a ser somente leitura.
+
+        :return: O próprio dataset.
+        """
+        if self._writer is None:
+            return self
+
+        self._writer.close()
+        self._writer = None
+
+        index = np.zeros((len(self._offsets), 3), dtype=np.int64)
+        if self._offsets:
+            index[:, 0] = self._offsets
+            index[:, 1:] = self._shapes
+
+        self._index = index
+        self._label_array = np.asarray(self._labels, dtype=np.int64)
+
+        np.save(self.__path(self.INDEX_FILE), self._index)
+        np.save(self.__path(self.LABELS_FILE), self._label_array)
+
+        with open(self.__path(self.META_FILE), 'w', encoding='utf-8') as f:
+            json.dump({
+                'dtype': self.dtype.name,
+                'num_samples': len(index),
+                'feature_params': self.feature_params,
+            }, f)
+
+        self._offsets, self._shapes, self._labels = [], [], []
+
+        logging.info(
+            'Dataset com %s espectrogramas gravado em %s (%.1f MB).',
+            len(index),
+            self.storage_path,
+            os.path.getsize(self.__path(self.DATA_FILE)) / 1024 ** 2
+        )
+        return self
+
+    def lengths(self) -> List[int]:
+        """
+        Retorna o número de frames de cada espectrograma, usado para agrupar lotes por duração.
+        :return: Lista com o número de frames de cada amostra.
+        """
+        if self._index is None:
+            return [shape[1] for shape in self._shapes]
+        return self._index[:, 2].tolist()
+
+    def __len__(self) -> int:
+        """
+        Retorna o número total de amostras no dataset.
+        :return: Número de amostras.
+        """
+        if self._index is None:
+            return len(self._offsets)
+        return len(self._index)
+
+    def __getitem__(self, idx: int) -> Tuple[torch.Tensor, torch.Tensor]:
+        """
+        Retorna o espectrograma e o rótulo na posição idx.
+
+        O espectrograma é uma view do arquivo mapeado em memória, sem cópia,
+        no tipo em que foi armazenado.
+
+        :param idx: Índice da amostra.
+        :return: Espectrograma (tensor) e rótulo (tensor) correspondentes.
+        """
+        if self._index is None:
+            raise RuntimeError('Chame finalize() antes de ler o dataset.')
+
+        offset, n_freqs, n_frames = self._index[idx]
+        spectrogram = self.__data()[offset:offset + n_freqs * n_frames].reshape(n_freqs, n_frames)
+
+        # Adicionando o canal para CNN
+        return (
+            torch.from_numpy(spectrogram).unsqueeze(0),
+            torch.tensor(self._label_array[idx], dtype=torch.long)
+        )
+
+    def __getstate__(self) -> Dict[str, Any]:
+        """
+        Remove o memory-map do estado serializado, para que cada processo
+        (ex. workers do DataLoader) abra o seu próprio mapa em vez de copiar os dados.
+        """
+        if self._writer is not None:
+            raise RuntimeError('Chame finalize() antes de compartilhar o dataset.')
+
+        state = self.__dict__.copy()
+        state['_data'] = None
+        return state
+
+    def __data(self) -> np.memmap:
+        """
+        Abre o memory-map do arquivo de dados sob demanda.
+        """
+        if self._data is None:
+            if os.path.getsize(self.__path(self.DATA_FILE)) == 0:
+                self._data = np.zeros(0, dtype=self.dtype)
+            else:
+                # Modo copy-on-write: o arquivo nunca é alterado, mas os arrays são graváveis,
+                # o que permite ao torch.from_numpy compartilhar a memória sem avisos
+                self._data = np.memmap(self.__path(self.DATA_FILE), dtype=self.dtype, mode='c')
+        return self._data
+
+    def __path(self, file_name: str) -> str:
+        """
+        Retorna o caminho de um arquivo do armazenamento.
+        """
+        return os.path.join(self.storage_path, file_name)
@@ -2,50 +2,125 @@
 Módulo para carregar os dados de espectrogramas e notas musicais em um dataset.
 """
 
-from typing import List
+from typing import List, Optional
 
+import numpy as np
 import torch
 from torch.utils.data import Dataset
 
 class SpectrogramDataset(Dataset):
     """
     Classe para carregar os dados de espectrogramas e notas musicais em um dataset.
+
+    Ao ser finalizado, o dataset junta todos os espectrogramas em um único tensor contíguo,
+    com um índice de offsets e formatos. Assim, os workers do DataLoader compartilham o mesmo
+    buffer: em fork, nenhuma página é copiada ao ler as amostras (não há milhares de objetos
+    cujas contagens de referência seriam alteradas) e, com share_memory(), o buffer também é
+    compartilhado em workers criados com spawn.
     """
     def __init__(self) -> None:
         """
         Inicializa o dataset com espectrogramas e rótulos numéricos.
-        
+
         :param spectrograms: Lista de arrays contendo os espectrogramas.
         """
         self.spectrograms = []
         self.labels = []
 
+        # Armazenamento compacto, preenchido por finalize()
+        self._data: Optional[torch.Tensor] = None
+        self._index: Optional[np.ndarray] = None
+        self._label_tensor: Optional[torch.Tensor] = None
+
     def __len__(self) -> int:
         """
         Retorna o número total de amostras no dataset.
         :return: Número de amostras.
         """
+        if self._index is not None:
+            return len(self._index)
         return len(self.spectrograms)
 
     def __getitem__(self, idx: int) -> torch.Tensor:
         """
         Retorna o espectrograma e o rótulo na posição idx.
-        
+
         :param idx: Índice da amostra.
         :return: Espectrograma (tensor) e rótulo (tensor) correspondentes.
         """
+        if self._index is not None:
+            offset, n_freqs, n_frames = self._index[idx]
+            # View do buffer compacto, sem cópia
+            spectrogram = self._data[offset:offset + n_freqs * n_frames].view(n_freqs, n_frames)
+            return spectrogram.unsqueeze(0), self._label_tensor[idx]
+
         # Convertendo espectrograma em tensor e adicionando o canal para CNN
-        spectrogram = torch.tensor(self.spectrograms[idx], dtype=torch.float32).unsqueeze(0)
+        # (as_tensor evita a cópia quando o array já está em float32)
+        spectrogram = torch.as_tensor(self.spectrograms[idx], dtype=torch.float32).unsqueeze(0)
         # Convertendo o rótulo em tensor
         label = torch.tensor(self.labels[idx], dtype=torch.long)
         return spectrogram, label
-    
+
+    def lengths(self) -> List[int]:
+        """
+        Retorna o número de frames de cada espectrograma, usado para agrupar lotes por duração.
+        :return: Lista com o número de frames de cada amostra.
+        """
+        if self._index is not None:
+            return self._index[:, 2].tolist()
+        return [spectrogram.shape[-1] for spectrogram in self.spectrograms]
+
     def add_sample(self, spectrogram: torch.Tensor, label: torch.Tensor) -> None:
         """
         Adiciona um espectrograma e rótulo ao dataset.
-        
+
         :param spectrogram: Espectrograma a ser adicionado.
         :param label: Rótulo correspondente ao espectrograma.
         """
+        if self._index is not None:
+            raise RuntimeError('O dataset já foi finalizado e é somente leitura.')
+
         self.spectrograms.append(spectrogram)
         self.labels.append(label)
+
+    def finalize(self) -> 'SpectrogramDataset':
+        """
+        Junta os espectrogramas em um único tensor contíguo (float32) e libera a lista original.
+        A partir daqui o dataset passa a ser somente leitura.
+
+        :return: O próprio dataset.
+        """
+        if self._index is not None:
+            return self
+
+        index = np.zeros((len(self.spectrograms), 3), dtype=np.int64)
+        for i, spectrogram in enumerate(self.spectrograms):
+            index[i, 1:] = np.shape(spectrogram)[-2:]
+        sizes = index[:, 1] * index[:, 2]
+        index[:, 0] = np.cumsum(sizes) - sizes
+
+        data = torch.empty(int(sizes.sum()), dtype=torch.float32)
+
+        # Copia e descarta cada espectrograma, para não manter duas cópias completas em memória
+        for i, (offset, n_freqs, n_frames) in enumerate(index):
+            spectrogram = torch.as_tensor(self.spectrograms[i], dtype=torch.float32)
+            data[offset:offset + n_freqs * n_frames] = spectrogram.reshape(-1)
+            self.spectrograms[i] = None
+
+        self._data = data
+        self._index = index
+        self._label_tensor = torch.as_tensor(np.asarray(self.labels), dtype=torch.long)
+        self.spectrograms, self.labels = [], []
+        return self
+
+    def share_memory(self) -> 'SpectrogramDataset':
+        """
+        Move o buffer compacto para memória compartilhada, para que workers criados
+        com spawn (ex. macOS e Windows) recebam um handle em vez de uma cópia.
+
+        :return: O próprio dataset.
+        """
+        self.finalize()
+        self._data.share_memory_()
+        self._label_tensor.share_memory_()
+        return self
@@ -0,0 +1,120 @@
+"""
+Módulo para gerar os espectrogramas sob demanda durante o treinamento,
+sem materializar o dataset inteiro em memória.
+"""
+
+import itertools
+import random
+from typing import Any, Iterable, Iterator, List, Tuple
+
+import numpy as np
+import torch
+from torch.utils.data import IterableDataset, get_worker_info
+from datasets import Dataset as HuggingfaceDataset
+from datasets import IterableDataset as HuggingfaceIterableDataset
+from datasets.distributed import split_dataset_by_node
+from controller.wav_controller import WavController
+
+class StreamingSpectrogramDataset(IterableDataset):
+    """
+    Dataset iterável que lê os áudios de um dataset do Hugging Face (normal ou em streaming)
+    e calcula os espectrogramas à medida que são consumidos.
+
+    A ordem é embaralhada com um buffer de tamanho limitado, então o uso de memória
+    é constante independentemente do tamanho do corpus.
+    """
+
+    def __init__(
+        self,
+        source: Iterable[Any],
+        wav_controller: WavController,
+        shuffle_buffer_size: int = 1000,
+        seed: int = 0
+    ) -> None:
+        """
+        Instancia um novo objeto StreamingSpectrogramDataset.
+
+        :param source: Split do dataset do Hugging Face (Dataset ou IterableDataset).
+        :param wav_controller: WavController usado para calcular os espectrogramas.
+        :param shuffle_buffer_size: Tamanho do buffer de embaralhamento. Use 0 para manter a ordem.
+        :param seed: Semente usada para embaralhar as amostras.
+        """
+        super().__init__()
+
+        if shuffle_buffer_size < 0:
+            raise ValueError('O tamanho do buffer de embaralhamento não pode ser negativo.')
+
+        self.source = source
+        self.wav_controller = wav_controller
+        self.shuffle_buffer_size = shuffle_buffer_size
+        self.seed = seed
+        self.epoch = 0
+
+    def set_epoch(self, epoch: int) -> None:
+        """
+        Define a época atual, para que cada época tenha uma ordem diferente.
+
+        :param epoch: Número da época.
+        """
+        self.epoch = epoch
+
+        if hasattr(self.source, 'set_epoch'):
+            self.source.set_epoch(epoch)
+
+    def __iter__(self) -> Iterator[Tuple[torch.Tensor, torch.Tensor]]:
+        """
+        Itera sobre as amostras da parte do dataset atribuída a este worker.
+        :return: Iterador de espectrogramas (tensor) e rótulos (tensor).
+        """
+        worker_info = get_worker_info()
+        worker_id = worker_info.id if worker_info is not None else 0
+        num_workers = worker_info.num_workers if worker_info is not None else 1
+
+        samples = (self.__to_sample(item) for item in self.__worker_source(worker_id, num_workers))
+
+        if self.shuffle_buffer_size == 0:
+            return samples
+
+        rng = random.Random(self.seed + self.epoch * 1_000_003 + worker_id)
+        return self.__shuffle(samples, rng)
+
+    def __worker_source(self, worker_id: int, num_workers: int) -> Iterable[Any]:
+        """
+        Retorna a parte disjunta do dataset atribuída a um worker do DataLoader.
+        """
+        if num_workers <= 1 or isinstance(self.source, HuggingfaceIterableDataset):
+            # O IterableDataset do Hugging Face já distribui os seus shards entre os workers
+            return self.source
+
+        if isinstance(self.source, HuggingfaceDataset):
+            return split_dataset_by_node(self.source, rank=worker_id, world_size=num_workers)
+
+        return itertools.islice(self.source, worker_id, None, num_workers)
+
+    def __to_sample(self, item: Any) -> Tuple[torch.Tensor, torch.Tensor]:
+        """
+        Calcula o espectrograma de um item e o converte em tensores.
+        """
+        spectrogram, label = self.wav_controller.load_wav(item['audio'])
+        spectrogram = np.ascontiguousarray(spectrogram, dtype=np.float32)
+
+        # Adicionando o canal para CNN
+        return torch.from_numpy(spectrogram).unsqueeze(0), torch.tensor(label, dtype=torch.long)
+
+    def __shuffle(self, samples: Iterator[Any], rng: random.Random) -> Iterator[Any]:
+        """
+        Embaralha as amostras usando um buffer de tamanho limitado.
+        """
+        buffer: List[Any] = []
+
+        for sample in samples:
+            if len(buffer) < self.shuffle_buffer_size:
+                buffer.append(sample)
+                continue
+
+            idx = rng.randrange(len(buffer))
+            yield buffer[idx]
+            buffer[idx] = sample
+
+        rng.shuffle(buffer)
+        yield from buffer
@@ -0,0 +1,97 @@
+"""
+Módulo para ler os áudios diretamente do arquivo .tar.gz e gravar os espectrogramas
+em um armazenamento compacto, sem extrair os arquivos .wav para o disco.
+"""
+
+import json
+import logging
+import os
+import tarfile
+from typing import Any, Dict, Iterator, List
+
+from controller.feature_extractor import FeatureExtractor
+from data.memmap_dataset import MemmapSpectrogramDataset
+
+class TarIngestor:
+    """
+    Classe responsável por transformar um arquivo .tar.gz de áudios em um
+    MemmapSpectrogramDataset em uma única passada sequencial.
+
+    Os membros são lidos um a um em modo streaming, decodificados em memória e
+    processados pelo FeatureExtractor. O rótulo numérico (pitch) vem do nome do arquivo,
+    como no WavController, e a categoria vem do diretório do membro, da mesma forma que
+    no upload para o Hugging Face. As categorias e os nomes dos membros ficam em 'members.json'.
+    """
+
+    MEMBERS_FILE = 'members.json'
+
+    def __init__(self, feature_extractor: FeatureExtractor, extension: str = '.wav') -> None:
+        """
+        Instancia um novo objeto TarIngestor.
+
+        :param feature_extractor: FeatureExtractor usado para decodificar e calcular os espectrogramas.
+        :param extension: Extensão dos membros a serem processados.
+        """
+        self.feature_extractor = feature_extractor
+        self.extension = extension
+
+    def ingest(
+        self,
+        archive_path: str,
+        storage_path: str,
+        dtype: str = 'float32'
+    ) -> MemmapSpectrogramDataset:
+        """
+        Lê o arquivo compactado e grava os espectrogramas no armazenamento.
+
+        :param archive_path: Caminho do arquivo .tar.gz.
+        :param storage_path: Diretório do MemmapSpectrogramDataset a ser criado.
+        :param dtype: Tipo usado para armazenar os espectrogramas.
+        :return: O dataset finalizado.
+        """
+        if not os.path.exists(archive_path):
+            raise FileNotFoundError(f'Arquivo {archive_path} não encontrado.')
+
+        logging.info('Lendo %s em modo streaming...', archive_path)
+
+        members: List[Dict[str, str]] = []
+        dataset = MemmapSpectrogramDataset(
+            storage_path,
+            dtype=dtype,
+            feature_params=self.feature_extractor.wav_controller.feature_params()
+        )
+
+        # 'r|*' lê o arquivo sequencialmente, sem precisar de seek nem do índice do tar
+        with tarfile.open(archive_path, mode='r|*') as tar:
+            self.feature_extractor.extract(self.__iter_members(tar, members), dataset)
+
+        dataset.finalize()
+
+        with open(os.path.join(storage_path, self.MEMBERS_FILE), 'w', encoding='utf-8') as f:
+            json.dump(members, f)
+
+        logging.info('%s áudios lidos de %s.', len(members), archive_path)
+        return dataset
+
+    def __iter_members(self, tar: tarfile.TarFile, members: List[Dict[str, str]]) -> Iterator[Dict[str, Any]]:
+        """
+        Itera sobre os membros de áudio do tar, retornando o conteúdo ainda codificado.
+        Os membros são registrados na ordem em que são lidos, a mesma das amostras do dataset.
+        """
+        for member in tar:
+            if not member.isfile() or not member.name.endswith(self.extension):
+                continue
+
+            file = tar.extractfile(member)
+            if file is None:
+                continue
+
+            with file:
+                audio_bytes = file.read()
+
+            members.append({
+                'name': member.name,
+                'label': os.path.basename(os.path.dirname(member.name)),
+            })
+
+            yield {'audio': {'path': member.name, 'bytes': audio_bytes}}
@@ -0,0 +1,355 @@
+"""
+Módulo para transcrever um diretório inteiro de áudios com um modelo treinado,
+usando um pool de processos e um manifesto que permite retomar jobs interrompidos.
+
+Uso (a partir de src/):
+    python -m inference.batch_transcriber <diretório de entrada> <diretório de saída>
+"""
+
+import argparse
+import fnmatch
+import json
+import logging
+import multiprocessing
+import os
+import queue
+import tempfile
+import threading
+from dataclasses import asdict
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import torch
+import torch.nn as nn
+from midi.midi_converter import MidiConverter
+from controller.wav_controller import WavController
+from model.cnn import load_model, model_kwargs
+from inference.transcriber import SlidingWindowTranscriber
+
+MANIFEST_FILE = 'manifest.jsonl'
+
+# Estado de cada processo do pool, preenchido pelo initializer
+_worker_state: Dict[str, Any] = {}
+
+class JobManifest:
+    """
+    Manifesto append-only (JSON lines) com os arquivos já processados.
+
+    Cada arquivo é identificado pelo caminho, tamanho e data de modificação, então um
+    arquivo alterado depois de processado volta a ser transcrito.
+    """
+
+    def __init__(self, manifest_path: str) -> None:
+        """
+        Instancia um novo objeto JobManifest, carregando as entradas existentes.
+
+        :param manifest_path: Caminho do arquivo de manifesto.
+        """
+        self.manifest_path = manifest_path
+        self.entries: Dict[str, Dict[str, Any]] = {}
+
+        if os.path.exists(manifest_path):
+            with open(manifest_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        # Linha incompleta de uma execução interrompida no meio da escrita
+                        continue
+                    self.entries[entry['path']] = entry
+
+        self._file = open(manifest_path, 'a', encoding='utf-8')  # pylint: disable=consider-using-with
+
+    @staticmethod
+    def fingerprint(file_path: str) -> Dict[str, Any]:
+        """
+        Retorna os dados que identificam a versão de um arquivo.
+
+        :param file_path: Caminho do arquivo.
+        :return: Tamanho e data de modificação do arquivo.
+        """
+        stat = os.stat(file_path)
+        return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+    def is_done(self, file_path: str) -> bool:
+        """
+        Verifica se o arquivo já foi processado com sucesso, na versão atual.
+
+        :param file_path: Caminho do arquivo.
+        :return: True se o arquivo não precisa ser processado novamente.
+        """
+        entry = self.entries.get(file_path)
+
+        if entry is None or entry['status'] != 'done':
+            return False
+
+        return all(entry.get(key) == value for key, value in self.fingerprint(file_path).items())
+
+    def record(self, file_path: str, status: str, error: Optional[str] = None) -> None:
+        """
+        Registra o resultado do processamento de um arquivo, gravando-o imediatamente em disco.
+
+        :param file_path: Caminho do arquivo.
+        :param status: 'done' ou 'failed'.
+        :param error: Mensagem de erro, em caso de falha.
+        """
+        entry = {'path': file_path, 'status': status}
+        try:
+            entry.update(self.fingerprint(file_path))
+        except FileNotFoundError:
+            # O arquivo foi removido durante o job; sem a versão, is_done não o considera concluído
+            logging.warning('Arquivo %s removido durante o processamento.', file_path)
+        if error is not None:
+            entry['error'] = error
+
+        self._file.write(json.dumps(entry) + '\n')
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self.entries[file_path] = entry
+
+    def close(self) -> None:
+        """
+        Fecha o arquivo de manifesto.
+        """
+        self._file.close()
+
+def prefetch(iterable: Iterable[Any], depth: int = 2) -> Iterator[Any]:
+    """
+    Consome um iterável em uma thread de fundo, mantendo até depth itens prontos.
+    Usado para decodificar o próximo bloco de áudio enquanto o atual é processado.
+
+    :param iterable: Iterável a ser consumido.
+    :param depth: Número máximo de itens prontos na fila.
+    :return: Iterador com os mesmos itens, na mesma ordem.
+    """
+    items: queue.Queue = queue.Queue(maxsize=depth)
+    stop = threading.Event()
+    end = object()
+
+    def put(item: Any) -> bool:
+        # Espera com timeout para perceber quando o consumidor desistiu da iteração
+        while not stop.is_set():
+            try:
+                items.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce() -> None:
+        source = iter(iterable)
+        try:
+            for item in source:
+                if not put(item):
+                    return
+            put(end)
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            put(e)
+        finally:
+            # Fecha o gerador na própria thread, liberando o arquivo aberto por sf.blocks
+            if hasattr(source, 'close'):
+                source.close()
+
+    threading.Thread(target=produce, daemon=True).start()
+
+    try:
+        while (item := items.get()) is not end:
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        stop.set()
+
+def _init_worker(model: nn.Module, settings: Dict[str, Any]) -> None:
+    """
+    Inicializa um processo do pool com o modelo compartilhado.
+    """
+    torch.set_num_threads(settings['threads_per_worker'])
+
+    wav_controller = WavController(MidiConverter(), **settings['features'])
+    _worker_state['transcriber'] = SlidingWindowTranscriber(
+        model,
+        wav_controller,
+        sample_rate=wav_controller.sample_rate,
+        window_seconds=settings['window_seconds'],
+        hop_seconds=settings['hop_seconds'],
+        batch_size=settings['batch_size']
+    )
+    _worker_state['output_dir'] = settings['output_dir']
+    _worker_state['input_dir'] = settings['input_dir']
+
+def _transcribe(file_path: str) -> Tuple[str, Optional[str]]:
+    """
+    Transcreve um arquivo e grava o resultado de forma atômica.
+    :return: O caminho do arquivo e a mensagem de erro, se houver.
+    """
+    transcriber: SlidingWindowTranscriber = _worker_state['transcriber']
+
+    try:
+        # Os blocos do arquivo são lidos por uma thread enquanto o bloco atual é processado
+        blocks = prefetch(transcriber.read_blocks(file_path))
+        notes = [asdict(note) for note in transcriber.transcribe_stream(blocks)]
+
+        relative = os.path.relpath(file_path, _worker_state['input_dir'])
+        result_path = os.path.join(_worker_state['output_dir'], f'{relative}.json')
+        os.makedirs(os.path.dirname(result_path), exist_ok=True)
+
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(result_path), suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump({'path': file_path, 'notes': notes}, f)
+        os.replace(tmp_path, result_path)
+
+        return file_path, None
+    except Exception as e:  # pylint: disable=broad-exception-caught
+        return file_path, f'{type(e).__name__}: {e}'
+
+class BatchTranscriber:
+    """
+    Classe responsável por transcrever um diretório de áudios com um pool de processos.
+
+    O modelo é carregado uma única vez e compartilhado com os processos. Cada resultado é
+    gravado assim que fica pronto e registrado no manifesto, de modo que um job
+    interrompido pode ser retomado sem refazer os arquivos já concluídos.
+    """
+
+    def __init__(
+        self,
+        model: nn.Module,
+        output_dir: str,
+        num_workers: Optional[int] = None,
+        settings: Optional[Dict[str, Any]] = None
+    ) -> None:
+        """
+        Instancia um novo objeto BatchTranscriber.
+
+        :param model: Modelo treinado.
+        :param output_dir: Diretório onde os resultados e o manifesto serão gravados.
+        :param num_workers: Número de processos. Por padrão, usa todos os núcleos disponíveis.
+        :param settings: Parâmetros do SlidingWindowTranscriber (window_seconds, hop_seconds, batch_size)
+                         e, em 'features', os parâmetros do WavController usados no treinamento
+                         (feature_type, n_bins, sample_rate, dtype).
+        """
+        self.model = model.eval()
+        self.output_dir = output_dir
+        self.num_workers = num_workers or os.cpu_count() or 1
+        self.settings = {
+            'window_seconds': 4.0,
+            'hop_seconds': 1.0,
+            'batch_size': 16,
+            'features': {},
+            **(settings or {})
+        }
+
+        os.makedirs(self.output_dir, exist_ok=True)
+
+    def run(self, input_dir: str, pattern: str = '*.wav') -> Dict[str, int]:
+        """
+        Transcreve todos os arquivos do diretório que ainda não foram processados.
+
+        :param input_dir: Diretório com os arquivos de áudio (busca recursiva).
+        :param pattern: Padrão dos nomes de arquivo a processar.
+        :return: Contagem de arquivos concluídos, com falha e pulados.
+        """
+        manifest = JobManifest(os.path.join(self.output_dir, MANIFEST_FILE))
+        files = self.find_files(input_dir, pattern)
+        pending = [file_path for file_path in files if not manifest.is_done(file_path)]
+        counts = {'done': 0, 'failed': 0, 'skipped': len(files) - len(pending)}
+
+        logging.info(
+            '%s arquivos encontrados, %s já processados, %s pendentes.',
+            len(files),
+            counts['skipped'],
+            len(pending)
+        )
+
+        settings = {
+            **self.settings,
+            'input_dir': input_dir,
+            'output_dir': self.output_dir,
+            'threads_per_worker': max(1, (os.cpu_count() or 1) // self.num_workers),
+        }
+
+        # Em shared memory, o modelo não é copiado para cada processo
+        self.model.share_memory()
+
+        try:
+            with multiprocessing.Pool(
+                processes=self.num_workers,
+                initializer=_init_worker,
+                initargs=(self.model, settings)
+            ) as pool:
+                for file_path, error in pool.imap_unordered(_transcribe, pending):
+                    if error is None:
+                        manifest.record(file_path, 'done')
+                        counts['done'] += 1
+                    else:
+                        logging.error('Erro ao transcrever %s: %s', file_path, error)
+                        manifest.record(file_path, 'failed', error)
+                        counts['failed'] += 1
+        finally:
+            manifest.close()
+
+        logging.info('Transcrição em lote finalizada: %s', counts)
+        return counts
+
+    @staticmethod
+    def find_files(input_dir: str, pattern: str) -> List[str]:
+        """
+        Lista, em ordem, os arquivos do diretório que seguem o padrão.
+
+        :param input_dir: Diretório de entrada.
+        :param pattern: Padrão dos nomes de arquivo.
+        :return: Lista dos caminhos encontrados.
+        """
+        files = []
+        for root, _, names in os.walk(input_dir):
+            for name in names:
+                if fnmatch.fnmatch(name, pattern):
+                    files.append(os.path.join(root, name))
+        return sorted(files)
+
+def main(argv: Optional[List[str]] = None) -> Dict[str, int]:
+    """
+    Ponto de entrada da transcrição em lote.
+    """
+    parser = argparse.ArgumentParser(description='Transcreve um diretório de áudios com o modelo treinado.')
+    parser.add_argument('input_dir', help='Diretório com os arquivos de áudio.')
+    parser.add_argument('output_dir', help='Diretório onde os resultados serão gravados.')
+    parser.add_argument('--model', default='trained_cnn_model.pth', help='Caminho do modelo treinado.')
+    parser.add_argument('--architecture', default='pooled', help='Arquitetura do modelo.')
+    parser.add_argument('--workers', type=int, default=None, help='Número de processos.')
+    parser.add_argument('--pattern', default='*.wav', help='Padrão dos nomes de arquivo.')
+    parser.add_argument('--window-seconds', type=float, default=4.0)
+    parser.add_argument('--hop-seconds', type=float, default=1.0)
+    parser.add_argument('--batch-size', type=int, default=16)
+    parser.add_argument('--sample-rate', type=int, default=16000)
+    parser.add_argument('--feature-type', default='stft', help="Tipo de espectrograma ('stft', 'mel' ou 'cqt').")
+    parser.add_argument('--feature-bins', type=int, default=None, help='Número de faixas (mel e CQT).')
+    parser.add_argument('--feature-dtype', default='float32', help="Tipo dos espectrogramas ('float32' ou 'float16').")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+
+    # Mesmas features do treinamento: o modelo 'flatten' depende do formato exato da janela
+    features = {
+        'feature_type': args.feature_type,
+        'n_bins': args.feature_bins,
+        'sample_rate': args.sample_rate,
+        'dtype': args.feature_dtype,
+    }
+    input_shape = WavController(MidiConverter(), **features).feature_shape(int(args.window_seconds * args.sample_rate))
+    model = load_model(args.model, args.architecture, **model_kwargs(args.architecture, input_shape))
+
+    return BatchTranscriber(
+        model,
+        args.output_dir,
+        num_workers=args.workers,
+        settings={
+            'window_seconds': args.window_seconds,
+            'hop_seconds': args.hop_seconds,
+            'batch_size': args.batch_size,
+            'features': features,
+        }
+    ).run(args.input_dir, args.pattern)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,408 @@
+"""
+Módulo para exportar o modelo treinado para inferência em CPU: quantização int8
+(dinâmica e estática), artefatos TorchScript e ONNX, e um relatório de acurácia e
+latência de cada artefato em relação ao modelo fp32.
+"""
+
+import copy
+import inspect
+import json
+import logging
+import os
+from dataclasses import asdict, dataclass, field
+from itertools import islice
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+import torch
+import torch.nn as nn
+from torch.ao.quantization import get_default_qconfig_mapping
+from torch.ao.quantization.quantize_fx import convert_fx, prepare_fx
+from torch.utils.data import DataLoader
+from telemetry.stage_timing import measure
+
+MANIFEST_FILE = 'export.json'
+ONNX_INPUT = 'spectrogram'
+ONNX_OUTPUT = 'pitch'
+
+class SpectrogramModel(nn.Module):
+    """
+    Envolve o modelo para receber apenas o lote de espectrogramas (sem a máscara de padding),
+    que é a interface rastreada pela quantização FX, pelo TorchScript e pelo ONNX.
+    """
+
+    def __init__(self, model: nn.Module) -> None:
+        """
+        :param model: Modelo treinado.
+        """
+        super().__init__()
+        self.model = model
+
+    def forward(self, spectrogram: torch.Tensor) -> torch.Tensor:
+        """
+        :param spectrogram: Tensor (lote, 1, frequências, frames).
+        :return: Saída do modelo (lote, 1).
+        """
+        return self.model(spectrogram)
+
+class OnnxRuntimeModel(nn.Module):
+    """
+    Executa um modelo ONNX com o onnxruntime, com a interface de um nn.Module.
+    O onnxruntime é opcional e só é importado aqui.
+    """
+
+    def __init__(self, model_path: str, num_threads: Optional[int] = None) -> None:
+        """
+        :param model_path: Caminho do arquivo .onnx.
+        :param num_threads: Threads da sessão. Por padrão, definido pelo onnxruntime.
+        """
+        super().__init__()
+        import onnxruntime  # pylint: disable=import-outside-toplevel
+
+        options = onnxruntime.SessionOptions()
+        options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if num_threads:
+            options.intra_op_num_threads = num_threads
+
+        self.session = onnxruntime.InferenceSession(model_path, options, providers=['CPUExecutionProvider'])
+
+    def forward(self, spectrogram: torch.Tensor) -> torch.Tensor:
+        """
+        :param spectrogram: Tensor (lote, 1, frequências, frames).
+        :return: Saída do modelo (lote, 1).
+        """
+        outputs = self.session.run(None, {ONNX_INPUT: spectrogram.detach().cpu().float().numpy()})
+        return torch.from_numpy(outputs[0])
+
+@dataclass
+class ExportReport:
+    """
+    Acurácia e desempenho de um artefato exportado.
+
+    :param name: Nome do artefato (ex. 'int8_static').
+    :param format: Formato do artefato ('eager', 'torchscript' ou 'onnx').
+    :param file: Nome do arquivo no diretório de exportação (None para o modelo eager).
+    :param size_bytes: Tamanho do arquivo.
+    :param accuracy: Fração das amostras com a nota (saída arredondada) correta.
+    :param mean_abs_error: Erro absoluto médio da saída, em semitons.
+    :param latency_ms: Percentis (p50, p95, p99) e média da latência por lote.
+    :param samples_per_second: Throughput em amostras por segundo.
+    :param accuracy_delta: Diferença de acurácia em relação ao fp32 eager, em pontos percentuais.
+    :param speedup: Throughput em relação ao fp32 eager.
+    """
+    name: str
+    format: str
+    file: Optional[str]
+    size_bytes: int
+    accuracy: float
+    mean_abs_error: float
+    latency_ms: Dict[str, float] = field(default_factory=dict)
+    samples_per_second: float = 0.0
+    accuracy_delta: float = 0.0
+    speedup: float = 1.0
+
+def quantization_engine() -> str:
+    """
+    Retorna o backend de quantização da CPU atual (x86/fbgemm ou qnnpack em ARM).
+    """
+    engines = torch.backends.quantized.supported_engines
+
+    for engine in ('x86', 'fbgemm', 'qnnpack'):
+        if engine in engines:
+            return engine
+
+    raise RuntimeError('Nenhum backend de quantização disponível nesta CPU.')
+
+def quantize_dynamic(model: nn.Module) -> nn.Module:
+    """
+    Quantiza dinamicamente (int8) as camadas lineares. As convoluções continuam em fp32,
+    então o ganho se concentra nas fully connected (ex. a fc1 do SpectrogramCNN).
+
+    :param model: Modelo treinado (não é alterado).
+    :return: O modelo quantizado.
+    """
+    return torch.ao.quantization.quantize_dynamic(
+        SpectrogramModel(copy.deepcopy(model)).eval(),
+        {nn.Linear},
+        dtype=torch.qint8
+    )
+
+def quantize_static(model: nn.Module, calibration: Sequence[torch.Tensor]) -> nn.Module:
+    """
+    Quantiza estaticamente (int8) convoluções e camadas lineares. As escalas das ativações
+    são calibradas com lotes reais de espectrogramas.
+
+    :param model: Modelo treinado (não é alterado).
+    :param calibration: Lotes de espectrogramas usados na calibração.
+    :return: O modelo quantizado.
+    """
+    engine = quantization_engine()
+    torch.backends.quantized.engine = engine
+
+    prepared = prepare_fx(
+        SpectrogramModel(copy.deepcopy(model)).eval(),
+        get_default_qconfig_mapping(engine),
+        (calibration[0],)
+    )
+
+    with torch.no_grad():
+        for spectrograms in calibration:
+            prepared(spectrograms)
+
+    return convert_fx(prepared)
+
+def load_artifact(export_dir: str, artifact: Dict[str, Any], num_threads: Optional[int] = None) -> nn.Module:
+    """
+    Carrega um artefato exportado.
+
+    :param export_dir: Diretório de exportação.
+    :param artifact: Entrada do manifesto (ver ExportReport).
+    :param num_threads: Threads usadas pelo onnxruntime (opcional).
+    :return: O modelo, pronto para inferência.
+    """
+    path = os.path.join(export_dir, artifact['file'])
+
+    if artifact['format'] == 'onnx':
+        return OnnxRuntimeModel(path, num_threads)
+
+    return torch.jit.load(path, map_location='cpu').eval()
+
+def load_inference_model(
+    export_dir: str,
+    max_accuracy_drop: float = 1.0,
+    num_threads: Optional[int] = None
+) -> Tuple[str, nn.Module]:
+    """
+    Carrega o artefato mais rápido (menor latência p50 medida na exportação) que puder ser
+    usado neste ambiente. Um artefato ONNX é pulado se o onnxruntime não estiver instalado.
+
+    :param export_dir: Diretório de exportação.
+    :param max_accuracy_drop: Maior perda de acurácia aceita em relação ao fp32, em pontos percentuais.
+    :param num_threads: Threads usadas pelo onnxruntime (opcional).
+    :return: O nome do artefato e o modelo.
+    """
+    with open(os.path.join(export_dir, MANIFEST_FILE), 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+
+    # Os artefatos int8 só rodam com o mesmo backend de quantização da exportação
+    if manifest.get('quantization_engine') in torch.backends.quantized.supported_engines:
+        torch.backends.quantized.engine = manifest['quantization_engine']
+
+    for artifact in sorted(manifest['artifacts'], key=lambda item: item['latency_ms']['p50']):
+        if artifact['accuracy_delta'] < -max_accuracy_drop:
+            logging.info('Artefato %s descartado: %+.2f pp de acurácia.', artifact['name'], artifact['accuracy_delta'])
+            continue
+
+        try:
+            model = load_artifact(export_dir, artifact, num_threads)
+        except (ImportError, RuntimeError, OSError) as e:
+            logging.warning('Artefato %s indisponível: %s', artifact['name'], e)
+            continue
+
+        logging.info('Usando o artefato %s (%s).', artifact['name'], artifact['format'])
+        return artifact['name'], model
+
+    raise RuntimeError(f'Nenhum artefato utilizável em {export_dir}.')
+
+class ModelExporter:
+    """
+    Classe responsável por gerar os artefatos de inferência do modelo treinado.
+
+    A partir do modelo fp32 são gerados um modelo com as camadas lineares quantizadas
+    dinamicamente e um com convoluções e lineares quantizadas estaticamente (calibrado
+    em lotes do dataset de treinamento). Cada um é salvo em TorchScript (congelado) e o
+    fp32 também em ONNX, se o pacote onnx estiver instalado. Cada artefato é recarregado
+    do disco e comparado com o modelo fp32 eager em acurácia e latência.
+    """
+
+    def __init__(self, model: nn.Module, output_dir: str) -> None:
+        """
+        Instancia um novo objeto ModelExporter.
+
+        :param model: Modelo treinado (fp32).
+        :param output_dir: Diretório onde os artefatos e o manifesto serão gravados.
+        """
+        self.model = model.cpu().eval()
+        self.output_dir = output_dir
+
+        os.makedirs(self.output_dir, exist_ok=True)
+
+    def export(
+        self,
+        data_loader: DataLoader,
+        calibration_batches: int = 32,
+        evaluation_batches: int = 50,
+        evaluation_loader: Optional[DataLoader] = None
+    ) -> List[ExportReport]:
+        """
+        Gera os artefatos, mede cada um e grava o manifesto.
+
+        :param data_loader: DataLoader do dataset de treinamento. Os primeiros lotes calibram a
+            quantização estática e, sem evaluation_loader, os seguintes são usados na avaliação.
+        :param calibration_batches: Número de lotes de calibração.
+        :param evaluation_batches: Número de lotes de avaliação.
+        :param evaluation_loader: DataLoader de avaliação (opcional).
+        :return: O relatório de cada artefato, começando pelo fp32 eager.
+        """
+        batches = iter(data_loader)
+        calibration = [spectrograms for spectrograms, _ in islice(self.__unpack(batches), calibration_batches)]
+        evaluation = list(islice(
+            self.__unpack(iter(evaluation_loader) if evaluation_loader is not None else batches),
+            evaluation_batches
+        ))
+
+        if not calibration or not evaluation:
+            raise ValueError('O DataLoader não tem lotes suficientes para calibrar e avaliar.')
+
+        logging.info('Quantizando o modelo (%s lotes de calibração)...', len(calibration))
+        variants = {
+            'fp32': SpectrogramModel(copy.deepcopy(self.model)).eval(),
+            'int8_dynamic': quantize_dynamic(self.model),
+            'int8_static': quantize_static(self.model, calibration),
+        }
+
+        artifacts = []
+        for name, variant in variants.items():
+            artifacts.append(self.__save_torchscript(name, variant, calibration[0]))
+
+        onnx_artifact = self.__save_onnx('fp32', variants['fp32'], calibration[0])
+        if onnx_artifact is not None:
+            artifacts.append(onnx_artifact)
+
+        baseline = self.__evaluate('eager_fp32', 'eager', None, variants['fp32'], evaluation)
+        reports = [baseline]
+
+        for name, artifact_format, file_name in artifacts:
+            model = load_artifact(self.output_dir, {'format': artifact_format, 'file': file_name})
+            reports.append(self.__evaluate(name, artifact_format, file_name, model, evaluation, baseline))
+
+        self.__write_manifest(reports)
+        return reports
+
+    def __save_torchscript(self, name: str, model: nn.Module, example: torch.Tensor) -> Tuple[str, str, str]:
+        """
+        Salva o modelo rastreado e congelado (BatchNorm incorporado às convoluções) em TorchScript.
+        """
+        file_name = f'{name}.pt'
+
+        with torch.no_grad():
+            scripted = torch.jit.freeze(torch.jit.trace(model, example).eval())
+
+        torch.jit.save(scripted, os.path.join(self.output_dir, file_name))
+        return f'torchscript_{name}', 'torchscript', file_name
+
+    def __save_onnx(self, name: str, model: nn.Module, example: torch.Tensor) -> Optional[Tuple[str, str, str]]:
+        """
+        Exporta o modelo para ONNX, com o lote dinâmico. O número de frames fica fixo no do
+        exemplo (a duração da janela): o pooling adaptativo não é exportável com ele dinâmico.
+        Retorna None se o exportador não estiver disponível (o pacote onnx é opcional).
+        """
+        file_name = f'{name}.onnx'
+
+        kwargs = {}
+        if 'dynamo' in inspect.signature(torch.onnx.export).parameters:
+            # O exportador baseado em TorchScript não depende do onnxscript
+            kwargs['dynamo'] = False
+
+        try:
+            torch.onnx.export(
+                model,
+                (example,),
+                os.path.join(self.output_dir, file_name),
+                input_names=[ONNX_INPUT],
+                output_names=[ONNX_OUTPUT],
+                dynamic_axes={ONNX_INPUT: {0: 'batch'}, ONNX_OUTPUT: {0: 'batch'}},
+                **kwargs
+            )
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            logging.warning('Modelo não exportado para ONNX: %s', str(e).splitlines()[0])
+            return None
+
+        return f'onnx_{name}', 'onnx', file_name
+
+    def __evaluate(
+        self,
+        name: str,
+        artifact_format: str,
+        file_name: Optional[str],
+        model: nn.Module,
+        evaluation: List[Tuple[torch.Tensor, torch.Tensor]],
+        baseline: Optional[ExportReport] = None
+    ) -> ExportReport:
+        """
+        Mede a acurácia e a latência por lote de um artefato.
+        """
+        outputs = []
+
+        with torch.inference_mode():
+            # Aquecimento: o TorchScript otimiza o grafo nas primeiras execuções
+            for spectrograms, _ in evaluation[:2]:
+                model(spectrograms)
+
+            result = measure(
+                name,
+                lambda batch: outputs.append(model(batch[0]).float().reshape(-1)),
+                evaluation,
+                unit='lote',
+                trace_memory=False
+            )
+
+        predictions = torch.cat(outputs).numpy()
+        labels = torch.cat([labels for _, labels in evaluation]).float().numpy()
+        num_samples = len(labels)
+
+        accuracy = float(np.mean(np.rint(predictions) == labels))
+        samples_per_second = num_samples / result.total_seconds if result.total_seconds > 0 else 0.0
+
+        report = ExportReport(
+            name=name,
+            format=artifact_format,
+            file=file_name,
+            size_bytes=os.path.getsize(os.path.join(self.output_dir, file_name)) if file_name else 0,
+            accuracy=accuracy,
+            mean_abs_error=float(np.mean(np.abs(predictions - labels))),
+            latency_ms=result.latency_ms,
+            samples_per_second=samples_per_second
+        )
+
+        if baseline is not None:
+            report.accuracy_delta = 100 * (accuracy - baseline.accuracy)
+            report.speedup = samples_per_second / baseline.samples_per_second if baseline.samples_per_second else 0.0
+
+        logging.info(
+            '%-14s acurácia %6.2f%% (%+.2f pp)  erro médio %.3f  %8.1f amostras/s (%.2fx)  %7.1f KB',
+            name,
+            100 * report.accuracy,
+            report.accuracy_delta,
+            report.mean_abs_error,
+            report.samples_per_second,
+            report.speedup,
+            report.size_bytes / 1024
+        )
+        return report
+
+    def __write_manifest(self, reports: List[ExportReport]) -> None:
+        """
+        Grava o manifesto com os artefatos e o relatório de cada um.
+        """
+        manifest = {
+            'quantization_engine': torch.backends.quantized.engine,
+            'baseline': asdict(reports[0]),
+            'artifacts': [asdict(report) for report in reports[1:]],
+        }
+
+        path = os.path.join(self.output_dir, MANIFEST_FILE)
+        with open(f'{path}.tmp', 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(f'{path}.tmp', path)
+
+        logging.info('Artefatos exportados em %s.', self.output_dir)
+
+    @staticmethod
+    def __unpack(batches: Iterator[Any]) -> Iterator[Tuple[torch.Tensor, torch.Tensor]]:
+        """
+        Extrai os espectrogramas (em float32) e os rótulos dos lotes. A máscara de padding,
+        se houver, é descartada: os artefatos recebem apenas os espectrogramas.
+        """
+        for batch in batches:
+            yield batch[0].float(), batch[1]
@@ -0,0 +1,677 @@
+"""
+Módulo com o servidor HTTP de inferência, com o modelo residente em memória e
+micro-batching dinâmico das requisições concorrentes.
+
+Uso (a partir de src/):
+    python -m inference.server --model trained_cnn_model.pth --port 8080
+
+Endpoints:
+    POST /predict  Áudio WAV (Content-Type audio/wav) ou PCM mono
+                   (application/octet-stream, ?format=pcm16|float32&sample_rate=16000).
+    GET  /metrics  Métricas no formato de texto do Prometheus.
+    GET  /healthz  200 quando o servidor está aquecido e pronto.
+"""
+
+import argparse
+import asyncio
+import collections
+import concurrent.futures
+import json
+import logging
+import time
+from http import HTTPStatus
+from typing import Any, Deque, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+import librosa
+import numpy as np
+import soundfile as sf
+import torch
+import torch.nn as nn
+from midi.midi_converter import MidiConverter
+from controller.wav_controller import WavController
+from model.cnn import load_model, model_kwargs
+from inference.export import load_inference_model
+from telemetry.instrumentation import Instrumentation, prometheus_text
+
+PCM_FORMATS = {
+    'pcm16': (np.int16, 1 / 32768),
+    'float32': (np.float32, 1.0),
+}
+
+WAV_CONTENT_TYPES = ('audio/wav', 'audio/x-wav', 'audio/wave')
+
+# Erros de decodificação e validação do áudio enviado, que são respondidos com 400
+INVALID_AUDIO_ERRORS = (sf.SoundFileError, librosa.util.exceptions.ParameterError, ValueError)
+
+# Estado de cada processo do pool de features, preenchido pelo initializer
+_worker_state: Dict[str, Any] = {}
+
+class HTTPError(Exception):
+    """
+    Erro retornado ao cliente com o status HTTP correspondente.
+    """
+
+    def __init__(self, status: HTTPStatus, message: str) -> None:
+        super().__init__(message)
+        self.status = status
+
+def _init_worker(wav_controller: WavController) -> None:
+    """
+    Inicializa um processo do pool de features. Cada processo usa um único thread do torch,
+    pois o paralelismo vem do próprio pool.
+    """
+    torch.set_num_threads(1)
+    _worker_state['wav_controller'] = wav_controller
+
+def _compute_features(payload: bytes, pcm_format: Optional[str], n_frames: int) -> np.ndarray:
+    """
+    Decodifica o áudio e calcula o espectrograma, em um processo do pool.
+
+    :param payload: Arquivo WAV ou amostras PCM.
+    :param pcm_format: Formato das amostras PCM, ou None para WAV.
+    :param n_frames: Número de frames esperado pelo modelo.
+    :return: O espectrograma, com padding ou cortado para n_frames frames.
+    """
+    wav_controller: WavController = _worker_state['wav_controller']
+
+    if pcm_format is None:
+        waveform = wav_controller.decode_audio(payload)
+    else:
+        dtype, scale = PCM_FORMATS[pcm_format]
+        waveform = np.frombuffer(payload, dtype=dtype).astype(np.float32) * scale
+
+    spectrogram = wav_controller.compute_spectrogram(waveform)
+
+    # Áudios de durações diferentes passam a ter o mesmo formato e podem entrar no mesmo lote
+    if spectrogram.shape[-1] > n_frames:
+        return np.ascontiguousarray(spectrogram[..., :n_frames])
+
+    # O padding usa o piso do espectrograma em dB (silêncio), como o PadCollate do treinamento
+    top_db = wav_controller.top_db
+    pad_value = -top_db if top_db is not None else float(spectrogram.min(initial=0.0))
+    padding = [(0, 0)] * (spectrogram.ndim - 1) + [(0, n_frames - spectrogram.shape[-1])]
+    return np.pad(spectrogram, padding, constant_values=pad_value)
+
+class LatencyWindow:
+    """
+    Janela com as últimas latências observadas, para calcular percentis.
+    """
+
+    def __init__(self, size: int = 10000) -> None:
+        """
+        :param size: Número de latências mantidas.
+        """
+        self.values: Deque[float] = collections.deque(maxlen=size)
+
+    def add(self, seconds: float) -> None:
+        """
+        Registra uma latência, em segundos.
+        """
+        self.values.append(seconds)
+
+    def percentiles(self) -> Dict[str, float]:
+        """
+        Retorna os percentis p50, p95 e p99 da janela, em segundos.
+        """
+        if not self.values:
+            return {'p50': 0.0, 'p95': 0.0, 'p99': 0.0}
+
+        p50, p95, p99 = np.percentile(np.fromiter(self.values, dtype=np.float64), (50, 95, 99))
+        return {'p50': float(p50), 'p95': float(p95), 'p99': float(p99)}
+
+class MicroBatcher:
+    """
+    Classe que junta as requisições concorrentes em lotes para o modelo.
+
+    Cada lote é fechado quando atinge max_batch_size ou quando a primeira requisição do lote
+    espera max_wait_ms, o que limita a latência adicionada pelo batching. O modelo roda em uma
+    thread dedicada (o torch libera o GIL), sem bloquear o event loop; enquanto um lote é
+    calculado, as requisições seguintes se acumulam para o próximo.
+    """
+
+    def __init__(
+        self,
+        model: nn.Module,
+        max_batch_size: int = 32,
+        max_wait_ms: float = 5.0,
+        instrumentation: Optional[Instrumentation] = None
+    ) -> None:
+        """
+        Instancia um novo objeto MicroBatcher.
+
+        :param model: Modelo em modo de avaliação.
+        :param max_batch_size: Número máximo de requisições por lote.
+        :param max_wait_ms: Tempo máximo que a primeira requisição de um lote espera por outras.
+        :param instrumentation: Métricas do servidor (opcional).
+        """
+        if max_batch_size < 1:
+            raise ValueError('O tamanho máximo do lote deve ser maior que zero.')
+
+        self.model = model.eval()
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.instrumentation = instrumentation or Instrumentation(sinks=[])
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix='model')
+
+    @property
+    def queue_depth(self) -> int:
+        """
+        Número de requisições esperando um lote.
+        """
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def start(self) -> None:
+        """
+        Inicia o loop de batching no event loop atual.
+        """
+        self._queue = asyncio.Queue()
+        self._task = asyncio.get_running_loop().create_task(self.__run())
+
+    async def stop(self) -> None:
+        """
+        Interrompe o loop de batching.
+        """
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+        self._executor.shutdown(wait=True)
+
+    def warmup(self, input_shape: Tuple[int, int]) -> None:
+        """
+        Executa o modelo com lotes de todos os tamanhos que o batching pode formar
+        (potências de 2 até max_batch_size), para que as primeiras requisições não paguem
+        a alocação de memória e a otimização do grafo (TorchScript).
+
+        :param input_shape: Formato (frequências, frames) dos espectrogramas.
+        """
+        sizes = sorted({min(2 ** i, self.max_batch_size) for i in range(self.max_batch_size.bit_length() + 1)})
+
+        with torch.inference_mode():
+            for size in sizes:
+                for _ in range(2):
+                    self.model(torch.zeros(size, 1, *input_shape))
+
+        logging.info('Modelo aquecido com lotes de %s.', sizes)
+
+    async def submit(self, spectrogram: np.ndarray, deadline: float = float('inf')) -> float:
+        """
+        Enfileira um espectrograma e espera a saída do modelo.
+
+        :param spectrogram: Espectrograma (frequências, frames).
+        :param deadline: Instante (time.perf_counter) após o qual a requisição é descartada
+                         sem passar pelo modelo, com asyncio.TimeoutError.
+        :return: A saída do modelo (pitch MIDI, não arredondado).
+        """
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((spectrogram, future, time.perf_counter(), deadline))
+        return await future
+
+    async def __run(self) -> None:
+        """
+        Loop que forma os lotes e os envia ao modelo.
+        """
+        loop = asyncio.get_running_loop()
+
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait
+
+            while len(batch) < self.max_batch_size:
+                # Pega o que já está na fila sem esperar; só então espera até o prazo
+                if not self._queue.empty():
+                    batch.append(self._queue.get_nowait())
+                    continue
+
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            await self.__run_batch(batch)
+
+    async def __run_batch(self, batch: List[Tuple[np.ndarray, asyncio.Future, float, float]]) -> None:
+        """
+        Executa o modelo em um lote, agrupando os espectrogramas de mesmo formato.
+        """
+        loop = asyncio.get_running_loop()
+        metrics = self.instrumentation
+        started = time.perf_counter()
+
+        groups: Dict[Tuple[int, ...], List[Tuple[np.ndarray, asyncio.Future, float, float]]] = {}
+        for item in batch:
+            spectrogram, future, enqueued, deadline = item
+            if future.done():
+                continue
+            metrics.observe('queue_wait', started - enqueued)
+            # Com o servidor sobrecarregado, descarta as requisições que já estouraram o prazo
+            # em vez de gastar o modelo com respostas que chegariam tarde demais
+            if started > deadline:
+                metrics.increment('expired')
+                future.set_exception(asyncio.TimeoutError())
+                continue
+            groups.setdefault(spectrogram.shape, []).append(item)
+
+        for items in groups.values():
+            try:
+                outputs = await loop.run_in_executor(self._executor, self.__predict, [item[0] for item in items])
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                logging.error('Erro ao executar o modelo: %s', e)
+                for _, future, _, _ in items:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            for (_, future, _, _), output in zip(items, outputs):
+                # A requisição pode ter sido cancelada (cliente desconectado)
+                if not future.done():
+                    future.set_result(output)
+
+            metrics.increment('batches')
+            metrics.increment('batched_requests', len(items))
+            metrics.gauge('last_batch_size', len(items))
+
+        metrics.observe('batch', time.perf_counter() - started)
+
+    def __predict(self, spectrograms: List[np.ndarray]) -> List[float]:
+        """
+        Executa o modelo em um lote de espectrogramas de mesmo formato.
+        """
+        batch = torch.from_numpy(np.stack(spectrograms).astype(np.float32, copy=False)).unsqueeze(1)
+
+        with torch.inference_mode():
+            return self.model(batch).float().reshape(-1).tolist()
+
+class InferenceServer:
+    """
+    Servidor HTTP (asyncio) de inferência.
+
+    O modelo fica residente e é aquecido antes de o servidor aceitar conexões. A decodificação
+    e o espectrograma de cada requisição rodam em um pool de processos (ou threads) também
+    aquecido, e o modelo roda em lotes formados pelo MicroBatcher. Quando a fila passa de
+    max_queue requisições, novas requisições recebem 503, para que a latência das aceitas
+    continue limitada; as que esperam um lote além de request_timeout_ms também recebem 503.
+    """
+
+    def __init__(
+        self,
+        model: nn.Module,
+        wav_controller: WavController,
+        midi_converter: MidiConverter,
+        input_shape: Tuple[int, int],
+        max_batch_size: int = 32,
+        max_wait_ms: float = 5.0,
+        feature_workers: int = 1,
+        feature_executor: str = 'process',
+        max_queue: int = 256,
+        request_timeout_ms: float = 1000.0,
+        max_body_bytes: int = 16 * 1024 ** 2
+    ) -> None:
+        """
+        Instancia um novo objeto InferenceServer.
+
+        :param model: Modelo em modo de avaliação.
+        :param wav_controller: WavController usado para calcular os espectrogramas.
+        :param midi_converter: MidiConverter usado para converter a saída em nomes de notas.
+        :param input_shape: Formato (frequências, frames) esperado pelo modelo. Os espectrogramas
+                            das requisições recebem padding ou são cortados para esse formato.
+        :param max_batch_size: Número máximo de requisições por lote.
+        :param max_wait_ms: Tempo máximo de espera para formar um lote.
+        :param feature_workers: Número de processos (ou threads) que calculam os espectrogramas.
+        :param feature_executor: 'process' ou 'thread'.
+        :param max_queue: Número máximo de requisições em processamento antes de recusar novas.
+        :param request_timeout_ms: Prazo de cada requisição; as que não chegam ao modelo
+                                   dentro dele recebem 503.
+        :param max_body_bytes: Tamanho máximo do corpo de uma requisição.
+        """
+        if feature_executor not in ('process', 'thread'):
+            raise ValueError("O executor de features deve ser 'process' ou 'thread'.")
+
+        self.wav_controller = wav_controller
+        self.midi_converter = midi_converter
+        self.input_shape = input_shape
+        self.feature_workers = feature_workers
+        self.feature_executor = feature_executor
+        self.max_queue = max_queue
+        self.request_timeout = request_timeout_ms / 1000
+        self.max_body_bytes = max_body_bytes
+
+        self.instrumentation = Instrumentation(sinks=[])
+        self.latencies = LatencyWindow()
+        self.batcher = MicroBatcher(model, max_batch_size, max_wait_ms, self.instrumentation)
+
+        self.ready = False
+        self._in_flight = 0
+        self._pool: Optional[concurrent.futures.Executor] = None
+
+    async def serve(self, host: str = '127.0.0.1', port: int = 8080) -> None:
+        """
+        Aquece o modelo e o pool de features e atende as conexões até ser cancelado.
+
+        :param host: Endereço de escuta.
+        :param port: Porta de escuta.
+        """
+        await self.start()
+        server = await asyncio.start_server(self.handle_connection, host, port, backlog=1024)
+
+        logging.info('Servidor de inferência em http://%s:%s', host, port)
+
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            await self.stop()
+
+    async def start(self) -> None:
+        """
+        Cria e aquece o pool de features e o modelo.
+        """
+        if self.feature_executor == 'process':
+            self._pool = concurrent.futures.ProcessPoolExecutor(
+                max_workers=self.feature_workers,
+                initializer=_init_worker,
+                initargs=(self.wav_controller,)
+            )
+        else:
+            _init_worker(self.wav_controller)
+            self._pool = concurrent.futures.ThreadPoolExecutor(
+                max_workers=self.feature_workers,
+                thread_name_prefix='features'
+            )
+
+        loop = asyncio.get_running_loop()
+        silence = np.zeros(self.wav_controller.hop_length * (self.input_shape[1] - 1), dtype=np.float32)
+
+        # Um cálculo por worker: inicia os processos e compila as funções do librosa (numba)
+        await asyncio.gather(*(
+            loop.run_in_executor(self._pool, _compute_features, silence.tobytes(), 'float32', self.input_shape[1])
+            for _ in range(self.feature_workers)
+        ))
+        await loop.run_in_executor(None, self.batcher.warmup, self.input_shape)
+
+        self.batcher.start()
+        self.ready = True
+
+    async def stop(self) -> None:
+        """
+        Encerra o batching e o pool de features.
+        """
+        self.ready = False
+        await self.batcher.stop()
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """
+        Atende as requisições de uma conexão (HTTP/1.1 com keep-alive).
+        """
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+
+                method, target, version = request_line.decode('latin-1').split()
+                headers = await self.__read_headers(reader)
+
+                try:
+                    length = headers.get('content-length', '0')
+                    if not length.isdigit():
+                        raise HTTPError(HTTPStatus.BAD_REQUEST, 'Content-Length inválido.')
+
+                    length = int(length)
+                    if length > self.max_body_bytes:
+                        raise HTTPError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, 'Corpo da requisição muito grande.')
+
+                    body = await reader.readexactly(length) if length else b''
+                    status, content_type, payload = await self.__route(method, target, headers, body)
+                except HTTPError as e:
+                    status, content_type, payload = e.status, 'application/json', json.dumps({'error': str(e)})
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    raise
+                except Exception:  # pylint: disable=broad-exception-caught
+                    logging.exception('Erro inesperado ao atender %s %s.', method, target)
+                    status, content_type, payload = (
+                        HTTPStatus.INTERNAL_SERVER_ERROR,
+                        'application/json',
+                        json.dumps({'error': 'Erro interno do servidor.'})
+                    )
+
+                keep_alive = version == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close'
+                self.__write_response(writer, status, content_type, payload.encode('utf-8'), keep_alive)
+                await writer.drain()
+
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            # Conexão encerrada pelo cliente ou requisição malformada
+            pass
+        finally:
+            writer.close()
+
+    async def predict(self, body: bytes, pcm_format: Optional[str]) -> Dict[str, Any]:
+        """
+        Calcula o espectrograma e a nota de um áudio.
+
+        :param body: Arquivo WAV ou amostras PCM.
+        :param pcm_format: Formato das amostras PCM, ou None para WAV.
+        :return: A nota prevista (número MIDI e nome) e a saída do modelo.
+        """
+        if self._in_flight >= self.max_queue:
+            self.instrumentation.increment('rejected')
+            raise HTTPError(HTTPStatus.SERVICE_UNAVAILABLE, 'Servidor sobrecarregado.')
+
+        self._in_flight += 1
+        started = time.perf_counter()
+
+        try:
+            loop = asyncio.get_running_loop()
+            try:
+                spectrogram = await loop.run_in_executor(
+                    self._pool, _compute_features, body, pcm_format, self.input_shape[1]
+                )
+            except concurrent.futures.BrokenExecutor as e:
+                # Um worker morreu (ex. OOM): o pool não aceita mais tarefas até o servidor reiniciar
+                logging.error('Pool de features quebrado: %s', e)
+                self.ready = False
+                raise HTTPError(HTTPStatus.SERVICE_UNAVAILABLE, 'Pool de features indisponível.') from e
+            except INVALID_AUDIO_ERRORS as e:
+                raise HTTPError(HTTPStatus.BAD_REQUEST, f'Áudio inválido: {e}') from e
+
+            if spectrogram.shape != tuple(self.input_shape):
+                raise HTTPError(
+                    HTTPStatus.BAD_REQUEST,
+                    f'Espectrograma de formato {spectrogram.shape}; o modelo espera {tuple(self.input_shape)}.'
+                )
+
+            self.instrumentation.observe('features', time.perf_counter() - started)
+
+            try:
+                pitch = await self.batcher.submit(spectrogram, started + self.request_timeout)
+            except asyncio.TimeoutError as e:
+                raise HTTPError(HTTPStatus.SERVICE_UNAVAILABLE, 'Prazo da requisição esgotado.') from e
+        finally:
+            self._in_flight -= 1
+
+        elapsed = time.perf_counter() - started
+        self.instrumentation.observe('request', elapsed)
+        self.instrumentation.increment('requests')
+        self.latencies.add(elapsed)
+
+        midi = int(np.clip(np.rint(pitch), 0, 127))
+        return {
+            'midi': midi,
+            'note': self.midi_converter.midi_to_note_name(midi),
+            'pitch': pitch,
+            'latency_ms': 1000 * elapsed,
+        }
+
+    def metrics_text(self) -> str:
+        """
+        Retorna as métricas do servidor no formato de texto do Prometheus.
+        """
+        metrics = self.instrumentation
+        metrics.gauge('queue_depth', self.batcher.queue_depth)
+        metrics.gauge('in_flight', self._in_flight)
+
+        for name, value in self.latencies.percentiles().items():
+            metrics.gauge(f'request_latency_{name}_seconds', value)
+
+        return prometheus_text(metrics.snapshot(), labels={'job': 'inference'})
+
+    async def __route(
+        self,
+        method: str,
+        target: str,
+        headers: Dict[str, str],
+        body: bytes
+    ) -> Tuple[HTTPStatus, str, str]:
+        """
+        Encaminha a requisição para o endpoint correspondente.
+        """
+        url = urlsplit(target)
+
+        if url.path == '/predict' and method == 'POST':
+            pcm_format = self.__pcm_format(headers, parse_qs(url.query))
+            return HTTPStatus.OK, 'application/json', json.dumps(await self.predict(body, pcm_format))
+
+        if url.path == '/metrics' and method == 'GET':
+            return HTTPStatus.OK, 'text/plain; version=0.0.4', self.metrics_text()
+
+        if url.path == '/healthz' and method == 'GET':
+            if self.ready:
+                return HTTPStatus.OK, 'text/plain', 'ok'
+            return HTTPStatus.SERVICE_UNAVAILABLE, 'text/plain', 'aquecendo'
+
+        raise HTTPError(HTTPStatus.NOT_FOUND, f'{method} {url.path} não encontrado.')
+
+    def __pcm_format(self, headers: Dict[str, str], query: Dict[str, List[str]]) -> Optional[str]:
+        """
+        Identifica o formato do corpo: None para WAV, ou o formato das amostras PCM.
+        """
+        content_type = headers.get('content-type', '').split(';')[0].strip().lower()
+        if content_type in WAV_CONTENT_TYPES:
+            return None
+
+        pcm_format = query.get('format', ['pcm16'])[0]
+        if pcm_format not in PCM_FORMATS:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, f'Formato {pcm_format} inválido. Use um de {list(PCM_FORMATS)}.')
+
+        sample_rate = query.get('sample_rate', [str(self.wav_controller.sample_rate)])[0]
+        if not sample_rate.isdigit():
+            raise HTTPError(HTTPStatus.BAD_REQUEST, f'Taxa de amostragem {sample_rate} inválida.')
+
+        sample_rate = int(sample_rate)
+        if sample_rate != self.wav_controller.sample_rate:
+            raise HTTPError(
+                HTTPStatus.BAD_REQUEST,
+                f'Taxa de amostragem {sample_rate} diferente da esperada ({self.wav_controller.sample_rate}).'
+            )
+
+        return pcm_format
+
+    @staticmethod
+    async def __read_headers(reader: asyncio.StreamReader) -> Dict[str, str]:
+        """
+        Lê os cabeçalhos da requisição, com os nomes em minúsculas.
+        """
+        headers = {}
+
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                return headers
+
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+    @staticmethod
+    def __write_response(
+        writer: asyncio.StreamWriter,
+        status: HTTPStatus,
+        content_type: str,
+        payload: bytes,
+        keep_alive: bool
+    ) -> None:
+        """
+        Escreve a resposta HTTP.
+        """
+        head = (
+            f'HTTP/1.1 {status.value} {status.phrase}\r\n'
+            f'Content-Type: {content_type}\r\n'
+            f'Content-Length: {len(payload)}\r\n'
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+        )
+        if status == HTTPStatus.SERVICE_UNAVAILABLE:
+            head += 'Retry-After: 1\r\n'
+
+        writer.write(head.encode('latin-1') + b'\r\n' + payload)
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """
+    Ponto de entrada do servidor de inferência.
+    """
+    parser = argparse.ArgumentParser(description='Servidor HTTP de inferência do modelo treinado.')
+    parser.add_argument('--model', default='trained_cnn_model.pth', help='Caminho do modelo treinado.')
+    parser.add_argument('--architecture', default='pooled', help='Arquitetura do modelo.')
+    parser.add_argument('--export-dir', default=None, help='Diretório de exportação (usa o artefato mais rápido).')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--window-seconds', type=float, default=4.0, help='Duração esperada dos áudios.')
+    parser.add_argument('--sample-rate', type=int, default=16000)
+    parser.add_argument('--feature-type', default='stft', help="Tipo de espectrograma ('stft', 'mel' ou 'cqt').")
+    parser.add_argument('--feature-bins', type=int, default=None, help='Número de faixas (mel e CQT).')
+    parser.add_argument('--feature-dtype', default='float32', help="Tipo dos espectrogramas ('float32' ou 'float16').")
+    parser.add_argument('--max-batch-size', type=int, default=32)
+    parser.add_argument('--max-wait-ms', type=float, default=5.0)
+    parser.add_argument('--feature-workers', type=int, default=1)
+    parser.add_argument('--feature-executor', default='process', choices=('process', 'thread'))
+    parser.add_argument('--max-queue', type=int, default=256)
+    parser.add_argument('--request-timeout-ms', type=float, default=1000.0)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+
+    midi_converter = MidiConverter()
+    # Mesmas features do treinamento: o modelo 'flatten' depende do formato exato da janela
+    wav_controller = WavController(
+        midi_converter,
+        feature_type=args.feature_type,
+        n_bins=args.feature_bins,
+        sample_rate=args.sample_rate,
+        dtype=args.feature_dtype
+    )
+    input_shape = wav_controller.feature_shape(int(args.window_seconds * wav_controller.sample_rate))
+
+    if args.export_dir:
+        _, model = load_inference_model(args.export_dir)
+    else:
+        model = load_model(args.model, args.architecture, **model_kwargs(args.architecture, input_shape))
+
+    server = InferenceServer(
+        model,
+        wav_controller,
+        midi_converter,
+        input_shape,
+        max_batch_size=args.max_batch_size,
+        max_wait_ms=args.max_wait_ms,
+        feature_workers=args.feature_workers,
+        feature_executor=args.feature_executor,
+        max_queue=args.max_queue,
+        request_timeout_ms=args.request_timeout_ms
+    )
+
+    try:
+        asyncio.run(server.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        logging.info('Servidor encerrado.')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,383 @@
+"""
+Módulo para a transcrição em tempo real de um áudio recebido em pequenos blocos
+(ex. microfone, pipe ou arquivo lido aos poucos).
+
+Uso (a partir de src/):
+    python -m inference.streaming gravacao.wav --model trained_cnn_model.pth --realtime
+    arecord -f S16_LE -r 16000 -c 1 | python -m inference.streaming - --model trained_cnn_model.pth
+"""
+
+import argparse
+import collections
+import logging
+import sys
+import time
+from typing import BinaryIO, Deque, Iterable, Iterator, List, Optional, Tuple
+
+import librosa
+import numpy as np
+import soundfile as sf
+import torch
+import torch.nn as nn
+from midi.midi_converter import MidiConverter
+from controller.wav_controller import WavController
+from model.cnn import load_model, model_kwargs
+from inference.transcriber import NoteEvent
+from telemetry.instrumentation import Instrumentation
+
+class StreamingTranscriber:
+    """
+    Classe responsável por transcrever um áudio à medida que ele chega.
+
+    As últimas n_fft amostras ficam em um buffer e cada hop_length novas amostras geram um
+    único frame novo da STFT (o áudio é tratado como precedido de n_fft // 2 zeros, então os
+    frames são os mesmos da STFT centralizada do librosa). As magnitudes vão para um ring
+    buffer espelhado (cada frame é escrito em duas posições), de modo que a janela mais recente
+    é sempre uma fatia contígua, sem rotacionar o buffer. A cada update_seconds o SpectrogramCNN
+    é executado na janela, em dB relativos ao pico da janela, como no treinamento.
+
+    Todos os arrays do caminho de cada bloco são alocados no construtor e reutilizados.
+    Uma nota só é emitida depois de min_updates predições iguais seguidas, e trechos abaixo
+    de silence_db encerram a nota atual.
+    """
+
+    def __init__(
+        self,
+        model: nn.Module,
+        wav_controller: WavController,
+        window_seconds: float = 1.0,
+        update_seconds: float = 0.05,
+        silence_db: Optional[float] = -50.0,
+        min_updates: int = 2,
+        instrumentation: Optional[Instrumentation] = None
+    ) -> None:
+        """
+        Instancia um novo objeto StreamingTranscriber.
+
+        :param model: Modelo treinado. A arquitetura 'flatten' exige que a janela tenha o
+                      mesmo número de frames do treinamento.
+        :param wav_controller: WavController com os parâmetros dos espectrogramas do treinamento.
+        :param window_seconds: Duração da janela vista pelo modelo, em segundos.
+        :param update_seconds: Intervalo entre execuções do modelo, em segundos de áudio.
+        :param silence_db: Nível (dBFS) abaixo do qual o trecho é considerado silêncio, ou None.
+        :param min_updates: Número de predições iguais seguidas para confirmar uma nota.
+        :param instrumentation: Métricas dos tempos de processamento (opcional).
+        """
+        if wav_controller.feature_type == 'cqt':
+            raise ValueError('A CQT não pode ser calculada de forma incremental. Use stft ou mel.')
+
+        if min_updates < 1:
+            raise ValueError('min_updates deve ser maior que zero.')
+
+        self.model = model.eval()
+        self.wav_controller = wav_controller
+        self.sample_rate = wav_controller.sample_rate
+        self.n_fft = wav_controller.n_fft
+        self.hop_length = wav_controller.hop_length
+        # Mesmo formato do espectrograma de um clipe de window_seconds (ex. os clipes do treinamento)
+        self.n_bins, self.window_frames = wav_controller.feature_shape(int(window_seconds * self.sample_rate))
+        self.update_frames = max(1, int(round(update_seconds * self.sample_rate / self.hop_length)))
+        self.silence_db = silence_db
+        self.min_updates = min_updates
+        self.instrumentation = instrumentation or Instrumentation(sinks=[])
+
+        parameter = next(model.parameters(), None)
+        self.device = parameter.device if parameter is not None else torch.device('cpu')
+
+        n_freq = self.n_fft // 2 + 1
+        mel_basis = wav_controller._mel_basis  # pylint: disable=protected-access
+
+        self._fft_window = librosa.filters.get_window('hann', self.n_fft, fftbins=True).astype(np.float32)
+        self._mel_basis_t = None if mel_basis is None else np.ascontiguousarray(mel_basis.T, dtype=np.float32)
+
+        # Buffers do caminho de cada bloco
+        self._tail = np.zeros(self.n_fft, dtype=np.float32)
+        self._frames = np.empty((self.update_frames, self.n_fft), dtype=np.float32)
+        self._spectrum = np.empty((self.update_frames, n_freq), dtype=np.complex64)
+        self._magnitude = np.empty((self.update_frames, n_freq), dtype=np.float32)
+        self._mel = None if mel_basis is None else np.empty((self.update_frames, self.n_bins), dtype=np.float32)
+        self._ring = np.zeros((2 * self.window_frames, self.n_bins), dtype=np.float32)
+        self._input = np.empty((self.n_bins, self.window_frames), dtype=np.float32)
+        self._input_tensor = torch.from_numpy(self._input).view(1, 1, self.n_bins, self.window_frames)
+
+        self.latencies: Deque[float] = collections.deque(maxlen=10000)
+        self.reset()
+
+    @property
+    def input_shape(self) -> Tuple[int, int]:
+        """
+        Formato (frequências, frames) da janela vista pelo modelo.
+        """
+        return self.n_bins, self.window_frames
+
+    @property
+    def algorithmic_latency(self) -> float:
+        """
+        Atraso mínimo, em segundos, entre o início de uma nota e a sua emissão, sem contar o
+        processamento: metade da janela da STFT, o intervalo entre atualizações e as
+        confirmações extras exigidas por min_updates.
+        """
+        frames = self.update_frames * self.min_updates
+        return (self.n_fft // 2 + frames * self.hop_length) / self.sample_rate
+
+    def reset(self) -> None:
+        """
+        Descarta o áudio recebido e recomeça a transcrição do instante zero.
+        """
+        self._tail.fill(0.0)
+        self._ring.fill(0.0)
+        self._head = 0
+        self._pending_frames = 0
+        # O primeiro frame é centrado na amostra 0: precisa das n_fft // 2 primeiras amostras
+        self._until_next_frame = self.n_fft // 2
+        self._samples = 0
+        self._frames_seen = 0
+
+        self.active: Optional[NoteEvent] = None
+        self._candidate: Optional[int] = None
+        self._candidate_start = 0.0
+        self._candidate_count = 0
+
+    def push(self, chunk: np.ndarray) -> List[NoteEvent]:
+        """
+        Processa um bloco de amostras.
+
+        :param chunk: Amostras mono, de qualquer tamanho.
+        :return: As notas iniciadas neste bloco. O fim (end) da nota ativa continua sendo
+                 atualizado enquanto ela soa.
+        """
+        received = time.perf_counter()
+        chunk = np.asarray(chunk, dtype=np.float32)
+        events: List[NoteEvent] = []
+        position = 0
+
+        while position < len(chunk):
+            take = min(self._until_next_frame, len(chunk) - position)
+
+            # Desloca o buffer e acrescenta as novas amostras no fim (sem realocar)
+            self._tail[:-take] = self._tail[take:]
+            self._tail[-take:] = chunk[position:position + take]
+            position += take
+            self._samples += take
+            self._until_next_frame -= take
+
+            if self._until_next_frame > 0:
+                continue
+
+            np.multiply(self._tail, self._fft_window, out=self._frames[self._pending_frames])
+            self._pending_frames += 1
+            self._until_next_frame = self.hop_length
+
+            if self._pending_frames == self.update_frames:
+                self.__write_frames()
+                event = self.__update()
+                self.latencies.append(time.perf_counter() - received)
+                if event is not None:
+                    events.append(event)
+
+        return events
+
+    def close(self) -> Optional[NoteEvent]:
+        """
+        Encerra a nota ativa e registra as estatísticas de latência.
+
+        :return: A nota que estava ativa, com o fim definitivo, ou None.
+        """
+        event, self.active = self.active, None
+        if event is not None:
+            event.end = self._samples / self.sample_rate
+
+        if self.latencies:
+            p50, p99 = np.percentile(np.fromiter(self.latencies, dtype=np.float64), (50, 99))
+            logging.info(
+                'Processamento por atualização: p50 %.1f ms, p99 %.1f ms; latência algorítmica %.0f ms.',
+                1000 * p50,
+                1000 * p99,
+                1000 * self.algorithmic_latency
+            )
+
+        return event
+
+    def transcribe_stream(self, chunks: Iterable[np.ndarray]) -> Iterator[NoteEvent]:
+        """
+        Transcreve um áudio recebido em blocos, emitindo cada nota assim que ela é confirmada.
+
+        :param chunks: Blocos consecutivos de amostras (mono).
+        :return: Iterador das notas, em ordem temporal.
+        """
+        for chunk in chunks:
+            yield from self.push(chunk)
+        self.close()
+
+    def __write_frames(self) -> None:
+        """
+        Calcula a STFT dos frames pendentes e os escreve no ring buffer.
+        """
+        count = self._pending_frames
+        self._pending_frames = 0
+
+        with self.instrumentation.timer('stream_stft'):
+            np.fft.rfft(self._frames[:count], out=self._spectrum[:count])
+            np.abs(self._spectrum[:count], out=self._magnitude[:count])
+
+            columns = self._magnitude[:count]
+            if self._mel is not None:
+                np.matmul(columns, self._mel_basis_t, out=self._mel[:count])
+                columns = self._mel[:count]
+
+            for column in columns:
+                self._ring[self._head] = column
+                self._ring[self._head + self.window_frames] = column
+                self._head = (self._head + 1) % self.window_frames
+
+        self._frames_seen += count
+
+    def __update(self) -> Optional[NoteEvent]:
+        """
+        Executa o modelo na janela atual e atualiza a nota ativa.
+
+        :return: A nota iniciada nesta atualização, ou None.
+        """
+        now = self._samples / self.sample_rate
+
+        if self.active is not None:
+            self.active.end = now
+
+        level_db = 10 * np.log10(float(np.dot(self._tail, self._tail)) / self.n_fft + 1e-12)
+        if self.silence_db is not None and level_db < self.silence_db:
+            midi = None
+        else:
+            midi = self.__predict()
+
+        if self.active is not None and midi == self.active.midi:
+            self._candidate_count = 0
+            return None
+
+        # Nova predição: só troca a nota depois de min_updates predições iguais seguidas
+        if midi != self._candidate or self._candidate_count == 0:
+            self._candidate = midi
+            self._candidate_start = now
+            self._candidate_count = 0
+        self._candidate_count += 1
+
+        if self._candidate_count < self.min_updates and not (midi is None and self.active is not None):
+            return None
+
+        if self.active is not None:
+            self.active.end = self._candidate_start
+            self.active = None
+        self._candidate_count = 0
+
+        if midi is None:
+            return None
+
+        self.active = NoteEvent(
+            start=self._candidate_start,
+            end=now,
+            midi=midi,
+            note_name=self.wav_controller.midi_converter.midi_to_note_name(midi)
+        )
+        return self.active
+
+    def __predict(self) -> int:
+        """
+        Executa o modelo na janela mais recente do ring buffer.
+        """
+        with self.instrumentation.timer('stream_model'):
+            # Janela do frame mais antigo ao mais recente, fatia contígua do ring espelhado
+            np.copyto(self._input, self._ring[self._head:self._head + self.window_frames].T)
+            self.wav_controller.amplitude_to_db(self._input)
+
+            with torch.inference_mode():
+                output = self.model(self._input_tensor.to(self.device)).float().item()
+
+        # O modelo faz regressão do pitch: arredonda para a nota MIDI mais próxima
+        return int(min(max(round(output), 0), 127))
+
+def read_chunks(source: str, chunk_samples: int, sample_rate: int, stdin: Optional[BinaryIO] = None) -> Iterator[np.ndarray]:
+    """
+    Lê um áudio em blocos: de um arquivo, ou PCM 16 bits mono da entrada padrão ('-').
+
+    :param source: Caminho do arquivo ou '-'.
+    :param chunk_samples: Número de amostras por bloco.
+    :param sample_rate: Taxa de amostragem esperada.
+    :param stdin: Fluxo binário lido quando source é '-'. Por padrão, sys.stdin.buffer.
+    :return: Iterador dos blocos (float32, mono).
+    """
+    if source == '-':
+        stream = stdin or sys.stdin.buffer
+        while True:
+            data = stream.read(2 * chunk_samples)
+            if not data:
+                return
+            yield np.frombuffer(data[:len(data) - len(data) % 2], dtype=np.int16).astype(np.float32) / 32768
+        return
+
+    info = sf.info(source)
+    if info.samplerate != sample_rate:
+        raise ValueError(
+            f'Taxa de amostragem {info.samplerate} do arquivo {source} diferente da esperada ({sample_rate}).'
+        )
+
+    for block in sf.blocks(source, blocksize=chunk_samples, dtype='float32', always_2d=True):
+        yield block.mean(axis=1)
+
+def main(argv: Optional[List[str]] = None) -> List[NoteEvent]:
+    """
+    Ponto de entrada da transcrição em tempo real.
+    """
+    parser = argparse.ArgumentParser(description='Transcrição em tempo real de um áudio recebido em blocos.')
+    parser.add_argument('source', help="Arquivo de áudio, ou '-' para PCM 16 bits mono na entrada padrão.")
+    parser.add_argument('--model', default='trained_cnn_model.pth', help='Caminho do modelo treinado.')
+    parser.add_argument('--architecture', default='pooled', help='Arquitetura do modelo.')
+    parser.add_argument('--sample-rate', type=int, default=16000)
+    parser.add_argument('--feature-type', default='stft', help="Tipo de espectrograma ('stft' ou 'mel').")
+    parser.add_argument('--feature-bins', type=int, default=None, help='Número de faixas mel.')
+    parser.add_argument('--window-seconds', type=float, default=1.0)
+    parser.add_argument('--update-seconds', type=float, default=0.05)
+    parser.add_argument('--chunk-ms', type=float, default=20.0, help='Duração de cada bloco lido.')
+    parser.add_argument('--silence-db', type=float, default=-50.0)
+    parser.add_argument('--realtime', action='store_true', help='Lê o arquivo no ritmo do áudio.')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+
+    wav_controller = WavController(
+        MidiConverter(),
+        feature_type=args.feature_type,
+        n_bins=args.feature_bins,
+        sample_rate=args.sample_rate
+    )
+    input_shape = wav_controller.feature_shape(int(args.window_seconds * args.sample_rate))
+    model = load_model(args.model, args.architecture, **model_kwargs(args.architecture, input_shape))
+
+    transcriber = StreamingTranscriber(
+        model,
+        wav_controller,
+        window_seconds=args.window_seconds,
+        update_seconds=args.update_seconds,
+        silence_db=args.silence_db
+    )
+
+    chunk_samples = max(1, int(args.chunk_ms * args.sample_rate / 1000))
+    events = []
+    received = 0
+    started = time.perf_counter()
+
+    for chunk in read_chunks(args.source, chunk_samples, args.sample_rate):
+        received += len(chunk)
+        if args.realtime and args.source != '-':
+            # Entrega o bloco no instante em que a sua última amostra seria gravada
+            delay = started + received / args.sample_rate - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+
+        for event in transcriber.push(chunk):
+            logging.info('%8.2fs  %-4s (MIDI %s)', event.start, event.note_name, event.midi)
+            events.append(event)
+
+    transcriber.close()
+    return events
+
+if __name__ == '__main__':
+    main()
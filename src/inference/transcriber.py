@@ -0,0 +1,231 @@
+"""
+Módulo para transcrever gravações longas em uma sequência de notas,
+processando o áudio em janelas deslizantes com memória limitada.
+"""
+
+import logging
+import time
+from dataclasses import dataclass
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+import soundfile as sf
+import soxr
+import torch
+import torch.nn as nn
+from controller.wav_controller import WavController
+from model.spectrogram_frontend import TorchSpectrogram
+
+@dataclass
+class NoteEvent:
+    """
+    Nota detectada em um intervalo da gravação.
+
+    :param start: Início da nota, em segundos.
+    :param end: Fim da nota, em segundos.
+    :param midi: Número MIDI da nota.
+    :param note_name: Nome da nota (ex. 'C5').
+    """
+    start: float
+    end: float
+    midi: int
+    note_name: str
+
+class SlidingWindowTranscriber:
+    """
+    Classe responsável por transcrever gravações de qualquer duração.
+
+    O áudio é consumido em blocos e cortado em janelas sobrepostas do mesmo tamanho dos
+    clipes de treinamento. As janelas são agrupadas em lotes para o SpectrogramCNN e as
+    predições consecutivas de mesma nota são unidas em um único NoteEvent. Apenas um bloco,
+    uma janela e um lote ficam em memória por vez, independentemente do tamanho do arquivo.
+    """
+
+    def __init__(
+        self,
+        model: nn.Module,
+        wav_controller: WavController,
+        sample_rate: int = 16000,
+        window_seconds: float = 4.0,
+        hop_seconds: float = 1.0,
+        batch_size: int = 16,
+        frontend: Optional[TorchSpectrogram] = None
+    ) -> None:
+        """
+        Instancia um novo objeto SlidingWindowTranscriber.
+
+        :param model: Modelo treinado.
+        :param wav_controller: WavController usado para calcular os espectrogramas das janelas.
+        :param sample_rate: Taxa de amostragem esperada pelo modelo.
+        :param window_seconds: Duração de cada janela, em segundos.
+        :param hop_seconds: Distância entre o início de janelas consecutivas, em segundos.
+        :param batch_size: Número de janelas processadas por vez pelo modelo.
+        :param frontend: Front end em PyTorch para calcular os espectrogramas do lote inteiro (opcional).
+        """
+        if hop_seconds <= 0 or hop_seconds > window_seconds:
+            raise ValueError('hop_seconds deve ser positivo e menor ou igual a window_seconds.')
+
+        self.model = model.eval()
+        self.wav_controller = wav_controller
+        self.sample_rate = sample_rate
+        self.window_size = int(round(window_seconds * sample_rate))
+        self.hop_size = int(round(hop_seconds * sample_rate))
+        self.batch_size = batch_size
+        self.frontend = frontend
+        # Modelos exportados (TorchScript int8, ONNX) não expõem parâmetros e rodam na CPU
+        parameter = next(model.parameters(), None)
+        self.device = parameter.device if parameter is not None else torch.device('cpu')
+
+    def transcribe_file(self, file_path: str, block_seconds: float = 30.0) -> Iterator[NoteEvent]:
+        """
+        Transcreve um arquivo de áudio lendo-o em blocos.
+
+        :param file_path: Caminho do arquivo de áudio.
+        :param block_seconds: Duração de cada bloco lido do disco, em segundos.
+        :return: Iterador das notas detectadas, em ordem temporal.
+        """
+        return self.transcribe_stream(self.read_blocks(file_path, block_seconds))
+
+    def read_blocks(self, file_path: str, block_seconds: float = 30.0) -> Iterator[np.ndarray]:
+        """
+        Lê um arquivo de áudio em blocos mono, sem carregá-lo inteiro em memória.
+
+        :param file_path: Caminho do arquivo de áudio.
+        :param block_seconds: Duração de cada bloco, em segundos.
+        :return: Iterador dos blocos de amostras, na taxa de amostragem do modelo.
+        """
+        info = sf.info(file_path)
+        blocks = sf.blocks(
+            file_path,
+            blocksize=int(block_seconds * info.samplerate),
+            dtype='float32',
+            always_2d=True
+        )
+
+        if info.samplerate == self.sample_rate:
+            # Converte para mono fazendo a média dos canais
+            yield from (block.mean(axis=1) for block in blocks)
+            return
+
+        logging.info('Reamostrando %s de %s Hz para %s Hz.', file_path, info.samplerate, self.sample_rate)
+
+        # Reamostragem contínua entre os blocos (o soxr é o backend do librosa.resample),
+        # sem as descontinuidades de reamostrar cada bloco separadamente
+        resampler = soxr.ResampleStream(info.samplerate, self.sample_rate, 1, dtype='float32')
+        for block in blocks:
+            yield resampler.resample_chunk(block.mean(axis=1))
+        yield resampler.resample_chunk(np.zeros(0, dtype=np.float32), last=True)
+
+    def transcribe_array(self, waveform: np.ndarray) -> List[NoteEvent]:
+        """
+        Transcreve um áudio já carregado em memória.
+
+        :param waveform: Array com as amostras do áudio (mono).
+        :return: Lista das notas detectadas, em ordem temporal.
+        """
+        return list(self.transcribe_stream([waveform]))
+
+    def transcribe_stream(self, chunks: Iterable[np.ndarray]) -> Iterator[NoteEvent]:
+        """
+        Transcreve um áudio recebido em blocos de tamanho qualquer.
+
+        :param chunks: Blocos consecutivos de amostras (mono).
+        :return: Iterador das notas detectadas, em ordem temporal.
+        """
+        started = time.perf_counter()
+        total_samples = 0
+        current: Optional[NoteEvent] = None
+
+        for start, midi in self.__predict_windows(chunks):
+            total_samples = max(total_samples, start + self.window_size)
+            segment_start, segment_end = self.__segment(start)
+
+            if current is not None and current.midi == midi:
+                current.end = segment_end
+                continue
+
+            if current is not None:
+                yield current
+
+            current = NoteEvent(
+                start=segment_start,
+                end=segment_end,
+                midi=midi,
+                note_name=self.wav_controller.midi_converter.midi_to_note_name(midi)
+            )
+
+        if current is not None:
+            yield current
+
+        elapsed = time.perf_counter() - started
+        logging.info(
+            'Transcrição de %.1fs de áudio em %.1fs (%.1fx tempo real).',
+            total_samples / self.sample_rate,
+            elapsed,
+            total_samples / self.sample_rate / elapsed if elapsed > 0 else 0.0
+        )
+
+    def __predict_windows(self, chunks: Iterable[np.ndarray]) -> Iterator[Tuple[int, int]]:
+        """
+        Corta os blocos em janelas e retorna (amostra inicial, nota MIDI) de cada janela.
+        """
+        buffer = np.zeros(0, dtype=np.float32)
+        buffer_start = 0
+        next_window = 0
+        batch: List[Tuple[int, np.ndarray]] = []
+
+        for chunk in chunks:
+            buffer = np.concatenate((buffer, np.asarray(chunk, dtype=np.float32)))
+
+            while next_window + self.window_size <= buffer_start + len(buffer):
+                offset = next_window - buffer_start
+                batch.append((next_window, buffer[offset:offset + self.window_size]))
+                next_window += self.hop_size
+
+                if len(batch) == self.batch_size:
+                    yield from self.__predict_batch(batch)
+                    batch = []
+
+            # Descarta as amostras que nenhuma janela futura vai usar
+            consumed = next_window - buffer_start
+            buffer = buffer[consumed:].copy()
+            buffer_start = next_window
+
+        # Última janela parcial, completada com silêncio
+        if len(buffer) > 0 and (next_window == 0 or len(buffer) > self.window_size - self.hop_size):
+            window = np.zeros(self.window_size, dtype=np.float32)
+            window[:len(buffer)] = buffer
+            batch.append((next_window, window))
+
+        if batch:
+            yield from self.__predict_batch(batch)
+
+    def __predict_batch(self, batch: List[Tuple[int, np.ndarray]]) -> Iterator[Tuple[int, int]]:
+        """
+        Calcula os espectrogramas de um lote de janelas e executa o modelo.
+        """
+        starts, windows = zip(*batch)
+
+        with torch.inference_mode():
+            if self.frontend is not None:
+                spectrograms = self.frontend.batch_from_numpy(windows, device=self.device)
+            else:
+                spectrograms = torch.from_numpy(np.stack([
+                    self.wav_controller.compute_spectrogram(window) for window in windows
+                ]).astype(np.float32)).unsqueeze(1).to(self.device)
+
+            outputs = self.model(spectrograms).float().squeeze(1)
+
+        # O modelo faz regressão do pitch: arredonda para a nota MIDI mais próxima
+        midis = outputs.round().clamp(0, 127).long().cpu().tolist()
+        return zip(starts, midis)
+
+    def __segment(self, start: int) -> Tuple[float, float]:
+        """
+        Retorna o intervalo de tempo atribuído a uma janela: o trecho de tamanho hop
+        centrado na janela, de modo que janelas sobrepostas não se sobreponham no resultado.
+        """
+        center = start + self.window_size / 2
+        segment_start = 0.0 if start == 0 else center - self.hop_size / 2
+        segment_end = center + self.hop_size / 2
+        return segment_start / self.sample_rate, segment_end / self.sample_rate
@@ -1,121 +1,186 @@
 """
-Módulo principal do projeto, responsável por carregar os dados,
-treinar o modelo de CNN e salvar o modelo treinado.
+Módulo principal do projeto: linha de comando com as etapas do pipeline.
+
+Uso (a partir de src/):
+    python main.py                       # pipeline completo: treinamento, exportação e avaliação
+    python main.py prepare               # baixa os datasets e extrai as features
+    python main.py train [--no-export]
+    python main.py evaluate [--model trained_cnn_model.pth]
+    python main.py predict audio.wav [...]
+    python main.py bench [opções do benchmark.pipeline_benchmark]
+    torchrun --nproc_per_node=4 main.py train
+
+As configurações vêm, em ordem de prioridade, das variáveis de ambiente, do .env e do arquivo
+INI indicado em --config (ou SONG_LEARNER_CONFIG), na seção [song_learner], com as mesmas
+chaves das variáveis de ambiente (ex. feature_type = mel).
+
+Este módulo importa apenas a biblioteca padrão: torch, librosa e datasets são importados
+pelos subcomandos que os usam, então --help e a leitura da configuração são imediatos e o
+módulo pode ser importado sem efeitos colaterais.
 """
 
+import argparse
+import configparser
+import importlib
+import json
 import logging
 import os
+import sys
+import time
+from dataclasses import asdict
+from types import ModuleType
+from typing import List, Optional
 
 import dotenv
-import torch
-from torch.utils.data import DataLoader
-from midi.midi_converter import MidiConverter
-from data.data_set import DataSet
-from data.spectogram_dataset import SpectrogramDataset
-from controller.wav_controller import WavController
-from model.cnn import SpectrogramCNN
-from model.trainer import ModelTrainer
-from repositories.huggingface_repository import HugginfaceRepository
 
-dotenv.load_dotenv()
+_STARTED = time.perf_counter()
 
-logging.basicConfig(level=logging.INFO)
+CONFIG_SECTION = 'song_learner'
+CONFIG_ENV = 'SONG_LEARNER_CONFIG'
 
-midi_converter = MidiConverter()
-wav_controller = WavController(midi_converter)
+def load_config(path: str) -> int:
+    """
+    Carrega um arquivo de configuração INI nas variáveis de ambiente, sem sobrescrever as
+    que já estão definidas.
+
+    :param path: Caminho do arquivo.
+    :return: O número de chaves aplicadas.
+    """
+    parser = configparser.ConfigParser(interpolation=None)
+    if not parser.read(path, encoding='utf-8'):
+        raise FileNotFoundError(f'Arquivo de configuração {path} não encontrado.')
+
+    if not parser.has_section(CONFIG_SECTION):
+        raise ValueError(f'O arquivo {path} não tem a seção [{CONFIG_SECTION}].')
+
+    applied = 0
+    for key, value in parser.items(CONFIG_SECTION):
+        if key.upper() not in os.environ:
+            os.environ[key.upper()] = value
+            applied += 1
+
+    return applied
 
-hub_repo = HugginfaceRepository(os.getenv('HUGGINGFACEHUB_USERNAME'))
+def import_timed(name: str) -> ModuleType:
+    """
+    Importa um módulo registrando o tempo de importação.
+
+    :param name: Nome do módulo.
+    :return: O módulo importado.
+    """
+    started = time.perf_counter()
+    module = importlib.import_module(name)
+    logging.info('Módulo %s importado em %.0f ms.', name, 1000 * (time.perf_counter() - started))
+    return module
 
-# Hiperparâmetros
-batch_size = 32
-learning_rate = 0.001
-num_epochs = 10
-num_classes = 120
+def command_all(_: argparse.Namespace) -> None:
+    """
+    Executa o pipeline completo.
+    """
+    import_timed('pipeline').run_all()
 
-def main():
+def command_prepare(_: argparse.Namespace) -> None:
     """
-    Função principal que executa o pipeline de treinamento do modelo.
+    Baixa os datasets e extrai as features de treinamento.
     """
-    dataset = get_dataset(train=True)
-    model_path = train_model(dataset)
+    import_timed('pipeline').run_prepare()
 
-    dataset = get_dataset(train=False)
-    evaluate_model(model_path, dataset)
+def command_train(args: argparse.Namespace) -> None:
+    """
+    Treina (ou retoma o treinamento d)o modelo e exporta os artefatos de inferência.
+    """
+    import_timed('pipeline').run_train(export=not args.no_export)
 
-def get_dataset(train: bool) -> DataSet:
+def command_evaluate(args: argparse.Namespace) -> None:
+    """
+    Avalia o modelo treinado no dataset de teste.
     """
-    Função que carrega o dataset e retorna um DataLoader.
+    pipeline = import_timed('pipeline')
+    pipeline.run_evaluate(args.model or pipeline.model_path)
 
-    :param train: Se True, carrega o dataset de treinamento, caso contrário, o de dataset de teste.
-    :return: O DataLoader contendo os dados de treinamento.
+def command_predict(args: argparse.Namespace) -> None:
+    """
+    Transcreve arquivos de áudio e escreve as notas na saída padrão, uma linha JSON por nota.
     """
-    env_model = 'TRAIN_DATASET_URL' if train else 'TESTE_DATASET_URL'
+    pipeline = import_timed('pipeline')
+    results = pipeline.run_predict(args.paths, args.model or pipeline.model_path, args.hop_seconds)
 
-    return DataSet(
-        data_set_url=os.getenv(env_model),
-        hub_repo=hub_repo,
-        update_dataset=False
-    ).download_data_set()
+    for path, events in results.items():
+        for event in events:
+            print(json.dumps({'file': path, **asdict(event)}, ensure_ascii=False))
+
+def command_bench(args: argparse.Namespace) -> None:
+    """
+    Executa o benchmark do pipeline com áudios sintéticos.
+    """
+    import_timed('benchmark.pipeline_benchmark').main(args.bench_args)
 
-def train_model(dataset: DataSet) -> str:
+def build_parser() -> argparse.ArgumentParser:
     """
-    Função que treina o modelo de CNN e salva o modelo treinado.
+    Cria o parser da linha de comando.
 
-    :param data_loader: O DataLoader contendo os dados de treinamento.
-    :return: O caminho para o modelo treinado.
+    :return: O parser.
     """
-    if os.path.exists('trained_cnn_model.pth'):
-        logging.info("Modelo treinado já existe, pulando treinamento.")
-        return 'trained_cnn_model.pth'
+    parser = argparse.ArgumentParser(description='Reconhecimento de notas musicais em áudios.')
+    parser.add_argument(
+        '--config',
+        default=os.getenv(CONFIG_ENV),
+        help=f'Arquivo INI de configuração, seção [{CONFIG_SECTION}] (padrão: ${CONFIG_ENV}).'
+    )
+    parser.add_argument('--log-level', default='INFO', help='Nível dos logs (DEBUG, INFO, WARNING...).')
+    parser.set_defaults(handler=command_all)
 
-    logging.info("Iniciando treinamento do modelo CNN...")
+    commands = parser.add_subparsers(title='comandos', metavar='<comando>')
 
-    spectograms_dataset = SpectrogramDataset()
+    prepare = commands.add_parser('prepare', help='Baixa os datasets e extrai as features de treinamento.')
+    prepare.set_defaults(handler=command_prepare)
 
-    for item in dataset['train']:
-        spectogram, label = wav_controller.load_wav(item['audio'])
-        spectograms_dataset.add_sample(spectogram, label)
+    train = commands.add_parser('train', help='Treina o modelo, retomando do último checkpoint.')
+    train.add_argument('--no-export', action='store_true', help='Não exporta o modelo, mesmo com EXPORT_DIR.')
+    train.set_defaults(handler=command_train)
 
-    data_loader = DataLoader(spectograms_dataset, batch_size=batch_size, shuffle=True)
+    evaluate = commands.add_parser('evaluate', help='Avalia o modelo treinado no dataset de teste.')
+    evaluate.add_argument('--model', default=None, help='Caminho do modelo treinado (padrão: $MODEL_PATH).')
+    evaluate.set_defaults(handler=command_evaluate)
 
-    # Inicializar o modelo CNN
-    model = SpectrogramCNN()
+    predict = commands.add_parser('predict', help='Transcreve arquivos de áudio.')
+    predict.add_argument('paths', nargs='+', help='Arquivos de áudio.')
+    predict.add_argument('--model', default=None, help='Caminho do modelo treinado (padrão: $MODEL_PATH).')
+    predict.add_argument('--hop-seconds', type=float, default=1.0)
+    predict.set_defaults(handler=command_predict)
 
-    # Inicializar o objeto ModelTrainer e treinar o modelo
-    trainer = ModelTrainer(
-        model=model,
-        num_epochs=num_epochs,
-        learning_rate=learning_rate
+    bench = commands.add_parser(
+        'bench',
+        help='Benchmark do pipeline com áudios sintéticos.',
+        description='As opções seguintes são repassadas ao benchmark.pipeline_benchmark.',
+        add_help=False
     )
-    trainer.train(data_loader)
-
-    # Salvar o modelo treinado
-    trainer.save_model("trained_cnn_model.pth")
+    bench.set_defaults(handler=command_bench)
 
-    logging.info("Treinamento concluído e modelo salvo com sucesso.")
-    return 'trained_cnn_model.pth'
+    return parser
 
-def evaluate_model(model_path: str, data_loader: DataLoader) -> None:
+def main(argv: Optional[List[str]] = None) -> None:
     """
-    Função que avalia o modelo treinado.
-
-    :param model_path: O caminho para o modelo treinado.
-    :param data_loader: O DataLoader contendo os dados de teste.
+    Ponto de entrada da linha de comando.
     """
-    logging.info("Iniciando avaliação do modelo CNN...")
+    args, extra = build_parser().parse_known_args(argv)
 
-    model = SpectrogramCNN(num_classes=num_classes)
+    if args.handler is command_bench:
+        args.bench_args = extra
+    elif extra:
+        build_parser().error(f"argumentos não reconhecidos: {' '.join(extra)}")
 
-    # Carregar o modelo treinado
-    model.load_state_dict(torch.load(model_path))
+    logging.basicConfig(level=args.log_level.upper())
 
-    # Inicializar o objeto ModelTrainer e avaliar o modelo
-    trainer = ModelTrainer(
-        model=model,
-        num_epochs=num_epochs,
-        learning_rate=learning_rate
-    )
-    trainer.evaluate(data_loader)
+    dotenv.load_dotenv()
+    if args.config:
+        logging.info('%s configurações carregadas de %s.', load_config(args.config), args.config)
+
+    logging.info('Inicialização em %.0f ms.', 1000 * (time.perf_counter() - _STARTED))
+
+    started = time.perf_counter()
+    args.handler(args)
+    logging.info('Comando concluído em %.1fs.', time.perf_counter() - started)
 
 if __name__ == '__main__':
-    main()
+    main(sys.argv[1:])
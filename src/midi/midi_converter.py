@@ -2,17 +2,47 @@
 Módulo para fazer a conversão dos número de pitch MIDI em nomes de notas musicais.
 """
 
-from typing import Dict, Any
+import re
+from typing import Dict, Any, Iterable
+
+import numpy as np
+
+# Faixa completa de notas MIDI (0 a 127)
+MIDI_RANGE = 128
+
+# Frequência e número MIDI da nota de referência (A4 = 440 Hz)
+REFERENCE_FREQUENCY = 440.0
+REFERENCE_MIDI = 69
+
+NOTE_PATTERN = re.compile(r'^([A-Ga-g])([#b]?)(-?\d+)$')
+
+def _is_tensor(values: Any) -> bool:
+    """
+    Verifica se o valor é um tensor do PyTorch, sem importar o torch neste módulo.
+    """
+    return type(values).__module__.startswith('torch')
 
 class MidiConverter:
     """
     Classe responsável por converter números MIDI em nomes de notas musicais.
+
+    Além dos métodos escalares, expõe versões vetorizadas para arrays NumPy e tensores
+    PyTorch, baseadas em tabelas pré-calculadas para toda a faixa MIDI (0 a 127).
+    A oitava segue a mesma convenção de midi_to_note_name: oitava = midi // 12.
     """
 
     def __init__(self):
         # Definir as notas padrão
         self.note_names = ['C', 'C#', 'D', 'D#', 'E', 'F', 'F#', 'G', 'G#', 'A', 'A#', 'B']
 
+        # Tabelas de consulta das conversões em lote
+        self.note_name_table = np.array([self.midi_to_note_name(midi) for midi in range(MIDI_RANGE)])
+        self.frequency_table = self.midi_to_frequency(np.arange(MIDI_RANGE, dtype=np.float64))
+
+        # Tabela dos nomes ordenada, para a conversão inversa por busca binária
+        self._name_order = np.argsort(self.note_name_table)
+        self._sorted_names = self.note_name_table[self._name_order]
+
     def midi_to_note_name(self, midi_number: int) -> str:
         """
         Converte um número MIDI em uma nota musical no formato padrão.
@@ -35,3 +65,109 @@ class MidiConverter:
             raise ValueError("Pitch não encontrado nos dados.")
 
         return self.midi_to_note_name(midi_number)
+
+    def midi_to_note_names(self, midi_numbers: Any) -> np.ndarray:
+        """
+        Converte um array de números MIDI em nomes de notas, por consulta à tabela.
+        :param midi_numbers: Array NumPy, tensor PyTorch ou lista de números MIDI (0 a 127).
+        :return: Array de strings com o mesmo formato da entrada.
+        """
+        return self.note_name_table[self.__midi_indices(midi_numbers)]
+
+    def midi_to_pitch_classes(self, midi_numbers: Any) -> Any:
+        """
+        Converte números MIDI no índice da nota dentro da oitava (0 = C, ..., 11 = B).
+        :param midi_numbers: Array NumPy ou tensor PyTorch de números MIDI.
+        :return: Índices das notas, no mesmo tipo da entrada.
+        """
+        return midi_numbers % 12
+
+    def midi_to_octaves(self, midi_numbers: Any) -> Any:
+        """
+        Converte números MIDI na oitava correspondente (oitava = midi // 12).
+        :param midi_numbers: Array NumPy ou tensor PyTorch de números MIDI.
+        :return: Oitavas, no mesmo tipo da entrada.
+        """
+        return midi_numbers // 12
+
+    def note_names_to_midi(self, note_names: Iterable[str]) -> np.ndarray:
+        """
+        Converte nomes de notas (ex. 'C#5', 'Db5', 'A-1') em números MIDI.
+        Os nomes no formato da tabela são resolvidos por busca binária; apenas os demais
+        (bemóis, oitavas fora da faixa MIDI) passam pela conversão escalar, uma vez por nome distinto.
+        :param note_names: Lista ou array de nomes de notas.
+        :return: Array int64 com os números MIDI, no mesmo formato da entrada.
+        """
+        names = np.asarray(note_names, dtype=str)
+
+        positions = np.minimum(np.searchsorted(self._sorted_names, names), MIDI_RANGE - 1)
+        found = self._sorted_names[positions] == names
+        labels = self._name_order[positions].astype(np.int64)
+
+        if not found.all():
+            unknown, inverse = np.unique(names[~found], return_inverse=True)
+            converted = np.array([self.note_name_to_midi(name) for name in unknown], dtype=np.int64)
+            labels[~found] = converted[inverse.ravel()]
+
+        return labels
+
+    def note_name_to_midi(self, note_name: str) -> int:
+        """
+        Converte um nome de nota em número MIDI, aceitando sustenidos, bemóis e oitavas
+        com mais de um dígito ou negativas.
+        :param note_name: Nome da nota (ex. 'C4', 'Bb10', 'C#-1').
+        :return: Número MIDI (oitava * 12 + índice da nota).
+        """
+        match = NOTE_PATTERN.match(note_name.strip())
+
+        if match is None:
+            raise ValueError(f"Nota '{note_name}' não está no formato esperado (ex. 'C#4').")
+
+        letter, accidental, octave = match.groups()
+        index = self.note_names.index(letter.upper())
+        index += 1 if accidental == '#' else -1 if accidental == 'b' else 0
+
+        return int(octave) * 12 + index
+
+    @staticmethod
+    def midi_to_frequency(midi_numbers: Any) -> Any:
+        """
+        Converte números MIDI (inclusive fracionários) em frequências, em Hz.
+        :param midi_numbers: Array NumPy ou tensor PyTorch de números MIDI.
+        :return: Frequências, no mesmo tipo da entrada.
+        """
+        return REFERENCE_FREQUENCY * 2.0 ** ((midi_numbers - REFERENCE_MIDI) / 12.0)
+
+    @staticmethod
+    def frequency_to_midi(frequencies: Any, round_to_note: bool = True) -> Any:
+        """
+        Converte frequências, em Hz, em números MIDI.
+        :param frequencies: Array NumPy ou tensor PyTorch de frequências (maiores que zero).
+        :param round_to_note: Se True, arredonda para a nota MIDI mais próxima (inteiro).
+        :return: Números MIDI, no mesmo tipo da entrada.
+        """
+        if _is_tensor(frequencies):
+            midi = REFERENCE_MIDI + 12.0 * (frequencies.double() / REFERENCE_FREQUENCY).log2()
+            return midi.round().long() if round_to_note else midi
+
+        midi = REFERENCE_MIDI + 12.0 * np.log2(np.asarray(frequencies, dtype=np.float64) / REFERENCE_FREQUENCY)
+        return np.rint(midi).astype(np.int64) if round_to_note else midi
+
+    @staticmethod
+    def __midi_indices(midi_numbers: Any) -> np.ndarray:
+        """
+        Converte a entrada em um array de índices da tabela, validando a faixa MIDI.
+        """
+        if _is_tensor(midi_numbers):
+            midi_numbers = midi_numbers.detach().cpu().numpy()
+
+        indices = np.asarray(midi_numbers)
+
+        if indices.dtype.kind == 'f':
+            indices = np.rint(indices)
+        indices = indices.astype(np.int64, copy=False)
+
+        if indices.size and (indices.min() < 0 or indices.max() >= MIDI_RANGE):
+            raise ValueError(f'Números MIDI devem estar entre 0 e {MIDI_RANGE - 1}.')
+
+        return indices
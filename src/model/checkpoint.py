@@ -0,0 +1,206 @@
+"""
+Módulo para salvar e retomar checkpoints do treinamento, com escrita em uma thread de fundo.
+"""
+
+import json
+import logging
+import os
+import queue
+import random
+import re
+import threading
+from typing import Any, Dict, Optional
+
+import numpy as np
+import torch
+
+LATEST_FILE = 'latest.json'
+CHECKPOINT_PATTERN = re.compile(r'^checkpoint-e(\d+)-s(\d+)\.pt$')
+
+def to_cpu(obj: Any) -> Any:
+    """
+    Copia recursivamente os tensores de um state_dict para a CPU.
+    A cópia é necessária mesmo na CPU: o treinamento continua alterando os tensores
+    originais enquanto o checkpoint é gravado.
+
+    :param obj: Estrutura com tensores (dicts, listas, tuplas).
+    :return: A mesma estrutura com cópias dos tensores na CPU.
+    """
+    if isinstance(obj, torch.Tensor):
+        return obj.detach().to('cpu', copy=True)
+    if isinstance(obj, dict):
+        return {key: to_cpu(value) for key, value in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return type(obj)(to_cpu(value) for value in obj)
+    return obj
+
+def capture_rng_state() -> Dict[str, Any]:
+    """
+    Captura o estado de todos os geradores aleatórios usados no treinamento.
+
+    :return: Estados do torch (CPU e CUDA), NumPy e random.
+    """
+    state = {
+        'torch': torch.get_rng_state(),
+        'numpy': np.random.get_state(),
+        'random': random.getstate(),
+    }
+    if torch.cuda.is_available():
+        state['cuda'] = torch.cuda.get_rng_state_all()
+    return state
+
+def restore_rng_state(state: Dict[str, Any]) -> None:
+    """
+    Restaura os geradores aleatórios a partir de um estado capturado por capture_rng_state.
+
+    :param state: Estados dos geradores.
+    """
+    torch.set_rng_state(state['torch'])
+    np.random.set_state(state['numpy'])
+    random.setstate(state['random'])
+
+    if 'cuda' in state and torch.cuda.is_available():
+        torch.cuda.set_rng_state_all(state['cuda'])
+
+class CheckpointManager:
+    """
+    Classe responsável por gravar e localizar os checkpoints do treinamento.
+
+    O estado é copiado para a CPU no momento do save (rápido, em memória) e gravado em disco
+    por uma thread de fundo, em um arquivo temporário renomeado de forma atômica. Assim o
+    treinamento não espera pelo disco e um checkpoint nunca fica pela metade. Apenas uma
+    gravação fica pendente por vez, o que limita a memória extra a uma cópia do estado.
+    """
+
+    def __init__(self, checkpoint_dir: str, interval_steps: int = 500, keep_last: int = 2) -> None:
+        """
+        Instancia um novo objeto CheckpointManager.
+
+        :param checkpoint_dir: Diretório dos checkpoints.
+        :param interval_steps: Número de lotes entre checkpoints dentro de uma época (além do fim de cada época).
+        :param keep_last: Número de checkpoints mantidos em disco.
+        """
+        if interval_steps < 1:
+            raise ValueError('O intervalo entre checkpoints deve ser maior que zero.')
+
+        self.checkpoint_dir = checkpoint_dir
+        self.interval_steps = interval_steps
+        self.keep_last = max(1, keep_last)
+
+        os.makedirs(self.checkpoint_dir, exist_ok=True)
+
+        self._queue: queue.Queue = queue.Queue(maxsize=1)
+        self._error: Optional[BaseException] = None
+        self._thread = threading.Thread(target=self.__writer, daemon=True)
+        self._thread.start()
+
+    def save(self, state: Dict[str, Any], epoch: int, step: int) -> None:
+        """
+        Agenda a gravação de um checkpoint. Retorna assim que o estado é copiado,
+        ou espera se a gravação anterior ainda não terminou.
+
+        :param state: Estado do treinamento (tensores em qualquer dispositivo).
+        :param epoch: Época do checkpoint.
+        :param step: Número de lotes já processados na época.
+        """
+        self.__raise_error()
+        snapshot = {**to_cpu(state), 'epoch': epoch, 'step': step}
+        self._queue.put((snapshot, epoch, step))
+
+    def wait(self) -> None:
+        """
+        Espera todas as gravações pendentes terminarem.
+        """
+        self._queue.join()
+        self.__raise_error()
+
+    def latest(self) -> Optional[str]:
+        """
+        Retorna o caminho do checkpoint mais recente.
+
+        :return: O caminho do checkpoint, ou None se não houver nenhum.
+        """
+        latest_path = os.path.join(self.checkpoint_dir, LATEST_FILE)
+
+        if os.path.exists(latest_path):
+            with open(latest_path, 'r', encoding='utf-8') as f:
+                path = os.path.join(self.checkpoint_dir, json.load(f)['file'])
+            if os.path.exists(path):
+                return path
+
+        # Sem o ponteiro (ex. interrompido entre o rename e a escrita do latest.json), usa o nome
+        checkpoints = self.__list()
+        return os.path.join(self.checkpoint_dir, checkpoints[-1][2]) if checkpoints else None
+
+    def load(self, path: Optional[str] = None, map_location: Any = 'cpu') -> Optional[Dict[str, Any]]:
+        """
+        Carrega um checkpoint.
+
+        :param path: Caminho do checkpoint. Por padrão, o mais recente.
+        :param map_location: Dispositivo onde os tensores serão carregados.
+        :return: O estado salvo, ou None se não houver checkpoint.
+        """
+        path = path or self.latest()
+        if path is None:
+            return None
+
+        logging.info('Carregando checkpoint %s.', path)
+        # O checkpoint inclui os estados do NumPy e do random, que não são apenas tensores
+        return torch.load(path, map_location=map_location, weights_only=False)
+
+    def __writer(self) -> None:
+        """
+        Thread que grava os checkpoints agendados.
+        """
+        while True:
+            snapshot, epoch, step = self._queue.get()
+            try:
+                self.__write(snapshot, epoch, step)
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                logging.error('Erro ao gravar checkpoint: %s', e)
+                self._error = e
+            finally:
+                self._queue.task_done()
+
+    def __write(self, snapshot: Dict[str, Any], epoch: int, step: int) -> None:
+        """
+        Grava um checkpoint de forma atômica e atualiza o ponteiro para o mais recente.
+        """
+        name = f'checkpoint-e{epoch:04d}-s{step:08d}.pt'
+        path = os.path.join(self.checkpoint_dir, name)
+        tmp_path = f'{path}.tmp'
+
+        with open(tmp_path, 'wb') as f:
+            torch.save(snapshot, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+        latest_tmp = os.path.join(self.checkpoint_dir, f'{LATEST_FILE}.tmp')
+        with open(latest_tmp, 'w', encoding='utf-8') as f:
+            json.dump({'file': name, 'epoch': epoch, 'step': step}, f)
+        os.replace(latest_tmp, os.path.join(self.checkpoint_dir, LATEST_FILE))
+
+        for _, _, old in self.__list()[:-self.keep_last]:
+            os.remove(os.path.join(self.checkpoint_dir, old))
+
+        logging.info('Checkpoint gravado em %s.', path)
+
+    def __list(self):
+        """
+        Lista os checkpoints do diretório, do mais antigo para o mais recente.
+        """
+        checkpoints = []
+        for name in os.listdir(self.checkpoint_dir):
+            match = CHECKPOINT_PATTERN.match(name)
+            if match:
+                checkpoints.append((int(match.group(1)), int(match.group(2)), name))
+        return sorted(checkpoints)
+
+    def __raise_error(self) -> None:
+        """
+        Propaga para o treinamento um erro ocorrido na thread de gravação.
+        """
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise RuntimeError('Falha ao gravar checkpoint.') from error
@@ -2,6 +2,8 @@
 Módulo para criar um modelo de CNN avançada para classificação de espectrogramas.
 """
 
+from typing import Any, Dict, Optional, Tuple
+
 import torch
 import torch.nn as nn
 import torch.nn.functional as F
@@ -11,11 +13,12 @@ class SpectrogramCNN(nn.Module):
     Modelo de Rede Neural Convolucional projetado para classificação de espectrogramas de áudio.
     Inclui múltiplas camadas convolucionais seguidas por pooling, dropout e fully connected layers.
     """
-    def __init__(self) -> None:
+    def __init__(self, input_shape: Tuple[int, int] = (1025, 126)) -> None:
         """
         Instancia o modelo SpectrogramCNN.
         
-        :param num_classes: Número de classes para a classificação final.
+        :param input_shape: Formato (frequências, frames) dos espectrogramas de entrada.
+            O padrão corresponde a clipes de 4s a 16kHz com n_fft=2048 e hop_length=512.
         """
         super(SpectrogramCNN, self).__init__()
         
@@ -37,8 +40,9 @@ class SpectrogramCNN(nn.Module):
         # Dropout para regularização
         self.dropout = nn.Dropout(0.5)
         
-        # Camada totalmente conectada (fully connected)
-        self.fc1 = nn.Linear(128 * 128 * 15, 256)
+        # Camada totalmente conectada (fully connected), dimensionada pelo formato da entrada
+        n_freqs, n_frames = input_shape
+        self.fc1 = nn.Linear(128 * (n_freqs // 8) * (n_frames // 8), 256)
         self.fc2 = nn.Linear(256, 1)
     
     def forward(self, spectrogram: torch.Tensor) -> torch.Tensor:
@@ -53,8 +57,9 @@ class SpectrogramCNN(nn.Module):
         spectrogram = self.pool2(self.bn2(self.conv2(spectrogram)))
         spectrogram = self.pool3(self.bn3(self.conv3(spectrogram)))
 
-        # Flatten para as fully connected layers
-        spectrogram = spectrogram.view(spectrogram.size(0), -1)
+        # Flatten para as fully connected layers (flatten, e não view: a saída de um modelo
+        # quantizado não é contígua)
+        spectrogram = spectrogram.flatten(1)
         
         # Passagem pelas fully connected layers com dropout
         spectrogram = self.fc1(spectrogram)
@@ -62,3 +67,183 @@ class SpectrogramCNN(nn.Module):
         spectrogram = self.fc2(spectrogram)
         
         return spectrogram
+
+class PooledSpectrogramCNN(nn.Module):
+    """
+    Variante do SpectrogramCNN com cabeça de pooling adaptativo.
+
+    Em vez de achatar o mapa de features inteiro (cerca de 63M parâmetros na fc1),
+    as frequências são reduzidas a um número fixo de faixas e o tempo é reduzido por
+    max pooling global. O modelo aceita espectrogramas de qualquer duração e de qualquer
+    número de frequências, e tem menos de 400k parâmetros.
+    """
+    def __init__(self, freq_bands: int = 8) -> None:
+        """
+        Instancia o modelo PooledSpectrogramCNN.
+
+        :param freq_bands: Número de faixas de frequência mantidas pela cabeça de pooling.
+        """
+        super().__init__()
+
+        # Mesma pilha convolucional do SpectrogramCNN, com ativações ReLU
+        self.conv1 = nn.Conv2d(in_channels=1, out_channels=32, kernel_size=3, stride=1, padding=1)
+        self.bn1 = nn.BatchNorm2d(32)
+        self.pool1 = nn.MaxPool2d(kernel_size=2, stride=2)
+
+        self.conv2 = nn.Conv2d(in_channels=32, out_channels=64, kernel_size=3, stride=1, padding=1)
+        self.bn2 = nn.BatchNorm2d(64)
+        self.pool2 = nn.MaxPool2d(kernel_size=2, stride=2)
+
+        self.conv3 = nn.Conv2d(in_channels=64, out_channels=128, kernel_size=3, stride=1, padding=1)
+        self.bn3 = nn.BatchNorm2d(128)
+        self.pool3 = nn.MaxPool2d(kernel_size=2, stride=2)
+
+        # Reduz as frequências a freq_bands faixas, preservando o eixo do tempo.
+        # A posição na frequência é o que identifica o pitch, por isso ela não é descartada
+        self.freq_pool = nn.AdaptiveAvgPool2d((freq_bands, None))
+
+        self.dropout = nn.Dropout(0.5)
+
+        self.fc1 = nn.Linear(128 * freq_bands, 256)
+        self.fc2 = nn.Linear(256, 1)
+
+    def forward(
+        self,
+        spectrogram: torch.Tensor,
+        mask: Optional[torch.Tensor] = None
+    ) -> torch.Tensor:
+        """
+        Define a passagem direta do modelo.
+
+        :param spectrogram: Tensor de entrada (lote, 1, frequências, frames).
+        :param mask: Máscara (lote, frames) dos frames válidos, para lotes com padding (opcional).
+        :return: Saída do modelo.
+        """
+        if mask is None:
+            spectrogram = self.pool1(F.relu(self.bn1(self.conv1(spectrogram))))
+            spectrogram = self.pool2(F.relu(self.bn2(self.conv2(spectrogram))))
+            spectrogram = self.pool3(F.relu(self.bn3(self.conv3(spectrogram))))
+            spectrogram = self.freq_pool(spectrogram)
+        else:
+            spectrogram = self.__masked_features(spectrogram, mask)
+
+        # (lote, 128, faixas, frames) -> (lote, 128, faixas): max pooling global no tempo
+        spectrogram = spectrogram.amax(dim=-1)
+
+        spectrogram = spectrogram.flatten(1)
+
+        spectrogram = F.relu(self.fc1(spectrogram))
+        spectrogram = self.dropout(spectrogram)
+        spectrogram = self.fc2(spectrogram)
+
+        return spectrogram
+
+    def __masked_features(self, spectrogram: torch.Tensor, mask: torch.Tensor) -> torch.Tensor:
+        """
+        Extrai as features de um lote com padding.
+
+        Os frames de padding são zerados antes de cada convolução, o que equivale ao padding
+        com zeros da própria convolução, e ficam fora das estatísticas do BatchNorm no modo de
+        treinamento. No modo de avaliação cada amostra produz as mesmas features que produziria
+        sozinha, sem padding. No final, os frames de padding são ignorados no max pooling do tempo.
+        """
+        blocks = (
+            (self.conv1, self.bn1, self.pool1),
+            (self.conv2, self.bn2, self.pool2),
+            (self.conv3, self.bn3, self.pool3),
+        )
+
+        for conv, bn, pool in blocks:
+            spectrogram = spectrogram * mask[:, None, None, :spectrogram.size(-1)].to(spectrogram.dtype)
+            spectrogram = conv(spectrogram)
+            spectrogram = pool(F.relu(self.__masked_batch_norm(bn, spectrogram, mask)))
+            # Um frame reduzido só é válido se os dois frames que ele cobre forem válidos
+            mask = -F.max_pool1d(-mask.float().unsqueeze(1), kernel_size=2, stride=2).squeeze(1)
+            mask = mask.bool()
+
+        spectrogram = self.freq_pool(spectrogram)
+
+        # Mantém sempre o primeiro frame, para que nenhuma amostra fique vazia
+        mask = mask[:, :spectrogram.size(-1)].clone()
+        mask[:, 0] = True
+        return spectrogram.masked_fill(~mask[:, None, None, :], float('-inf'))
+
+    @staticmethod
+    def __masked_batch_norm(bn: nn.BatchNorm2d, spectrogram: torch.Tensor, mask: torch.Tensor) -> torch.Tensor:
+        """
+        Aplica o BatchNorm calculando a média e a variância do lote apenas nos frames válidos.
+        No modo de avaliação as estatísticas acumuladas são usadas, e a máscara não é necessária.
+
+        :param bn: Camada de BatchNorm.
+        :param spectrogram: Saída da convolução (lote, canais, frequências, frames).
+        :param mask: Máscara (lote, frames) dos frames válidos.
+        :return: O tensor normalizado.
+        """
+        if not bn.training:
+            return bn(spectrogram)
+
+        weights = mask[:, None, None, :spectrogram.size(-1)].to(spectrogram.dtype)
+        count = weights.sum() * spectrogram.size(2)
+
+        mean = (spectrogram * weights).sum(dim=(0, 2, 3)) / count
+        centered = spectrogram - mean[None, :, None, None]
+        var = (centered.square() * weights).sum(dim=(0, 2, 3)) / count
+
+        if bn.track_running_stats:
+            with torch.no_grad():
+                bn.num_batches_tracked += 1
+                momentum = bn.momentum if bn.momentum is not None else 1.0 / float(bn.num_batches_tracked)
+                # Assim como no BatchNorm, a variância acumulada é a não enviesada
+                unbiased = var * count / (count - 1).clamp(min=1)
+                bn.running_mean.lerp_(mean.detach(), momentum)
+                bn.running_var.lerp_(unbiased.detach(), momentum)
+
+        spectrogram = centered * torch.rsqrt(var + bn.eps)[None, :, None, None]
+        if bn.affine:
+            spectrogram = spectrogram * bn.weight[None, :, None, None] + bn.bias[None, :, None, None]
+        return spectrogram
+
+MODEL_ARCHITECTURES = {
+    'flatten': SpectrogramCNN,
+    'pooled': PooledSpectrogramCNN,
+}
+
+def build_model(architecture: str = 'pooled', **kwargs) -> nn.Module:
+    """
+    Cria um modelo a partir do nome da arquitetura.
+
+    :param architecture: Nome da arquitetura ('flatten' ou 'pooled').
+    :param kwargs: Parâmetros repassados ao construtor do modelo.
+    :return: O modelo instanciado.
+    """
+    if architecture not in MODEL_ARCHITECTURES:
+        raise ValueError(
+            f'Arquitetura {architecture} inválida. Use uma de {list(MODEL_ARCHITECTURES)}.'
+        )
+
+    return MODEL_ARCHITECTURES[architecture](**kwargs)
+
+def model_kwargs(architecture: str, input_shape: Tuple[int, int]) -> Dict[str, Any]:
+    """
+    Retorna os parâmetros que adaptam a arquitetura ao formato das features.
+    Apenas o SpectrogramCNN depende do formato; o PooledSpectrogramCNN aceita qualquer um.
+
+    :param architecture: Nome da arquitetura ('flatten' ou 'pooled').
+    :param input_shape: Formato (frequências, frames) dos espectrogramas (ex. WavController.feature_shape).
+    :return: Parâmetros para build_model e load_model.
+    """
+    return {'input_shape': tuple(input_shape)} if architecture == 'flatten' else {}
+
+def load_model(model_path: str, architecture: str = 'pooled', device: str = 'cpu', **kwargs) -> nn.Module:
+    """
+    Carrega um modelo treinado a partir do state_dict salvo pelo ModelTrainer.
+
+    :param model_path: Caminho do arquivo do modelo (ex. trained_cnn_model.pth).
+    :param architecture: Nome da arquitetura usada no treinamento.
+    :param device: Dispositivo onde o modelo será carregado.
+    :param kwargs: Parâmetros repassados ao construtor do modelo (ex. model_kwargs).
+    :return: O modelo em modo de avaliação.
+    """
+    model = build_model(architecture, **kwargs)
+    model.load_state_dict(torch.load(model_path, map_location=device))
+    return model.to(device).eval()
@@ -0,0 +1,170 @@
+"""
+Módulo para o treinamento distribuído em vários processos (torch.distributed + DDP).
+"""
+
+import contextlib
+import logging
+import os
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Iterator, Optional
+
+import torch
+import torch.distributed as dist
+import torch.nn as nn
+from torch.nn.parallel import DistributedDataParallel
+
+@dataclass(frozen=True)
+class DistributedContext:
+    """
+    Posição do processo atual no treinamento distribuído.
+
+    :param rank: Índice global do processo.
+    :param world_size: Número total de processos.
+    :param local_rank: Índice do processo dentro do nó.
+    :param local_world_size: Número de processos no nó.
+    """
+    rank: int = 0
+    world_size: int = 1
+    local_rank: int = 0
+    local_world_size: int = 1
+
+    @property
+    def enabled(self) -> bool:
+        """
+        True se há mais de um processo treinando.
+        """
+        return self.world_size > 1
+
+    @property
+    def is_main(self) -> bool:
+        """
+        True no processo responsável pelos logs, métricas e checkpoints (rank 0).
+        """
+        return self.rank == 0
+
+    @property
+    def is_local_main(self) -> bool:
+        """
+        True no primeiro processo de cada nó, responsável por preparar os dados locais.
+        """
+        return self.local_rank == 0
+
+    def barrier(self) -> None:
+        """
+        Espera todos os processos chegarem a este ponto.
+        """
+        if self.enabled:
+            dist.barrier()
+
+    @contextlib.contextmanager
+    def local_main_first(self) -> Iterator[None]:
+        """
+        Executa o bloco primeiro no processo principal de cada nó e depois nos demais.
+        Usado na preparação dos dados: o primeiro processo baixa e extrai as features,
+        os outros reaproveitam os arquivos e o cache já gerados.
+
+        Se o bloco falhar no processo principal, o grupo de processos é abortado em vez de
+        chegar à barreira: os demais processos do nó recebem um erro em vez de esperar para sempre.
+        """
+        if not self.is_local_main:
+            self.barrier()
+
+        try:
+            yield
+        except BaseException:
+            if self.is_local_main and self.enabled:
+                logging.error('Falha no processo principal do nó; abortando o grupo de processos.')
+                # Interrompe as coletivas pendentes dos outros ranks (inclusive a barreira acima)
+                dist.destroy_process_group()
+            raise
+
+        if self.is_local_main:
+            self.barrier()
+
+    def resolve_device(self, device: torch.device) -> torch.device:
+        """
+        Associa cada processo à sua GPU, quando o treinamento é em CUDA.
+
+        :param device: Dispositivo configurado.
+        :return: O dispositivo do processo atual.
+        """
+        if self.enabled and device.type == 'cuda' and device.index is None:
+            return torch.device('cuda', self.local_rank)
+        return device
+
+    def wrap_model(self, model: nn.Module) -> nn.Module:
+        """
+        Envolve o modelo em DistributedDataParallel, que sincroniza os pesos iniciais a partir
+        do rank 0 e faz o all-reduce dos gradientes durante o backward.
+
+        :param model: Modelo já no dispositivo do processo.
+        :return: O modelo distribuído, ou o próprio modelo com um único processo.
+        """
+        if not self.enabled:
+            return model
+
+        device = next(model.parameters()).device
+        return DistributedDataParallel(
+            model,
+            device_ids=[device.index] if device.type == 'cuda' else None,
+            # Os gradientes apontam direto para os buckets do all-reduce, sem uma cópia extra
+            gradient_as_bucket_view=True
+        )
+
+SINGLE_PROCESS = DistributedContext()
+
+def init_distributed(
+    backend: str = 'gloo',
+    num_threads: Optional[int] = None,
+    timeout_minutes: float = 30.0
+) -> DistributedContext:
+    """
+    Inicializa o grupo de processos a partir das variáveis definidas pelo torchrun
+    (RANK, WORLD_SIZE, LOCAL_RANK, LOCAL_WORLD_SIZE, MASTER_ADDR, MASTER_PORT).
+    Sem o torchrun, retorna o contexto de um único processo.
+
+    Cada processo usa apenas a sua parte dos núcleos do nó: sem isso, os processos disputam
+    os mesmos núcleos (ou, com o OMP_NUM_THREADS=1 que o torchrun define, usam só um núcleo
+    cada) e o throughput deixa de crescer com o número de processos.
+    Os logs dos processos que não são o rank 0 ficam restritos a avisos e erros.
+
+    :param backend: Backend do torch.distributed ('gloo' para CPU).
+    :param num_threads: Threads por processo. Por padrão, os núcleos do nó divididos entre os processos.
+    :param timeout_minutes: Tempo máximo de espera das operações coletivas, incluindo a barreira
+        em que os demais processos esperam o primeiro de cada nó baixar e extrair o dataset.
+    :return: O contexto do processo atual.
+    """
+    world_size = int(os.getenv('WORLD_SIZE', '1'))
+    if world_size <= 1:
+        return SINGLE_PROCESS
+
+    context = DistributedContext(
+        rank=int(os.environ['RANK']),
+        world_size=world_size,
+        local_rank=int(os.getenv('LOCAL_RANK', '0')),
+        local_world_size=int(os.getenv('LOCAL_WORLD_SIZE', '1'))
+    )
+
+    if not dist.is_initialized():
+        dist.init_process_group(backend=backend, timeout=timedelta(minutes=timeout_minutes))
+
+    torch.set_num_threads(num_threads or max(1, (os.cpu_count() or 1) // context.local_world_size))
+
+    if not context.is_main:
+        logging.getLogger().setLevel(logging.WARNING)
+
+    logging.info(
+        'Treinamento distribuído (%s): %s processos, %s threads por processo.',
+        backend,
+        context.world_size,
+        torch.get_num_threads()
+    )
+    return context
+
+def cleanup_distributed() -> None:
+    """
+    Encerra o grupo de processos, se ele foi inicializado.
+    """
+    if dist.is_available() and dist.is_initialized():
+        dist.destroy_process_group()
@@ -0,0 +1,94 @@
+"""
+Módulo com as configurações de desempenho do treinamento.
+"""
+
+import contextlib
+import logging
+from dataclasses import dataclass
+from typing import Optional
+
+import torch
+
+PRECISIONS = {
+    'fp32': None,
+    'bf16': torch.bfloat16,
+    'fp16': torch.float16,
+}
+
+@dataclass
+class PerformanceConfig:
+    """
+    Configurações de desempenho usadas pelo ModelTrainer.
+
+    :param device: Dispositivo de treinamento ('cpu', 'cuda', 'mps'...). Se None, é escolhido automaticamente.
+    :param precision: Precisão do autocast: 'fp32' (desligado), 'bf16' ou 'fp16'.
+    :param compile: Se True, o modelo é compilado com torch.compile.
+    :param channels_last: Se True, usa o formato de memória channels-last nas convoluções.
+    :param gradient_accumulation_steps: Número de lotes acumulados antes de cada passo do otimizador.
+    :param log_interval: Número de lotes entre cada log de perda e throughput.
+    :param profile_dir: Se definido, grava um trace do torch.profiler de alguns passos nesse diretório.
+    """
+    device: Optional[str] = None
+    precision: str = 'fp32'
+    compile: bool = False
+    channels_last: bool = False
+    gradient_accumulation_steps: int = 1
+    log_interval: int = 10
+    profile_dir: Optional[str] = None
+
+    def __post_init__(self) -> None:
+        if self.precision not in PRECISIONS:
+            raise ValueError(f'Precisão {self.precision} inválida. Use uma de {list(PRECISIONS)}.')
+
+        if self.gradient_accumulation_steps < 1:
+            raise ValueError('O número de passos de acumulação deve ser maior que zero.')
+
+    def resolve_device(self) -> torch.device:
+        """
+        Retorna o dispositivo configurado ou o melhor disponível (cuda, mps, cpu).
+        :return: O dispositivo de treinamento.
+        """
+        if self.device is not None:
+            return torch.device(self.device)
+
+        if torch.cuda.is_available():
+            return torch.device('cuda')
+
+        if getattr(torch.backends, 'mps', None) is not None and torch.backends.mps.is_available():
+            return torch.device('mps')
+
+        return torch.device('cpu')
+
+    @property
+    def autocast_dtype(self) -> Optional[torch.dtype]:
+        """
+        Tipo usado pelo autocast, ou None se a precisão mista estiver desligada.
+        """
+        return PRECISIONS[self.precision]
+
+    def autocast(self, device: torch.device):
+        """
+        Retorna o contexto de autocast para o dispositivo.
+
+        :param device: Dispositivo de treinamento.
+        :return: O contexto de autocast, ou um contexto nulo em fp32.
+        """
+        if self.autocast_dtype is None:
+            return contextlib.nullcontext()
+
+        return torch.autocast(device_type=device.type, dtype=self.autocast_dtype)
+
+    def grad_scaler(self, device: torch.device) -> 'torch.amp.GradScaler':
+        """
+        Cria o GradScaler, habilitado apenas em fp16 (bf16 não precisa de escala).
+
+        :param device: Dispositivo de treinamento.
+        :return: O GradScaler.
+        """
+        enabled = self.precision == 'fp16'
+
+        if enabled and device.type not in ('cuda', 'cpu'):
+            logging.warning('GradScaler não suportado em %s, desabilitando.', device.type)
+            enabled = False
+
+        return torch.amp.GradScaler(device.type, enabled=enabled)
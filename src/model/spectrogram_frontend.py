@@ -0,0 +1,133 @@
+"""
+Módulo com o front end de features em PyTorch, alternativo ao librosa,
+para calcular os espectrogramas de um lote inteiro de áudios de uma vez.
+"""
+
+from typing import Optional, Sequence
+
+import librosa
+import numpy as np
+import torch
+import torch.nn as nn
+from controller.wav_controller import WavController
+
+class TorchSpectrogram(nn.Module):
+    """
+    Calcula o espectrograma em dB de um lote de áudios com torch.stft.
+
+    Reproduz numericamente o caminho do WavController (librosa.stft, filtros mel opcionais
+    e conversão para dB com ref=np.max), mas vetorizado no lote e no mesmo
+    dispositivo do modelo. A CQT não tem equivalente aqui. Pode ser usado isoladamente ou como primeira camada do
+    modelo, ex. nn.Sequential(TorchSpectrogram(), SpectrogramCNN()).
+    """
+
+    def __init__(
+        self,
+        n_fft: int = 2048,
+        hop_length: int = 512,
+        top_db: Optional[float] = 80.0,
+        amin: float = 1e-5,
+        n_mels: Optional[int] = None,
+        sample_rate: int = 16000
+    ) -> None:
+        """
+        Instancia o front end TorchSpectrogram.
+
+        :param n_fft: Tamanho da janela da STFT.
+        :param hop_length: Número de amostras entre janelas consecutivas da STFT.
+        :param top_db: Limite inferior (em dB abaixo do pico) do espectrograma.
+        :param amin: Amplitude mínima, para evitar log de zero.
+        :param n_mels: Número de faixas mel. Se None, o espectrograma é linear.
+        :param sample_rate: Taxa de amostragem dos áudios, usada pelos filtros mel.
+        """
+        super().__init__()
+
+        self.n_fft = n_fft
+        self.hop_length = hop_length
+        self.top_db = top_db
+        self.amin = amin
+
+        # Janela de Hann periódica, a mesma usada pelo librosa
+        self.register_buffer('window', torch.hann_window(n_fft), persistent=False)
+
+        # Mesmos filtros mel do WavController
+        if n_mels is None:
+            self.register_buffer('mel_basis', None, persistent=False)
+        else:
+            mel_basis = librosa.filters.mel(sr=sample_rate, n_fft=n_fft, n_mels=n_mels, dtype=np.float32)
+            self.register_buffer('mel_basis', torch.from_numpy(mel_basis), persistent=False)
+
+    @classmethod
+    def from_wav_controller(cls, wav_controller: WavController) -> 'TorchSpectrogram':
+        """
+        Cria o front end com os mesmos parâmetros de um WavController.
+
+        :param wav_controller: WavController de referência.
+        :return: O front end configurado.
+        """
+        if wav_controller.feature_type == 'cqt':
+            raise ValueError('O front end em PyTorch não suporta a CQT; use o WavController.')
+
+        return cls(
+            n_fft=wav_controller.n_fft,
+            hop_length=wav_controller.hop_length,
+            top_db=wav_controller.top_db,
+            n_mels=wav_controller.n_bins if wav_controller.feature_type == 'mel' else None,
+            sample_rate=wav_controller.sample_rate
+        )
+
+    def forward(self, waveforms: torch.Tensor) -> torch.Tensor:
+        """
+        Calcula os espectrogramas de um lote de áudios.
+
+        :param waveforms: Tensor (lote, amostras) ou (amostras,) com os áudios.
+        :return: Tensor (lote, 1, frequências, frames) com os espectrogramas em dB.
+        """
+        if waveforms.dim() == 1:
+            waveforms = waveforms.unsqueeze(0)
+
+        stft = torch.stft(
+            waveforms,
+            n_fft=self.n_fft,
+            hop_length=self.hop_length,
+            window=self.window.to(waveforms.dtype),
+            center=True,
+            pad_mode='constant',
+            return_complex=True
+        )
+
+        # As operações seguintes são feitas in-place para não criar arrays temporários
+        spectrogram = stft.abs()
+        del stft
+
+        if self.mel_basis is not None:
+            spectrogram = torch.matmul(self.mel_basis.to(spectrogram.dtype), spectrogram)
+
+        # Referência: o pico de cada espectrograma (ref=np.max)
+        ref = spectrogram.amax(dim=(-2, -1), keepdim=True).clamp_(min=self.amin).log10_().mul_(20.0)
+
+        spectrogram = spectrogram.clamp_(min=self.amin).log10_().mul_(20.0).sub_(ref)
+
+        if self.top_db is not None:
+            floor = spectrogram.amax(dim=(-2, -1), keepdim=True).sub_(self.top_db)
+            spectrogram = torch.maximum(spectrogram, floor, out=spectrogram)
+
+        # Adicionando o canal para CNN
+        return spectrogram.unsqueeze(1)
+
+    def batch_from_numpy(
+        self,
+        waveforms: Sequence[np.ndarray],
+        device: Optional[torch.device] = None
+    ) -> torch.Tensor:
+        """
+        Empilha áudios de mesmo tamanho em um lote e calcula os espectrogramas.
+
+        :param waveforms: Lista de arrays com as amostras dos áudios.
+        :param device: Dispositivo onde a STFT será calculada.
+        :return: Tensor (lote, 1, frequências, frames) com os espectrogramas em dB.
+        """
+        batch = torch.from_numpy(np.stack(waveforms).astype(np.float32, copy=False))
+
+        with torch.no_grad():
+            return self(batch.to(device or self.window.device))
@@ -2,11 +2,20 @@
 Módulo para treinar e salvar o modelo CNN.
 """
 
+import contextlib
 import logging
+import time
+from typing import Optional, Sequence, Tuple
+
 import torch
 import torch.nn as nn
 import torch.optim as optim
 from torch.utils.data import DataLoader
+from data.loader import skip_batches
+from model.checkpoint import CheckpointManager, capture_rng_state, restore_rng_state
+from model.distributed import SINGLE_PROCESS, DistributedContext
+from model.performance import PerformanceConfig
+from telemetry.instrumentation import NULL_INSTRUMENTATION, Instrumentation, ProfilerWindow
 
 
 class ModelTrainer:
@@ -14,18 +23,57 @@ class ModelTrainer:
     Classe responsável pelo treinamento, avaliação e salvamento do modelo.
     """
 
-    def __init__(self, model: nn.Module, num_epochs: int, learning_rate: float):
+    def __init__(
+        self,
+        model: nn.Module,
+        num_epochs: int,
+        learning_rate: float,
+        performance: Optional[PerformanceConfig] = None,
+        instrumentation: Optional[Instrumentation] = None,
+        checkpoints: Optional[CheckpointManager] = None,
+        distributed: Optional[DistributedContext] = None
+    ):
         """
         Inicializa o objeto ModelTrainer.
         :param model: O modelo a ser treinado.
         :param num_epochs: Número de épocas para treinar.
         :param learning_rate: Taxa de aprendizado do otimizador.
+        :param performance: Configurações de desempenho (dispositivo, precisão, compilação...).
+        :param instrumentation: Métricas de tempo e memória do treinamento (opcional).
+        :param checkpoints: Gerenciador dos checkpoints periódicos (opcional). Se houver um
+            checkpoint salvo, o treinamento continua exatamente de onde parou.
+        :param distributed: Contexto do treinamento distribuído (opcional). Com mais de um processo,
+            o modelo é envolvido em DistributedDataParallel e apenas o rank 0 grava checkpoints.
         """
-        self.model = model
+        self.performance = performance or PerformanceConfig()
+        self.instrumentation = instrumentation or NULL_INSTRUMENTATION
+        self.checkpoints = checkpoints
+        self.distributed = distributed or SINGLE_PROCESS
+        self._resume_rng = None
+        self.device = self.distributed.resolve_device(self.performance.resolve_device())
+        self.memory_format = (
+            torch.channels_last if self.performance.channels_last else torch.contiguous_format
+        )
+
+        self.model = model.to(self.device, memory_format=self.memory_format)
         self.num_epochs = num_epochs
         self.learning_rate = learning_rate
         self.criterion = nn.MSELoss()  # Função de perda para classificação
         self.optimizer = optim.Adam(self.model.parameters(), lr=self.learning_rate)
+        self.scaler = self.performance.grad_scaler(self.device)
+
+        # O modelo compilado (e distribuído) é usado apenas no forward; o state_dict continua vindo do original
+        self.ddp_model = self.distributed.wrap_model(self.model)
+        self.forward_model = torch.compile(self.ddp_model) if self.performance.compile else self.ddp_model
+
+        logging.info(
+            "Treinamento em %s (precisão %s, compile=%s, channels_last=%s, acumulação=%s)",
+            self.device,
+            self.performance.precision,
+            self.performance.compile,
+            self.performance.channels_last,
+            self.performance.gradient_accumulation_steps
+        )
 
     def train(self, data_loader: DataLoader):
         """
@@ -34,39 +82,195 @@ class ModelTrainer:
         """
         self.model.train()  # Coloca o modelo em modo de treinamento
 
-        for epoch in range(self.num_epochs):
-            running_loss = 0.0
+        start_epoch, start_step = self.__resume()
 
-            for i, (spectograms, labels) in enumerate(data_loader):
-                # Adicionar dimensão extra para os labels
-                labels = labels.unsqueeze(1).float()
+        # A ordem dos lotes vem dos samplers, embaralhados com semente + época (set_epoch), e não
+        # depende de quantas épocas já rodaram, o que permite retomar no meio de uma época. O gerador
+        # do DataLoader, de onde saem as sementes dos workers, também é reiniciado a cada época
+        generator = data_loader.generator
+        base_seed = generator.initial_seed() if generator is not None else None
 
-                # Zerar gradientes do otimizador
-                self.optimizer.zero_grad()
+        with contextlib.ExitStack() as stack:
+            profiler = None
+            if self.performance.profile_dir:
+                profiler = stack.enter_context(ProfilerWindow(self.performance.profile_dir))
 
-                # Forward pass
-                outputs = self.model(spectograms)
-                loss = self.criterion(outputs, labels)
+            for epoch in range(start_epoch, self.num_epochs):
+                if generator is not None:
+                    generator.manual_seed(base_seed + epoch)
 
-                # Backward pass e atualização de pesos
-                loss.backward()
-                self.optimizer.step()
+                self.__train_epoch(data_loader, epoch, profiler, start_step if epoch == start_epoch else 0)
 
-                running_loss += loss.item()
+                if self.checkpoints is not None:
+                    self.__save_checkpoint(epoch + 1, 0)
 
-                if i % 10 == 9:  # Log a cada 10 minibatches
-                    logging.info(f"Época {epoch + 1}, Lote {i + 1}: Perda média = {running_loss / 10:.4f}")
-                    running_loss = 0.0
+        if self.checkpoints is not None:
+            self.checkpoints.wait()
 
+        self.instrumentation.flush(epoch=self.num_epochs, step='end')
         logging.info("Treinamento finalizado")
 
+    def __train_epoch(
+        self,
+        data_loader: DataLoader,
+        epoch: int,
+        profiler: Optional[ProfilerWindow],
+        skip_steps: int = 0
+    ) -> None:
+        """
+        Executa uma época de treinamento, separando o tempo de espera pelos dados do tempo de cálculo.
+        Ao retomar de um checkpoint, os primeiros skip_steps lotes (já treinados) são pulados
+        no batch sampler, sem que as suas amostras sejam lidas.
+        """
+        accumulation_steps = self.performance.gradient_accumulation_steps
+        log_interval = self.performance.log_interval
+        metrics = self.instrumentation
+
+        running_loss = 0.0
+        running_samples = 0
+        running_data_wait = 0.0
+        interval_start = time.perf_counter()
+
+        # Datasets iteráveis e samplers embaralham de forma diferente a cada época
+        for source in (data_loader.dataset, data_loader.sampler, data_loader.batch_sampler):
+            if hasattr(source, 'set_epoch'):
+                source.set_epoch(epoch)
+
+        # Zerar gradientes do otimizador
+        self.optimizer.zero_grad(set_to_none=True)
+
+        # Com DDP, o all-reduce só é feito no lote que aplica os gradientes; nos lotes acumulados
+        # antes dele, os gradientes ficam locais. Sem o número de lotes, o último lote da época
+        # não é conhecido e todos os lotes sincronizam.
+        num_batches = len(data_loader) if self.distributed.enabled and hasattr(data_loader, '__len__') else None
+        defer_sync = self.distributed.enabled and accumulation_steps > 1 and num_batches is not None
+
+        step_end = time.perf_counter()
+
+        i = skip_steps - 1
+        for i, batch in enumerate(skip_batches(data_loader, skip_steps), start=skip_steps):
+            if self._resume_rng is not None:
+                # Os geradores voltam ao estado do checkpoint só depois de pular os lotes já treinados
+                # (o checkpoint guarda o estado do rank 0; os demais seguem com os próprios geradores)
+                if self.distributed.is_main:
+                    restore_rng_state(self._resume_rng)
+                self._resume_rng = None
+
+            # Tempo parado esperando o DataLoader: alto aqui indica um job limitado pela entrada
+            data_ready = time.perf_counter()
+            running_data_wait += data_ready - step_end
+            metrics.observe('data_wait', data_ready - step_end)
+
+            spectograms, labels, mask = self.__to_device(batch)
+            # Adicionar dimensão extra para os labels
+            labels = labels.unsqueeze(1).float()
+
+            is_step = (i + 1) % accumulation_steps == 0
+            sync = contextlib.nullcontext()
+            if defer_sync and not is_step and i + 1 != num_batches:
+                sync = self.ddp_model.no_sync()
+
+            with sync:
+                # Forward pass
+                with self.performance.autocast(self.device):
+                    outputs = self.__forward(spectograms, mask)
+                loss = self.criterion(outputs.float(), labels)
+
+                # Backward pass, com a perda dividida entre os lotes acumulados
+                self.scaler.scale(loss / accumulation_steps).backward()
+
+            if is_step:
+                self.__optimizer_step()
+
+                if self.checkpoints is not None and (i + 1) % self.checkpoints.interval_steps == 0:
+                    self.__save_checkpoint(epoch, i + 1)
+
+            # loss.item() sincroniza com o dispositivo, então o tempo de cálculo abaixo é real
+            running_loss += loss.item()
+            running_samples += labels.size(0)
+
+            step_end = time.perf_counter()
+            metrics.observe('compute', step_end - data_ready)
+            metrics.increment('samples', labels.size(0))
+            metrics.increment('steps')
+
+            if profiler is not None:
+                profiler.step()
+
+            if i % log_interval == log_interval - 1:  # Log a cada log_interval minibatches
+                elapsed = time.perf_counter() - interval_start
+                # Throughput total: o DistributedSampler dá o mesmo número de amostras a cada processo
+                samples = running_samples * self.distributed.world_size
+                samples_per_second = samples / elapsed if elapsed > 0 else 0.0
+                logging.info(
+                    "Época %s, Lote %s: Perda média = %.4f, %.1f amostras/s, %.0f%% esperando dados",
+                    epoch + 1,
+                    i + 1,
+                    running_loss / log_interval,
+                    samples_per_second,
+                    100 * running_data_wait / elapsed if elapsed > 0 else 0.0
+                )
+
+                metrics.gauge('samples_per_second', samples_per_second)
+                metrics.gauge('loss', running_loss / log_interval)
+                metrics.record_memory(self.device)
+                metrics.flush(epoch=epoch + 1, step=i + 1)
+
+                running_loss = 0.0
+                running_samples = 0
+                running_data_wait = 0.0
+                interval_start = time.perf_counter()
+                step_end = interval_start
+
+        # Aplica os gradientes que sobraram de uma acumulação incompleta
+        if (i + 1) % accumulation_steps != 0:
+            self.__optimizer_step()
+
+    def __resume(self) -> Tuple[int, int]:
+        """
+        Restaura o último checkpoint, se houver.
+        :return: A época e o número de lotes já processados nela.
+        """
+        self._resume_rng = None
+
+        state = self.checkpoints.load() if self.checkpoints is not None else None
+        if state is None:
+            return 0, 0
+
+        self.model.load_state_dict(state['model'])
+        self.optimizer.load_state_dict(state['optimizer'])
+        self.scaler.load_state_dict(state['scaler'])
+        self._resume_rng = state['rng']
+
+        logging.info("Retomando treinamento da época %s, lote %s.", state['epoch'] + 1, state['step'])
+        return state['epoch'], state['step']
+
+    def __save_checkpoint(self, epoch: int, step: int) -> None:
+        """
+        Agenda a gravação do estado completo do treinamento. Com DDP, os pesos são iguais em
+        todos os processos e apenas o rank 0 grava.
+        """
+        if not self.distributed.is_main:
+            return
+
+        self.checkpoints.save(
+            {
+                'model': self.model.state_dict(),
+                'optimizer': self.optimizer.state_dict(),
+                'scaler': self.scaler.state_dict(),
+                'rng': capture_rng_state(),
+            },
+            epoch,
+            step
+        )
+
     def save_model(self, file_path: str):
         """
         Salva o modelo treinado em um arquivo.
         :param file_path: O caminho para salvar o modelo.
         """
         torch.save(self.model.state_dict(), file_path)
-        logging.info(f"Modelo salvo em {file_path}")
+        logging.info("Modelo salvo em %s", file_path)
 
     def evaluate(self, data_loader: DataLoader):
         """
@@ -78,12 +282,48 @@ class ModelTrainer:
         total = 0
 
         with torch.no_grad():
-            for spectograms, labels in data_loader:
-                outputs = self.model(spectograms)
+            for batch in data_loader:
+                spectograms, labels, mask = self.__to_device(batch)
+
+                with self.performance.autocast(self.device):
+                    outputs = self.__forward(spectograms, mask)
+
                 _, predicted = torch.max(outputs.data, 1)
                 total += labels.size(0)
                 correct += (predicted == labels).sum().item()
 
         accuracy = 100 * correct / total
-        logging.info(f"Acurácia do modelo: {accuracy:.2f}%")
+        logging.info("Acurácia do modelo: %.2f%%", accuracy)
         return accuracy
+
+    def __to_device(
+        self,
+        batch: Sequence[torch.Tensor]
+    ) -> Tuple[torch.Tensor, torch.Tensor, Optional[torch.Tensor]]:
+        """
+        Move um lote para o dispositivo de treinamento, no formato de memória configurado.
+        Espectrogramas armazenados em float16 são convertidos já em lote.
+        Lotes com padding trazem também a máscara dos frames válidos.
+        """
+        spectograms, labels = batch[0], batch[1]
+        mask = batch[2].to(self.device, non_blocking=True) if len(batch) > 2 else None
+
+        spectograms = spectograms.to(self.device, dtype=torch.float32, non_blocking=True)
+        spectograms = spectograms.contiguous(memory_format=self.memory_format)
+        return spectograms, labels.to(self.device, non_blocking=True), mask
+
+    def __forward(self, spectograms: torch.Tensor, mask: Optional[torch.Tensor]) -> torch.Tensor:
+        """
+        Executa o forward do modelo, repassando a máscara apenas quando ela existe.
+        """
+        if mask is None:
+            return self.forward_model(spectograms)
+        return self.forward_model(spectograms, mask=mask)
+
+    def __optimizer_step(self) -> None:
+        """
+        Aplica os gradientes acumulados e os zera.
+        """
+        self.scaler.step(self.optimizer)
+        self.scaler.update()
+        self.optimizer.zero_grad(set_to_none=True)
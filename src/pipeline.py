@@ -0,0 +1,624 @@
+"""
+Módulo com as etapas do pipeline (preparação dos dados, treinamento, exportação, avaliação
+e predição), executadas pelos subcomandos de main.py.
+
+As configurações são lidas das variáveis de ambiente quando o módulo é importado; main.py
+carrega o .env e o arquivo de configuração antes de importá-lo. Os componentes (WavController,
+repositório do Hub, grupo distribuído, métricas) são criados apenas no primeiro uso, e os
+módulos do Hugging Face (datasets, huggingface_hub) são importados apenas pelas etapas que
+acessam os datasets.
+"""
+
+import dataclasses
+import functools
+import logging
+import os
+from typing import TYPE_CHECKING, Dict, List
+
+from torch.utils.data import DataLoader
+from torch.utils.data.distributed import DistributedSampler
+from midi.midi_converter import MidiConverter
+from data.feature_cache import FeatureCache
+from data.spectogram_dataset import SpectrogramDataset
+from data.memmap_dataset import MemmapSpectrogramDataset
+from data.bucketing import BucketBatchSampler, PadCollate
+from data.loader import LoaderConfig, build_data_loader
+from data.feature_shards import MANIFEST_FILE, FeatureShardWriter, ShardedSpectrogramDataset
+from controller.wav_controller import WavController
+from controller.feature_extractor import FeatureExtractor
+from model.cnn import build_model, load_model, model_kwargs
+from model.trainer import ModelTrainer
+from model.checkpoint import CheckpointManager
+from model.distributed import DistributedContext, cleanup_distributed, init_distributed
+from inference.export import ModelExporter
+from inference.transcriber import NoteEvent, SlidingWindowTranscriber
+from model.performance import PerformanceConfig
+from telemetry.instrumentation import (
+    Instrumentation, JsonLinesSink, LoggingSink, PrometheusTextSink, NULL_INSTRUMENTATION
+)
+
+if TYPE_CHECKING:
+    from data.data_set import DataSet
+    from repositories.huggingface_repository import HugginfaceRepository
+
+# Caminho do modelo treinado
+model_path = os.getenv('MODEL_PATH', 'trained_cnn_model.pth')
+
+# Features: 'stft' (linear, 1025 frequências), 'mel' ou 'cqt' (FEATURE_BINS faixas), em float32 ou float16
+sample_rate = int(os.getenv('SAMPLE_RATE', '16000'))
+clip_seconds = float(os.getenv('CLIP_SECONDS', '4.0'))
+
+# Hiperparâmetros
+batch_size = 32
+learning_rate = 0.001
+num_epochs = 10
+num_classes = 120
+
+# Arquitetura do modelo: 'pooled' (cabeça de pooling, entrada de tamanho variável) ou 'flatten'
+model_architecture = os.getenv('MODEL_ARCHITECTURE', 'pooled')
+
+# Desempenho do treinamento
+performance = PerformanceConfig(
+    device=os.getenv('TRAIN_DEVICE'),
+    precision=os.getenv('TRAIN_PRECISION', 'fp32'),
+    compile=os.getenv('TRAIN_COMPILE', '0') == '1',
+    channels_last=os.getenv('TRAIN_CHANNELS_LAST', '0') == '1',
+    gradient_accumulation_steps=int(os.getenv('GRADIENT_ACCUMULATION_STEPS', '1')),
+    profile_dir=os.getenv('PROFILE_DIR')
+)
+
+# Extração de features
+feature_workers = int(os.getenv('FEATURE_WORKERS', str(os.cpu_count() or 1)))
+feature_chunk_size = int(os.getenv('FEATURE_CHUNK_SIZE', '16'))
+
+# Armazenamento dos espectrogramas: 'memory' (lista em RAM) ou 'memmap' (arquivo contíguo)
+spectrogram_storage = os.getenv('SPECTROGRAM_STORAGE', 'memmap')
+spectrogram_storage_path = os.getenv('SPECTROGRAM_STORAGE_PATH', './assets/spectrograms/')
+spectrogram_dtype = os.getenv('SPECTROGRAM_DTYPE', 'float32')
+evaluation_storage_path = os.getenv('EVALUATION_STORAGE_PATH', './assets/spectrograms_test/')
+
+# Lotes agrupados por duração, com padding apenas dentro de cada bucket
+length_bucketing = os.getenv('LENGTH_BUCKETING', '0') == '1'
+num_buckets = int(os.getenv('NUM_BUCKETS', '10'))
+
+# Modo streaming: as features são calculadas sob demanda, com memória constante
+streaming = os.getenv('STREAMING', '0') == '1'
+shuffle_buffer_size = int(os.getenv('SHUFFLE_BUFFER_SIZE', '1000'))
+streaming_workers = int(os.getenv('STREAMING_WORKERS', '0'))
+
+# Pipeline de entrada do treinamento
+loader_config = LoaderConfig(
+    num_workers=int(os.getenv('DATALOADER_WORKERS', '0')),
+    persistent_workers=os.getenv('PERSISTENT_WORKERS', '1') == '1',
+    pin_memory={'1': True, '0': False}.get(os.getenv('PIN_MEMORY', ''), None),
+    prefetch_factor=int(os.getenv('PREFETCH_FACTOR', '2')),
+    seed=int(os.getenv('DATA_SEED', '0'))
+)
+
+# Ingestão direta do .tar.gz: os áudios não são descompactados nem enviados ao Hugging Face
+stream_ingest = os.getenv('STREAM_INGEST', '0') == '1'
+
+# Shards Arrow com os espectrogramas pré-calculados (float16), gerados uma vez e reutilizados
+feature_shards = os.getenv('FEATURE_SHARDS', '0') == '1'
+feature_shards_path = os.getenv('FEATURE_SHARDS_PATH', './assets/feature_shards/')
+feature_shard_size = int(os.getenv('FEATURE_SHARD_SIZE', '1000'))
+feature_shards_repo = os.getenv('FEATURE_SHARDS_REPO')
+
+# Checkpoints periódicos do treinamento (modelo, otimizador, época/lote e geradores aleatórios)
+checkpoint_dir = os.getenv('CHECKPOINT_DIR', './assets/checkpoints/')
+checkpoint_interval = int(os.getenv('CHECKPOINT_INTERVAL', '500'))
+checkpoint_keep_last = int(os.getenv('CHECKPOINT_KEEP_LAST', '2'))
+
+# Exportação para inferência em CPU (int8, TorchScript, ONNX): habilitada com EXPORT_DIR
+export_dir = os.getenv('EXPORT_DIR')
+export_calibration_batches = int(os.getenv('EXPORT_CALIBRATION_BATCHES', '32'))
+
+@functools.lru_cache(maxsize=None)
+def get_distributed() -> DistributedContext:
+    """
+    Função que inicializa o treinamento distribuído, no primeiro uso. Ativado quando o script
+    é executado pelo torchrun (ex. torchrun --nproc_per_node=4 main.py train).
+    Apenas o rank 0 registra logs, métricas e checkpoints.
+
+    :return: O contexto do processo atual.
+    """
+    return init_distributed(
+        backend=os.getenv('DIST_BACKEND', 'gloo'),
+        num_threads=int(os.getenv('DIST_THREADS', '0')) or None,
+        # Na primeira execução, a barreira espera o download e a extração de todo o dataset
+        timeout_minutes=float(os.getenv('DIST_TIMEOUT_MINUTES', '180'))
+    )
+
+@functools.lru_cache(maxsize=None)
+def get_feature_cache() -> FeatureCache:
+    """
+    Função que cria o cache em disco dos espectrogramas.
+
+    :return: O objeto FeatureCache.
+    """
+    return FeatureCache(
+        cache_dir=os.getenv('FEATURE_CACHE_DIR', './assets/feature_cache/'),
+        max_bytes=int(os.getenv('FEATURE_CACHE_MAX_BYTES', str(20 * 1024 ** 3)))
+    )
+
+@functools.lru_cache(maxsize=None)
+def get_wav_controller() -> WavController:
+    """
+    Função que cria o WavController conforme as features configuradas.
+
+    :return: O objeto WavController.
+    """
+    return WavController(
+        MidiConverter(),
+        feature_cache=get_feature_cache(),
+        feature_type=os.getenv('FEATURE_TYPE', 'stft'),
+        n_bins=int(os.getenv('FEATURE_BINS', '0')) or None,
+        sample_rate=sample_rate,
+        dtype=os.getenv('FEATURE_DTYPE', 'float32')
+    )
+
+@functools.lru_cache(maxsize=None)
+def get_hub_repo() -> 'HugginfaceRepository':
+    """
+    Função que cria o repositório do Hugging Face, com o catálogo local dos datasets
+    consultado antes de qualquer acesso à rede.
+
+    :return: O objeto HugginfaceRepository.
+    """
+    # pylint: disable=import-outside-toplevel
+    from repositories.huggingface_repository import HugginfaceRepository
+    from repositories.dataset_catalog import DatasetCatalog
+
+    dataset_catalog = DatasetCatalog(
+        catalog_path=os.getenv('DATASET_CATALOG_PATH', './assets/dataset_catalog.json'),
+        ttl_seconds=float(os.getenv('DATASET_CATALOG_TTL', str(24 * 3600)))
+    )
+    return HugginfaceRepository(os.getenv('HUGGINGFACEHUB_USERNAME'), catalog=dataset_catalog)
+
+@functools.lru_cache(maxsize=None)
+def get_instrumentation() -> Instrumentation:
+    """
+    Função que cria a instrumentação conforme as variáveis de ambiente.
+    Métricas de tempo e memória: METRICS=1, com sinks opcionais em METRICS_JSONL e METRICS_PROMETHEUS.
+    Sem METRICS=1, retorna a instrumentação desabilitada (sem custo).
+
+    :return: O objeto Instrumentation.
+    """
+    if os.getenv('METRICS', '0') != '1' or not get_distributed().is_main:
+        return NULL_INSTRUMENTATION
+
+    sinks = [LoggingSink()]
+
+    if os.getenv('METRICS_JSONL'):
+        sinks.append(JsonLinesSink(os.getenv('METRICS_JSONL')))
+
+    if os.getenv('METRICS_PROMETHEUS'):
+        sinks.append(PrometheusTextSink(os.getenv('METRICS_PROMETHEUS')))
+
+    return Instrumentation(sinks)
+
+def run_all() -> None:
+    """
+    Função que executa o pipeline completo: treinamento, exportação (se configurada) e avaliação.
+    """
+    trained_path = run_train()
+
+    if get_distributed().is_main:
+        run_evaluate(trained_path)
+
+def run_prepare() -> None:
+    """
+    Função que baixa os datasets e extrai as features de treinamento, sem treinar.
+    Permite preparar os dados em um job separado (ex. em uma máquina sem GPU).
+    """
+    distributed = get_distributed()
+
+    try:
+        with distributed.local_main_first():
+            get_training_data_loader(load_training_dataset())
+
+        if distributed.is_main:
+            get_dataset(train=False)
+    finally:
+        cleanup_distributed()
+
+def run_train(export: bool = True) -> str:
+    """
+    Função que treina o modelo e gera os artefatos de inferência, se EXPORT_DIR estiver definido.
+
+    :param export: Se False, não exporta o modelo mesmo com EXPORT_DIR definido.
+    :return: O caminho para o modelo treinado.
+    """
+    distributed = get_distributed()
+
+    try:
+        with distributed.local_main_first():
+            dataset = load_training_dataset()
+        trained_path = train_model(dataset)
+
+        if export and export_dir and distributed.is_main:
+            export_model(trained_path, dataset)
+
+        return trained_path
+    finally:
+        cleanup_distributed()
+
+def run_evaluate(trained_path: str = model_path) -> None:
+    """
+    Função que avalia o modelo treinado no dataset de teste.
+
+    :param trained_path: O caminho para o modelo treinado.
+    """
+    evaluate_model(trained_path, get_evaluation_data_loader())
+
+def run_predict(
+    paths: List[str],
+    trained_path: str = model_path,
+    hop_seconds: float = 1.0
+) -> Dict[str, List[NoteEvent]]:
+    """
+    Função que transcreve arquivos de áudio com o modelo treinado.
+
+    :param paths: Caminhos dos arquivos de áudio.
+    :param trained_path: O caminho para o modelo treinado.
+    :param hop_seconds: Distância entre o início de janelas consecutivas, em segundos.
+    :return: As notas detectadas em cada arquivo.
+    """
+    model = load_model(trained_path, model_architecture, **create_model_kwargs())
+    transcriber = SlidingWindowTranscriber(
+        model,
+        get_wav_controller(),
+        sample_rate=sample_rate,
+        window_seconds=clip_seconds,
+        hop_seconds=hop_seconds
+    )
+
+    return {path: list(transcriber.transcribe_file(path)) for path in paths}
+
+def load_training_dataset() -> 'DataSet':
+    """
+    Função que carrega o dataset de treinamento. Na ingestão direta do .tar.gz, o dataset
+    não é baixado para o Hugging Face.
+
+    :return: O objeto DataSet.
+    """
+    return get_data_set(train=True) if stream_ingest else get_dataset(train=True)
+
+def get_dataset(train: bool) -> 'DataSet':
+    """
+    Função que carrega o dataset e retorna um DataLoader.
+
+    :param train: Se True, carrega o dataset de treinamento, caso contrário, o de dataset de teste.
+    :return: O DataLoader contendo os dados de treinamento.
+    """
+    return get_data_set(train).download_data_set()
+
+def get_data_set(train: bool) -> 'DataSet':
+    """
+    Função que cria o objeto DataSet conforme as variáveis de ambiente.
+
+    :param train: Se True, usa o dataset de treinamento, caso contrário, o de dataset de teste.
+    :return: O objeto DataSet.
+    """
+    from data.data_set import DataSet  # pylint: disable=import-outside-toplevel
+
+    env_model = 'TRAIN_DATASET_URL' if train else 'TESTE_DATASET_URL'
+    env_checksum = 'TRAIN_DATASET_CHECKSUM' if train else 'TESTE_DATASET_CHECKSUM'
+
+    return DataSet(
+        data_set_url=os.getenv(env_model),
+        hub_repo=get_hub_repo(),
+        update_dataset=False,
+        streaming=streaming,
+        checksum=os.getenv(env_checksum),
+        download_segments=int(os.getenv('DOWNLOAD_SEGMENTS', '4'))
+    )
+
+def train_model(dataset: 'DataSet') -> str:
+    """
+    Função que treina o modelo de CNN e salva o modelo treinado.
+
+    :param data_loader: O DataLoader contendo os dados de treinamento.
+    :return: O caminho para o modelo treinado.
+    """
+    if os.path.exists(model_path):
+        logging.info("Modelo treinado já existe, pulando treinamento.")
+        return model_path
+
+    logging.info("Iniciando treinamento do modelo CNN...")
+
+    distributed = get_distributed()
+
+    if streaming and distributed.enabled:
+        raise ValueError("O modo streaming não suporta treinamento distribuído.")
+
+    # O primeiro processo de cada nó extrai as features; os demais reaproveitam o resultado
+    with distributed.local_main_first():
+        data_loader = get_training_data_loader(dataset)
+
+    # Inicializar o modelo CNN
+    model = build_model(model_architecture, **create_model_kwargs())
+
+    # Inicializar o objeto ModelTrainer e treinar o modelo
+    trainer = ModelTrainer(
+        model=model,
+        num_epochs=num_epochs,
+        learning_rate=learning_rate,
+        performance=performance,
+        instrumentation=get_instrumentation(),
+        checkpoints=CheckpointManager(checkpoint_dir, checkpoint_interval, checkpoint_keep_last),
+        distributed=distributed
+    )
+    # Se houver um checkpoint, o treinamento é retomado de onde parou
+    trainer.train(data_loader)
+
+    # Salvar o modelo treinado (os pesos são iguais em todos os processos)
+    if distributed.is_main:
+        trainer.save_model(model_path)
+
+    logging.info("Treinamento concluído e modelo salvo com sucesso.")
+    return model_path
+
+def get_training_data_loader(dataset: 'DataSet') -> DataLoader:
+    """
+    Função que cria o DataLoader de treinamento conforme o modo de extração configurado.
+
+    :param dataset: O dataset de treinamento.
+    :return: O DataLoader contendo os dados de treinamento.
+    """
+    if stream_ingest:
+        return get_ingested_data_loader(dataset)
+    if feature_shards:
+        return get_feature_shards_data_loader(dataset)
+    if streaming:
+        return get_streaming_data_loader(dataset)
+    return get_data_loader(dataset)
+
+def open_training_data_loader(dataset: 'DataSet') -> DataLoader:
+    """
+    Função que reabre as features de treinamento já extraídas, sem extraí-las de novo.
+    Os shards e a ingestão direta já reabrem o armazenamento existente; apenas no armazenamento
+    em memória as features são recalculadas (com o cache de features).
+
+    :param dataset: O dataset de treinamento.
+    :return: O DataLoader contendo os dados de treinamento.
+    """
+    reopen = not (stream_ingest or feature_shards or streaming) and spectrogram_storage == 'memmap'
+
+    # Só reaproveita as features geradas com os parâmetros atuais, que são os do modelo exportado
+    if reopen and MemmapSpectrogramDataset.is_compatible(
+        spectrogram_storage_path,
+        get_wav_controller().feature_params(),
+        spectrogram_dtype
+    ):
+        return create_data_loader(MemmapSpectrogramDataset.open(spectrogram_storage_path))
+
+    return get_training_data_loader(dataset)
+
+def export_model(trained_path: str, dataset: 'DataSet') -> None:
+    """
+    Função que gera os artefatos de inferência (int8, TorchScript e ONNX) do modelo treinado,
+    calibrados em lotes do dataset de treinamento e comparados com o fp32 no dataset de teste.
+
+    :param trained_path: O caminho para o modelo treinado.
+    :param dataset: O dataset de treinamento.
+    """
+    logging.info("Exportando o modelo para inferência em %s...", export_dir)
+
+    model = load_model(trained_path, model_architecture, **create_model_kwargs())
+    ModelExporter(model, export_dir).export(
+        open_training_data_loader(dataset),
+        calibration_batches=export_calibration_batches,
+        evaluation_loader=get_evaluation_data_loader()
+    )
+
+@functools.lru_cache(maxsize=None)
+def get_evaluation_data_loader() -> DataLoader:
+    """
+    Função que extrai as features do dataset de teste, como no treinamento, e cria o DataLoader
+    de avaliação. O resultado é reaproveitado pela exportação e pela avaliação.
+
+    :return: O DataLoader contendo os dados de teste, sem embaralhamento.
+    """
+    return get_data_loader(get_dataset(train=False), train=False)
+
+def get_data_loader(dataset: 'DataSet', train: bool = True) -> DataLoader:
+    """
+    Função que extrai as features de todo o dataset antes do treinamento.
+
+    :param dataset: O dataset do Hugging Face.
+    :param train: Se True, usa o armazenamento e o DataLoader de treinamento, caso contrário,
+        os de avaliação.
+    :return: O DataLoader contendo os dados de treinamento.
+    """
+    storage_path = spectrogram_storage_path if train else evaluation_storage_path
+
+    if train and spectrogram_storage == 'memmap' and not get_distributed().is_local_main:
+        # O arquivo já foi gravado pelo primeiro processo do nó; recriá-lo o truncaria durante a leitura
+        return create_data_loader(MemmapSpectrogramDataset.open(spectrogram_storage_path))
+
+    feature_extractor = FeatureExtractor(
+        get_wav_controller(),
+        num_workers=feature_workers,
+        chunk_size=feature_chunk_size,
+        instrumentation=get_instrumentation()
+    )
+    spectograms_dataset = feature_extractor.extract(
+        dataset['train'],
+        create_spectrogram_dataset(storage_path)
+    ).finalize()
+
+    logging.info(
+        "Features extraídas: %s do cache, %s calculadas.",
+        get_feature_cache().hits,
+        get_feature_cache().misses
+    )
+
+    return create_data_loader(spectograms_dataset, train=train)
+
+def get_feature_shards_data_loader(dataset: 'DataSet') -> DataLoader:
+    """
+    Função que lê as features dos shards Arrow, gerando-os na primeira execução.
+
+    :param dataset: O dataset do Hugging Face.
+    :return: O DataLoader contendo os dados de treinamento.
+    """
+    if not os.path.exists(os.path.join(feature_shards_path, MANIFEST_FILE)):
+        FeatureShardWriter(
+            get_wav_controller(),
+            shard_size=feature_shard_size,
+            num_workers=feature_workers
+        ).write(dataset['train'], feature_shards_path)
+
+        if feature_shards_repo:
+            get_hub_repo().upload_feature_shards(feature_shards_path, feature_shards_repo, private=False)
+
+    spectograms_dataset = ShardedSpectrogramDataset(
+        feature_shards_path,
+        expected_params=get_wav_controller().feature_params()
+    )
+
+    return create_data_loader(spectograms_dataset)
+
+def get_ingested_data_loader(dataset: 'DataSet') -> DataLoader:
+    """
+    Função que extrai as features direto do arquivo .tar.gz do dataset.
+
+    :param dataset: O objeto DataSet, ainda não baixado.
+    :return: O DataLoader contendo os dados de treinamento.
+    """
+    feature_extractor = FeatureExtractor(
+        get_wav_controller(),
+        num_workers=feature_workers,
+        chunk_size=feature_chunk_size,
+        instrumentation=get_instrumentation()
+    )
+    spectograms_dataset = dataset.ingest_features(
+        feature_extractor,
+        os.path.join(spectrogram_storage_path, dataset.type_data),
+        dtype=spectrogram_dtype
+    )
+
+    return create_data_loader(spectograms_dataset)
+
+def create_data_loader(spectograms_dataset, train: bool = True) -> DataLoader:
+    """
+    Função que cria o DataLoader de um dataset de espectrogramas já extraídos.
+
+    :param spectograms_dataset: Dataset de espectrogramas finalizado.
+    :param train: Se False, cria o DataLoader de avaliação: sem embaralhamento e, no
+        treinamento distribuído, com todas as amostras no processo atual.
+    :return: O DataLoader, com lotes agrupados por duração se configurado.
+    """
+    distributed = get_distributed() if train else DistributedContext()
+
+    if length_bucketing:
+        # Os lotes com padding têm durações variáveis e precisam da máscara dos frames válidos,
+        # que só o PooledSpectrogramCNN aceita
+        if model_architecture == 'flatten':
+            raise ValueError(
+                'LENGTH_BUCKETING=1 requer MODEL_ARCHITECTURE=pooled: '
+                'o SpectrogramCNN só aceita espectrogramas de formato fixo.'
+            )
+
+        batch_sampler = BucketBatchSampler(
+            spectograms_dataset.lengths(),
+            batch_size=batch_size,
+            num_buckets=num_buckets,
+            shuffle=train,
+            seed=loader_config.seed,
+            num_replicas=distributed.world_size,
+            rank=distributed.rank
+        )
+        logging.info("Desperdício de padding por lote: %s", batch_sampler.padding_stats())
+
+        return build_data_loader(
+            spectograms_dataset,
+            loader_config,
+            batch_sampler=batch_sampler,
+            collate_fn=PadCollate()
+        )
+
+    if distributed.enabled:
+        # Cada processo lê uma fatia diferente das amostras, embaralhada por época com a mesma semente
+        sampler = DistributedSampler(
+            spectograms_dataset,
+            num_replicas=distributed.world_size,
+            rank=distributed.rank,
+            shuffle=True,
+            seed=loader_config.seed
+        )
+        return build_data_loader(spectograms_dataset, loader_config, batch_size=batch_size, sampler=sampler)
+
+    return build_data_loader(spectograms_dataset, loader_config, batch_size=batch_size, shuffle=train)
+
+def get_streaming_data_loader(dataset: 'DataSet') -> DataLoader:
+    """
+    Função que cria um DataLoader que calcula as features sob demanda.
+
+    :param dataset: O dataset do Hugging Face (normal ou em streaming).
+    :return: O DataLoader contendo os dados de treinamento.
+    """
+    from data.streaming_dataset import StreamingSpectrogramDataset  # pylint: disable=import-outside-toplevel
+
+    streaming_dataset = StreamingSpectrogramDataset(
+        dataset['train'],
+        get_wav_controller(),
+        shuffle_buffer_size=shuffle_buffer_size,
+        seed=loader_config.seed
+    )
+    # Sem workers persistentes: o set_epoch é chamado no processo principal e só chega aos workers
+    # criados depois dele. Com workers persistentes, todas as épocas repetiriam a ordem da primeira
+    return build_data_loader(
+        streaming_dataset,
+        dataclasses.replace(loader_config, num_workers=streaming_workers, persistent_workers=False),
+        batch_size=batch_size
+    )
+
+def create_spectrogram_dataset(storage_path: str = spectrogram_storage_path):
+    """
+    Função que cria o dataset de espectrogramas conforme o armazenamento configurado.
+
+    :param storage_path: Diretório do armazenamento em disco.
+    :return: Um SpectrogramDataset em memória ou um MemmapSpectrogramDataset em disco.
+    """
+    if spectrogram_storage == 'memmap':
+        return MemmapSpectrogramDataset(
+            storage_path,
+            dtype=spectrogram_dtype,
+            feature_params=get_wav_controller().feature_params()
+        )
+
+    return SpectrogramDataset()
+
+def create_model_kwargs() -> dict:
+    """
+    Função que adapta o modelo ao formato das features configuradas.
+
+    :return: Os parâmetros do construtor do modelo.
+    """
+    wav_controller = get_wav_controller()
+    input_shape = wav_controller.feature_shape(int(clip_seconds * sample_rate))
+    logging.info("Formato das features: %s (%s).", input_shape, wav_controller.feature_type)
+    return model_kwargs(model_architecture, input_shape)
+
+def evaluate_model(trained_path: str, data_loader: DataLoader) -> None:
+    """
+    Função que avalia o modelo treinado.
+
+    :param trained_path: O caminho para o modelo treinado.
+    :param data_loader: O DataLoader contendo os dados de teste.
+    """
+    logging.info("Iniciando avaliação do modelo CNN...")
+
+    # Carregar o modelo treinado
+    model = load_model(trained_path, model_architecture, **create_model_kwargs())
+
+    # Inicializar o objeto ModelTrainer e avaliar o modelo
+    trainer = ModelTrainer(
+        model=model,
+        num_epochs=num_epochs,
+        learning_rate=learning_rate,
+        performance=performance
+    )
+    trainer.evaluate(data_loader)
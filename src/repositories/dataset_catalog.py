@@ -0,0 +1,118 @@
+"""
+Módulo para manter um catálogo local dos datasets conhecidos do Hugging Face,
+evitando consultas ao Hub a cada inicialização.
+"""
+
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+class DatasetCatalog:
+    """
+    Classe responsável por guardar, em um arquivo JSON, o que já se sabe sobre cada
+    dataset do Hub: se ele existe e onde estão os arquivos Arrow do seu cache local.
+
+    Cada entrada tem a data da última verificação. Entradas mais novas que o TTL são
+    usadas sem nenhuma chamada de rede. Entradas vencidas continuam disponíveis como
+    fallback quando o Hub não pode ser acessado.
+    """
+
+    def __init__(self, catalog_path: str, ttl_seconds: float = 24 * 3600) -> None:
+        """
+        Instancia um novo objeto DatasetCatalog, carregando o catálogo existente.
+
+        :param catalog_path: Caminho do arquivo JSON do catálogo.
+        :param ttl_seconds: Tempo, em segundos, em que uma entrada é considerada atualizada.
+        """
+        self.catalog_path = catalog_path
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Dict[str, Any]] = self.__load()
+
+    def get(self, repo_name: str) -> Optional[Dict[str, Any]]:
+        """
+        Retorna a entrada de um dataset, atualizada ou não.
+
+        :param repo_name: Nome completo do repositório no Hugging Face Hub.
+        :return: A entrada do catálogo ou None se o dataset é desconhecido.
+        """
+        return self._entries.get(repo_name)
+
+    def is_fresh(self, repo_name: str) -> bool:
+        """
+        Verifica se a entrada de um dataset foi verificada dentro do TTL.
+
+        :param repo_name: Nome completo do repositório no Hugging Face Hub.
+        :return: True se a entrada pode ser usada sem consultar o Hub.
+        """
+        entry = self.get(repo_name)
+        return entry is not None and time.time() - entry['checked_at'] < self.ttl_seconds
+
+    def cache_files(self, repo_name: str) -> Optional[Dict[str, List[str]]]:
+        """
+        Retorna os arquivos Arrow do cache local de um dataset, se todos ainda existirem no disco.
+
+        :param repo_name: Nome completo do repositório no Hugging Face Hub.
+        :return: Os arquivos de cada split ou None.
+        """
+        entry = self.get(repo_name)
+        files = entry.get('cache_files') if entry is not None else None
+
+        if not files or not all(os.path.exists(path) for paths in files.values() for path in paths):
+            return None
+        return files
+
+    def record(
+        self,
+        repo_name: str,
+        exists: bool,
+        cache_files: Optional[Dict[str, List[str]]] = None
+    ) -> None:
+        """
+        Registra o resultado de uma verificação no Hub e salva o catálogo.
+
+        :param repo_name: Nome completo do repositório no Hugging Face Hub.
+        :param exists: Se o dataset existe no Hub.
+        :param cache_files: Arquivos Arrow do cache local de cada split (mantém os anteriores se None).
+        """
+        with self._lock:
+            # Relê o arquivo para não descartar entradas gravadas por outros jobs
+            self._entries = self.__load()
+            entry = self._entries.get(repo_name, {})
+            entry.update({'exists': exists, 'checked_at': time.time()})
+
+            if cache_files is not None:
+                entry['cache_files'] = cache_files
+
+            self._entries[repo_name] = entry
+            self.__save()
+
+    def __load(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Carrega o catálogo do disco. Um arquivo ausente ou corrompido resulta em um catálogo vazio.
+        """
+        if not os.path.exists(self.catalog_path):
+            return {}
+
+        try:
+            with open(self.catalog_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            logging.warning('Catálogo de datasets %s inválido (%s), ignorando.', self.catalog_path, e)
+            return {}
+
+    def __save(self) -> None:
+        """
+        Salva o catálogo de forma atômica, para que vários jobs possam lê-lo ao mesmo tempo.
+        """
+        directory = os.path.dirname(os.path.abspath(self.catalog_path))
+        os.makedirs(directory, exist_ok=True)
+
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(self._entries, f, indent=2)
+        os.replace(tmp_path, self.catalog_path)
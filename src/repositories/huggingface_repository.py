@@ -4,22 +4,33 @@ Módulo para cuidar das interações com o Hugging Face.
 
 import os
 import logging
+from typing import Dict, List, Optional
 
-from datasets import Dataset, Audio, load_dataset
-from huggingface_hub import list_datasets
+from datasets import Dataset, DatasetDict, Audio, concatenate_datasets, load_dataset
+from huggingface_hub import HfApi, constants, repo_exists
+from repositories.dataset_catalog import DatasetCatalog
 
 class HugginfaceRepository():
     """
     Classe para cuidar das interações com o Hugging Face.
+
+    Quando um DatasetCatalog é informado, a existência dos datasets e os arquivos do
+    cache do datasets são lembrados entre execuções: enquanto a entrada do catálogo estiver
+    dentro do TTL, nenhum acesso ao Hub é feito. Sem rede, as entradas vencidas são usadas.
     """
 
-    def __init__(self, hugface_user: str) -> None:
+    def __init__(self, hugface_user: str, catalog: Optional[DatasetCatalog] = None) -> None:
         """
         Instancia um novo objeto HugginfaceRepository.
 
         :param hugface_user: Usuário do Hugging Face.
+        :param catalog: Catálogo local dos datasets (opcional).
         """
         self.hugface_user = hugface_user
+        self.catalog = catalog
+
+        # Evita novas tentativas (com retries demorados) depois que o Hub já falhou nesta execução
+        self._offline = constants.HF_HUB_OFFLINE
 
     def __check_repo_name(self, repo_name: str) -> str:
         """
@@ -51,7 +62,7 @@ class HugginfaceRepository():
 
         audio_files = []
         labels = []
-        
+
         for root, _, files in os.walk(dataset_path):
             for file in files:
                 if file.endswith(".wav"):
@@ -63,48 +74,140 @@ class HugginfaceRepository():
             "label": labels
         }
         dataset = Dataset.from_dict(data_dict).cast_column("audio", Audio())
-        
+
         dataset.push_to_hub(repo_name, private=private)
 
+        if self.catalog is not None:
+            self.catalog.record(repo_name, exists=True)
+
         logging.info("Dataset '%s' enviado com sucesso!", repo_name)
 
         return dataset
 
-    def get_dataset_from_huggingface(self, repo_name: str) -> Dataset:
+    def upload_feature_shards(self, shards_path: str, repo_name: str, private: bool = True) -> str:
+        """
+        Faz upload dos shards de espectrogramas (FeatureShardWriter) para o Hugging Face Dataset Hub.
+
+        Os arquivos são enviados como estão, sem conversão, para que quem baixar possa
+        ler os shards com ShardedSpectrogramDataset sem recalcular as features.
+
+        :param shards_path: Diretório com os shards e o manifesto.
+        :param repo_name: Nome do repositório no Hugging Face Hub.
+        :param private: Se True, o repositório será privado.
+        :return: O nome completo do repositório.
+        """
+        repo_name = self.__check_repo_name(repo_name)
+
+        api = HfApi()
+        api.create_repo(repo_name, repo_type='dataset', private=private, exist_ok=True)
+        api.upload_folder(
+            folder_path=shards_path,
+            repo_id=repo_name,
+            repo_type='dataset',
+            allow_patterns=['*.arrow', 'manifest.json']
+        )
+
+        if self.catalog is not None:
+            self.catalog.record(repo_name, exists=True)
+
+        logging.info("Shards de features enviados para '%s'.", repo_name)
+
+        return repo_name
+
+    def get_dataset_from_huggingface(self, repo_name: str, streaming: bool = False) -> Dataset:
         """
         Baixa o dataset do Hugging Face Dataset Hub.
 
+        Com um catálogo, os arquivos Arrow que o load_dataset gravou no cache são registrados
+        depois do download, e as próximas execuções os reabrem direto (memory-mapped), sem
+        acessar o Hub e sem uma segunda cópia do dataset no disco.
+
         :param repo_name: Nome do repositório no Hugging Face Hub.
+        :param streaming: Se True, os exemplos são lidos sob demanda, sem baixar o dataset inteiro.
         :return: O dataset baixado.
         """
         repo_name = self.__check_repo_name(repo_name)
 
+        # O modo streaming sempre lê do Hub, não há cache local para usar
+        cache_files = self.catalog.cache_files(repo_name) if self.catalog is not None and not streaming else None
+
+        if cache_files is not None and (self.catalog.is_fresh(repo_name) or self._offline):
+            logging.info("Carregando dataset '%s' do cache local.", repo_name)
+            return self.__open_cache_files(cache_files)
+
         logging.info("Baixando dataset '%s'...", repo_name)
 
-        dataset = load_dataset(path=repo_name)
+        try:
+            dataset = load_dataset(path=repo_name, streaming=streaming)
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            if cache_files is None:
+                raise
+            self._offline = True
+            logging.warning(
+                "Hub inacessível (%s). Usando o cache local vencido de '%s'.", e, repo_name
+            )
+            return self.__open_cache_files(cache_files)
+
+        if self.catalog is not None and not streaming:
+            # Registra onde o load_dataset gravou o cache, em vez de salvar uma cópia com save_to_disk
+            self.catalog.record(
+                repo_name,
+                exists=True,
+                cache_files={
+                    split: [cache_file['filename'] for cache_file in split_dataset.cache_files]
+                    for split, split_dataset in dataset.items()
+                }
+            )
 
         logging.info("Dataset '%s' baixado com sucesso!", repo_name)
         logging.info("Número de exemplos: %s", dataset)
 
         return dataset
 
+    @staticmethod
+    def __open_cache_files(cache_files: Dict[str, List[str]]) -> DatasetDict:
+        """
+        Reabre os arquivos Arrow do cache de um dataset, sem copiá-los.
+        As features (ex. a coluna Audio) são lidas dos metadados dos próprios arquivos.
+        """
+        return DatasetDict({
+            split: concatenate_datasets([Dataset.from_file(path) for path in paths])
+            for split, paths in cache_files.items()
+        })
+
     def check_existing_datasets(self, repo_name: str) -> bool:
         """
-        Lista os datasets existentes no Hugging Face Dataset Hub.
+        Verifica se o dataset existe no Hugging Face Dataset Hub.
 
         :param repo_name: Nome do repositório no Hugging Face Hub.
         :return: True se o dataset já existe, False caso contrário.
         """
         repo_name = self.__check_repo_name(repo_name)
 
-        datasets = list_datasets(author=self.hugface_user)
-        datasets = [dataset for dataset in datasets]
+        if self.catalog is not None:
+            entry = self.catalog.get(repo_name)
+
+            if entry is not None and (self.catalog.is_fresh(repo_name) or self._offline):
+                logging.info("Dataset '%s' encontrado no catálogo local.", repo_name)
+                return entry['exists']
 
-        if any(
-            dataset.id == repo_name for dataset in datasets
-        ):
+        try:
+            # Consulta apenas o repositório em questão, em vez de listar todos os datasets do usuário
+            exists = repo_exists(repo_name, repo_type='dataset')
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            entry = self.catalog.get(repo_name) if self.catalog is not None else None
+            if entry is None:
+                raise
+            self._offline = True
+            logging.warning("Hub inacessível (%s). Usando o catálogo local vencido.", e)
+            return entry['exists']
+
+        if self.catalog is not None:
+            self.catalog.record(repo_name, exists=exists)
+
+        if exists:
             logging.info("Dataset '%s' já existe.", repo_name)
             return True
-        
+
         logging.info("Dataset '%s' não existe.", repo_name)
         return False
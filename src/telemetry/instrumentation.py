@@ -0,0 +1,365 @@
+"""
+Módulo com a instrumentação leve do pipeline: timers, contadores e gauges agregados
+em memória e enviados periodicamente para sinks (log, JSON lines, texto no formato do Prometheus).
+"""
+
+import abc
+import contextlib
+import json
+import logging
+import os
+import resource
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List, Optional
+
+import torch
+
+class MetricsSink(abc.ABC):
+    """
+    Destino das métricas agregadas. Cada flush envia um snapshot com todas as métricas.
+    """
+
+    @abc.abstractmethod
+    def write(self, snapshot: Dict[str, Any]) -> None:
+        """
+        Recebe um snapshot das métricas.
+
+        :param snapshot: Dicionário com 'timestamp', 'labels', 'counters', 'gauges' e 'timers'.
+        """
+
+    def close(self) -> None:
+        """
+        Libera os recursos do sink.
+        """
+
+class LoggingSink(MetricsSink):
+    """
+    Sink que escreve um resumo das métricas no log.
+    """
+
+    def write(self, snapshot: Dict[str, Any]) -> None:
+        timers = ', '.join(
+            f"{name}={stats['total']:.3f}s (média {stats['mean'] * 1000:.2f}ms)"
+            for name, stats in snapshot['timers'].items() if stats['count']
+        )
+        gauges = ', '.join(f'{name}={value:.1f}' for name, value in snapshot['gauges'].items())
+        logging.info('Métricas %s: %s | %s', snapshot['labels'], timers, gauges)
+
+class JsonLinesSink(MetricsSink):
+    """
+    Sink que acrescenta cada snapshot como uma linha JSON em um arquivo.
+    """
+
+    def __init__(self, file_path: str) -> None:
+        """
+        Instancia um novo objeto JsonLinesSink.
+
+        :param file_path: Caminho do arquivo .jsonl.
+        """
+        os.makedirs(os.path.dirname(os.path.abspath(file_path)), exist_ok=True)
+        self._file = open(file_path, 'a', encoding='utf-8')  # pylint: disable=consider-using-with
+
+    def write(self, snapshot: Dict[str, Any]) -> None:
+        self._file.write(json.dumps(snapshot) + '\n')
+        self._file.flush()
+
+    def close(self) -> None:
+        self._file.close()
+
+def prometheus_text(
+    snapshot: Dict[str, Any],
+    prefix: str = 'song_learner',
+    labels: Optional[Dict[str, str]] = None
+) -> str:
+    """
+    Formata um snapshot no formato de texto do Prometheus.
+
+    :param snapshot: Snapshot do Instrumentation.
+    :param prefix: Prefixo dos nomes das métricas.
+    :param labels: Labels fixos adicionados a todas as métricas.
+    :return: O texto das métricas.
+    """
+    labels = ','.join(f'{key}="{value}"' for key, value in sorted((labels or {}).items()))
+    labels = f'{{{labels}}}' if labels else ''
+    lines = []
+
+    for name, value in snapshot['counters'].items():
+        lines += [f'# TYPE {prefix}_{name}_total counter', f'{prefix}_{name}_total{labels} {value}']
+
+    for name, value in snapshot['gauges'].items():
+        lines += [f'# TYPE {prefix}_{name} gauge', f'{prefix}_{name}{labels} {value}']
+
+    for name, stats in snapshot['timers'].items():
+        metric = f'{prefix}_{name}_seconds'
+        lines += [
+            f'# TYPE {metric} summary',
+            f"{metric}_sum{labels} {stats['cumulative_total']}",
+            f"{metric}_count{labels} {stats['cumulative_count']}",
+        ]
+
+    return '\n'.join(lines) + '\n'
+
+class PrometheusTextSink(MetricsSink):
+    """
+    Sink que regrava um arquivo no formato de texto do Prometheus a cada flush,
+    para ser lido pelo textfile collector do node_exporter.
+
+    Os labels dos snapshots (época, passo) não são exportados, pois mudam a cada flush;
+    os timers são exportados como valores acumulados desde o início da execução.
+    """
+
+    def __init__(
+        self,
+        file_path: str,
+        prefix: str = 'song_learner',
+        labels: Optional[Dict[str, str]] = None
+    ) -> None:
+        """
+        Instancia um novo objeto PrometheusTextSink.
+
+        :param file_path: Caminho do arquivo .prom.
+        :param prefix: Prefixo dos nomes das métricas.
+        :param labels: Labels fixos adicionados a todas as métricas (ex. {'job': 'train'}).
+        """
+        self.file_path = file_path
+        self.prefix = prefix
+        self.labels = labels or {}
+        os.makedirs(os.path.dirname(os.path.abspath(file_path)), exist_ok=True)
+
+    def write(self, snapshot: Dict[str, Any]) -> None:
+        # Escrita atômica: o coletor nunca lê um arquivo pela metade
+        directory = os.path.dirname(os.path.abspath(self.file_path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(prometheus_text(snapshot, self.prefix, self.labels))
+        os.replace(tmp_path, self.file_path)
+
+class _Timer:
+    """
+    Context manager que mede um bloco e registra a duração no Instrumentation.
+    """
+
+    __slots__ = ('instrumentation', 'name', 'started')
+
+    def __init__(self, instrumentation: 'Instrumentation', name: str) -> None:
+        self.instrumentation = instrumentation
+        self.name = name
+        self.started = 0.0
+
+    def __enter__(self) -> '_Timer':
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.instrumentation.observe(self.name, time.perf_counter() - self.started)
+
+_NULL_CONTEXT = contextlib.nullcontext()
+
+class Instrumentation:
+    """
+    Classe responsável por agregar as métricas dos pontos quentes do pipeline.
+
+    Os valores são agregados em memória (soma, contagem, mínimo e máximo por intervalo) e só
+    chegam aos sinks no flush, então o custo por medição é o de algumas operações em um
+    dicionário. Desabilitada, cada chamada retorna imediatamente.
+    """
+
+    def __init__(self, sinks: Optional[List[MetricsSink]] = None, enabled: bool = True) -> None:
+        """
+        Instancia um novo objeto Instrumentation.
+
+        :param sinks: Destinos das métricas. Por padrão, apenas o log.
+        :param enabled: Se False, todas as chamadas são ignoradas.
+        """
+        self.enabled = enabled
+        self.sinks = sinks if sinks is not None else [LoggingSink()]
+
+        self.counters: Dict[str, float] = {}
+        self.gauges: Dict[str, float] = {}
+        self._timers: Dict[str, List[float]] = {}
+        self._cumulative: Dict[str, List[float]] = {}
+
+    def timer(self, name: str):
+        """
+        Retorna um context manager que mede a duração do bloco.
+
+        :param name: Nome do timer.
+        :return: O context manager.
+        """
+        if not self.enabled:
+            return _NULL_CONTEXT
+        return _Timer(self, name)
+
+    def observe(self, name: str, seconds: float) -> None:
+        """
+        Registra uma duração medida externamente.
+
+        :param name: Nome do timer.
+        :param seconds: Duração, em segundos.
+        """
+        if not self.enabled:
+            return
+
+        stats = self._timers.get(name)
+        if stats is None:
+            # [total, contagem, mínimo, máximo]
+            self._timers[name] = [seconds, 1, seconds, seconds]
+            return
+
+        stats[0] += seconds
+        stats[1] += 1
+        if seconds < stats[2]:
+            stats[2] = seconds
+        if seconds > stats[3]:
+            stats[3] = seconds
+
+    def increment(self, name: str, value: float = 1) -> None:
+        """
+        Incrementa um contador acumulado desde o início da execução.
+
+        :param name: Nome do contador.
+        :param value: Valor a ser somado.
+        """
+        if self.enabled:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def gauge(self, name: str, value: float) -> None:
+        """
+        Define o valor atual de um gauge.
+
+        :param name: Nome do gauge.
+        :param value: Valor atual.
+        """
+        if self.enabled:
+            self.gauges[name] = value
+
+    def record_memory(self, device: Optional[torch.device] = None) -> None:
+        """
+        Atualiza os gauges de pico de memória do processo e, em CUDA, do dispositivo.
+
+        :param device: Dispositivo de treinamento (opcional).
+        """
+        if not self.enabled:
+            return
+
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Em macOS o valor é em bytes, no Linux em KB
+        self.gauge('max_rss_mb', max_rss / 1024 ** 2 if sys.platform == 'darwin' else max_rss / 1024)
+
+        if device is not None and device.type == 'cuda':
+            self.gauge('cuda_max_allocated_mb', torch.cuda.max_memory_allocated(device) / 1024 ** 2)
+
+    def snapshot(self, **labels: Any) -> Dict[str, Any]:
+        """
+        Retorna as métricas do intervalo atual.
+
+        :param labels: Identificadores do snapshot (ex. epoch, step).
+        :return: Dicionário com os contadores, gauges e timers.
+        """
+        timers = {}
+        for name in {**self._cumulative, **self._timers}:
+            total, count, minimum, maximum = self._timers.get(name, (0.0, 0, 0.0, 0.0))
+            cumulative = self._cumulative.get(name, [0.0, 0])
+            timers[name] = {
+                'total': total,
+                'count': count,
+                'mean': total / count if count else 0.0,
+                'min': minimum,
+                'max': maximum,
+                'cumulative_total': cumulative[0] + total,
+                'cumulative_count': cumulative[1] + count,
+            }
+
+        return {
+            'timestamp': time.time(),
+            'labels': labels,
+            'counters': dict(self.counters),
+            'gauges': dict(self.gauges),
+            'timers': timers,
+        }
+
+    def flush(self, **labels: Any) -> Optional[Dict[str, Any]]:
+        """
+        Envia o snapshot do intervalo para os sinks e reinicia os timers do intervalo.
+
+        :param labels: Identificadores do snapshot (ex. epoch, step).
+        :return: O snapshot enviado, ou None se a instrumentação estiver desabilitada.
+        """
+        if not self.enabled:
+            return None
+
+        snapshot = self.snapshot(**labels)
+
+        for sink in self.sinks:
+            try:
+                sink.write(snapshot)
+            except OSError as e:
+                logging.warning('Erro ao gravar métricas em %s: %s', type(sink).__name__, e)
+
+        for name, (total, count, _, _) in self._timers.items():
+            cumulative = self._cumulative.setdefault(name, [0.0, 0])
+            cumulative[0] += total
+            cumulative[1] += count
+        self._timers = {}
+
+        return snapshot
+
+    def close(self) -> None:
+        """
+        Fecha todos os sinks.
+        """
+        for sink in self.sinks:
+            sink.close()
+
+NULL_INSTRUMENTATION = Instrumentation(sinks=[], enabled=False)
+
+class ProfilerWindow:
+    """
+    Janela opcional do torch.profiler: ignora os primeiros passos, aquece e grava o trace
+    de alguns passos do treinamento, em formato lido pelo TensorBoard e pelo Chrome/Perfetto.
+    """
+
+    def __init__(self, output_dir: str, wait: int = 5, warmup: int = 2, active: int = 5) -> None:
+        """
+        Instancia um novo objeto ProfilerWindow.
+
+        :param output_dir: Diretório onde o trace será gravado.
+        :param wait: Passos ignorados antes do aquecimento.
+        :param warmup: Passos de aquecimento (medidos, mas descartados).
+        :param active: Passos gravados no trace.
+        """
+        self.output_dir = output_dir
+        self.total_steps = wait + warmup + active
+        self._steps = 0
+
+        activities = [torch.profiler.ProfilerActivity.CPU]
+        if torch.cuda.is_available():
+            activities.append(torch.profiler.ProfilerActivity.CUDA)
+
+        self._profiler = torch.profiler.profile(
+            activities=activities,
+            schedule=torch.profiler.schedule(wait=wait, warmup=warmup, active=active, repeat=1),
+            on_trace_ready=torch.profiler.tensorboard_trace_handler(output_dir),
+            record_shapes=True,
+            profile_memory=True
+        )
+
+    def __enter__(self) -> 'ProfilerWindow':
+        self._profiler.__enter__()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._profiler.__exit__(*exc_info)
+
+    def step(self) -> None:
+        """
+        Avança o profiler um passo. Depois da janela, não tem mais efeito.
+        """
+        if self._steps <= self.total_steps:
+            self._profiler.step()
+            self._steps += 1
+
+            if self._steps == self.total_steps + 1:
+                logging.info('Trace do profiler gravado em %s.', self.output_dir)
@@ -0,0 +1,119 @@
+"""
+Módulo para medir a vazão, os percentis de latência e o pico de memória de uma etapa,
+usado pelo benchmark do pipeline e pela comparação dos modelos exportados.
+"""
+
+import logging
+import resource
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable
+
+import numpy as np
+
+@dataclass
+class StageResult:
+    """
+    Resultado da medição de uma etapa do pipeline.
+
+    :param name: Nome da etapa.
+    :param items: Número de itens processados (arquivos, áudios, amostras ou lotes).
+    :param unit: Unidade dos itens.
+    :param total_seconds: Tempo total da etapa.
+    :param throughput: Itens por segundo.
+    :param latency_ms: Percentis (p50, p95, p99) e média da latência por item, em milissegundos.
+    :param peak_traced_mb: Pico de memória alocada pelo Python/numpy durante a etapa (tracemalloc).
+    :param max_rss_mb: Maior RSS do processo observado até o fim da etapa.
+    :param extra: Métricas específicas da etapa (ex. MB/s no download).
+    """
+    name: str
+    items: int
+    unit: str
+    total_seconds: float
+    throughput: float
+    latency_ms: Dict[str, float]
+    peak_traced_mb: float
+    max_rss_mb: float
+    extra: Dict[str, Any] = field(default_factory=dict)
+
+def max_rss_mb() -> float:
+    """
+    Retorna o maior RSS do processo até agora, em MB.
+    """
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Em macOS o valor é em bytes, no Linux em KB
+    return usage / 1024 ** 2 if sys.platform == 'darwin' else usage / 1024
+
+def measure(
+    name: str,
+    func: Callable[[Any], Any],
+    items: Iterable[Any],
+    unit: str = 'item',
+    trace_memory: bool = True
+) -> StageResult:
+    """
+    Executa func para cada item, medindo a latência individual e o total.
+
+    :param name: Nome da etapa.
+    :param func: Função executada para cada item.
+    :param items: Itens da etapa. Um iterador é consumido dentro da medição.
+    :param unit: Unidade dos itens.
+    :param trace_memory: Se True, mede o pico de memória com tracemalloc (adiciona overhead).
+    :return: O resultado da etapa.
+    """
+    latencies = []
+
+    if trace_memory:
+        tracemalloc.start()
+
+    started = time.perf_counter()
+    iterator = iter(items)
+
+    while True:
+        item_started = time.perf_counter()
+        try:
+            item = next(iterator)
+        except StopIteration:
+            break
+        func(item)
+        latencies.append(time.perf_counter() - item_started)
+
+    total = time.perf_counter() - started
+
+    peak = 0
+    if trace_memory:
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    latencies_ms = np.asarray(latencies) * 1000 if latencies else np.zeros(1)
+
+    result = StageResult(
+        name=name,
+        items=len(latencies),
+        unit=unit,
+        total_seconds=total,
+        throughput=len(latencies) / total if total > 0 else 0.0,
+        latency_ms={
+            'p50': float(np.percentile(latencies_ms, 50)),
+            'p95': float(np.percentile(latencies_ms, 95)),
+            'p99': float(np.percentile(latencies_ms, 99)),
+            'mean': float(latencies_ms.mean()),
+        },
+        peak_traced_mb=peak / 1024 ** 2,
+        max_rss_mb=max_rss_mb()
+    )
+
+    logging.info(
+        '%-16s %6s %-8s %9.1f/s  p50 %8.2fms  p95 %8.2fms  p99 %8.2fms  pico %7.1f MB',
+        name,
+        result.items,
+        unit,
+        result.throughput,
+        result.latency_ms['p50'],
+        result.latency_ms['p95'],
+        result.latency_ms['p99'],
+        result.peak_traced_mb
+    )
+    return result
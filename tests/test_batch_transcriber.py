@@ -0,0 +1,47 @@
+"""
+Testes do prefetch de blocos e do manifesto do transcritor em lote.
+"""
+
+import threading
+
+import pytest
+from inference.batch_transcriber import JobManifest, prefetch
+
+def test_prefetch_keeps_order():
+    assert list(prefetch(range(20), depth=2)) == list(range(20))
+
+def test_prefetch_propagates_errors():
+    def failing():
+        yield 1
+        raise ValueError('falhou')
+
+    with pytest.raises(ValueError):
+        list(prefetch(failing()))
+
+def test_prefetch_closes_source_when_consumer_stops():
+    closed = threading.Event()
+
+    def source():
+        try:
+            yield from range(1000)
+        finally:
+            closed.set()
+
+    items = prefetch(source(), depth=2)
+    assert next(items) == 0
+    items.close()
+
+    assert closed.wait(timeout=5)
+
+def test_record_deleted_file(tmp_path):
+    audio_path = tmp_path / 'audio.wav'
+    audio_path.write_bytes(b'0' * 10)
+    manifest = JobManifest(str(tmp_path / 'manifest.jsonl'))
+
+    audio_path.unlink()
+    manifest.record(str(audio_path), 'done')
+    manifest.close()
+
+    entries = JobManifest(str(tmp_path / 'manifest.jsonl')).entries
+    assert entries[str(audio_path)]['status'] == 'done'
+    assert 'size' not in entries[str(audio_path)]
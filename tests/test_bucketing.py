@@ -0,0 +1,46 @@
+"""
+Testes dos samplers do treinamento distribuído: todos os processos precisam do mesmo
+número de lotes, ou o all-reduce de um passo fica esperando para sempre.
+"""
+
+import pytest
+import torch
+from torch.utils.data import DataLoader, TensorDataset
+from torch.utils.data.distributed import DistributedSampler
+from data.bucketing import BucketBatchSampler
+
+LENGTHS = [17 + (i * 37) % 113 for i in range(101)]
+
+@pytest.mark.parametrize('num_replicas', [2, 3, 4])
+@pytest.mark.parametrize('drop_last', [False, True])
+def test_bucket_batch_sampler_same_batches_per_rank(num_replicas, drop_last):
+    samplers = [
+        BucketBatchSampler(LENGTHS, batch_size=8, num_buckets=5, drop_last=drop_last,
+                           num_replicas=num_replicas, rank=rank)
+        for rank in range(num_replicas)
+    ]
+
+    for epoch in range(3):
+        counts = []
+        for sampler in samplers:
+            sampler.set_epoch(epoch)
+            counts.append(len(list(sampler)))
+
+        assert len(set(counts)) == 1
+        assert counts[0] == len(samplers[0])
+
+def test_bucket_batch_sampler_covers_every_sample():
+    samplers = [BucketBatchSampler(LENGTHS, batch_size=8, num_buckets=5, num_replicas=3, rank=rank) for rank in range(3)]
+    seen = {idx for sampler in samplers for batch in sampler for idx in batch}
+    assert seen == set(range(len(LENGTHS)))
+
+@pytest.mark.parametrize('num_replicas', [2, 3, 4])
+def test_distributed_sampler_same_batches_per_rank(num_replicas):
+    dataset = TensorDataset(torch.zeros(len(LENGTHS), 1))
+    counts = []
+
+    for rank in range(num_replicas):
+        sampler = DistributedSampler(dataset, num_replicas=num_replicas, rank=rank, shuffle=True, seed=0)
+        counts.append(len(list(DataLoader(dataset, batch_size=8, sampler=sampler))))
+
+    assert len(set(counts)) == 1
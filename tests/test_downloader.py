@@ -0,0 +1,102 @@
+"""
+Testes do ResumableDownloader com um servidor HTTP local que aceita Range.
+"""
+
+import hashlib
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from data.downloader import ResumableDownloader
+
+DATA = os.urandom(300_000)
+
+class RangeHandler(BaseHTTPRequestHandler):
+    """
+    Serve DATA com suporte a Range. A primeira resposta com corpo é interrompida depois de
+    server.interrupt_after bytes, simulando uma queda da conexão.
+    """
+
+    def do_HEAD(self) -> None:  # pylint: disable=invalid-name
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(DATA)))
+        self.send_header('Accept-Ranges', 'bytes')
+        self.end_headers()
+
+    def do_GET(self) -> None:  # pylint: disable=invalid-name
+        start, end = 0, len(DATA) - 1
+        if 'Range' in self.headers:
+            first, last = self.headers['Range'].removeprefix('bytes=').split('-')
+            start, end = int(first), int(last or end)
+
+        self.server.ranges.append((start, end))
+        body = DATA[start:end + 1]
+
+        self.send_response(206)
+        self.send_header('Content-Range', f'bytes {start}-{end}/{len(DATA)}')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+
+        if self.server.interrupt_after is not None:
+            # Envia só parte do corpo e fecha a conexão
+            body, self.server.interrupt_after = body[:self.server.interrupt_after], None
+            self.close_connection = True
+
+        self.wfile.write(body)
+
+    def log_message(self, format, *args) -> None:  # pylint: disable=redefined-builtin
+        pass
+
+@pytest.fixture
+def server():
+    """
+    Servidor local em uma porta livre, encerrado ao fim do teste.
+    """
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), RangeHandler)
+    httpd.ranges = []
+    httpd.interrupt_after = None
+
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd
+
+    httpd.shutdown()
+    httpd.server_close()
+
+def test_download_resumes_after_interruption(server, tmp_path):
+    server.interrupt_after = 100_000
+    url = f'http://127.0.0.1:{server.server_address[1]}/data.bin'
+    file_path = str(tmp_path / 'data.bin')
+    checksum = f'sha256:{hashlib.sha256(DATA).hexdigest()}'
+
+    ResumableDownloader(num_segments=1, backoff=0.0).download(url, file_path, checksum=checksum)
+
+    with open(file_path, 'rb') as f:
+        assert f.read() == DATA
+
+    # A segunda requisição continua do último byte gravado, sem baixar o início de novo
+    assert len(server.ranges) == 2
+    assert server.ranges[0] == (0, len(DATA) - 1)
+    assert 0 < server.ranges[1][0] <= 100_000
+
+    assert not os.path.exists(f'{file_path}.part')
+    assert not os.path.exists(f'{file_path}.state.json')
+
+def test_download_continues_from_saved_state(server, tmp_path):
+    url = f'http://127.0.0.1:{server.server_address[1]}/data.bin'
+    file_path = str(tmp_path / 'data.bin')
+
+    # Estado deixado por uma execução anterior interrompida na metade do arquivo
+    half = len(DATA) // 2
+    with open(f'{file_path}.part', 'wb') as f:
+        f.write(DATA[:half])
+    with open(f'{file_path}.state.json', 'w', encoding='utf-8') as f:
+        f.write(f'{{"total_size": {len(DATA)}, "segments": [{{"start": 0, "end": {len(DATA) - 1}, "done": {half}}}]}}')
+
+    ResumableDownloader(num_segments=1, backoff=0.0).download(url, file_path)
+
+    with open(file_path, 'rb') as f:
+        assert f.read() == DATA
+
+    assert server.ranges == [(half, len(DATA) - 1)]
@@ -0,0 +1,65 @@
+"""
+Testes do cache de features em disco.
+"""
+
+import os
+
+import numpy as np
+from data.feature_cache import FeatureCache
+
+PARAMS = {'feature_type': 'mel', 'n_bins': 32}
+
+def make_entry(seed: int):
+    """
+    Gera um áudio e um espectrograma de ~4 KB.
+    """
+    rng = np.random.default_rng(seed)
+    return rng.standard_normal(100).astype(np.float32), rng.standard_normal((32, 32)).astype(np.float32)
+
+def test_hit_and_miss(tmp_path):
+    cache = FeatureCache(str(tmp_path))
+    waveform, spectrogram = make_entry(0)
+
+    assert cache.get(waveform, PARAMS) is None
+    cache.put(waveform, PARAMS, spectrogram)
+    np.testing.assert_array_equal(cache.get(waveform, PARAMS), spectrogram)
+
+    # Outros parâmetros nunca reaproveitam a entrada
+    assert cache.get(waveform, {**PARAMS, 'n_bins': 64}) is None
+    assert (cache.hits, cache.misses) == (1, 2)
+
+def test_eviction_removes_least_recently_used(tmp_path):
+    entry_size = make_entry(0)[1].nbytes
+    cache = FeatureCache(str(tmp_path), max_bytes=int(entry_size * 3.5))
+    entries = [make_entry(seed) for seed in range(4)]
+
+    for i, (waveform, spectrogram) in enumerate(entries[:3]):
+        cache.put(waveform, PARAMS, spectrogram)
+        # Garante mtimes distintos, independentemente da resolução do sistema de arquivos
+        os.utime(cache._FeatureCache__entry_path(cache.make_key(waveform, PARAMS), PARAMS), (i, i))
+
+    # Usar a primeira entrada a torna a mais recente
+    assert cache.get(entries[0][0], PARAMS) is not None
+    cache.put(entries[3][0], PARAMS, entries[3][1])
+
+    assert cache.size_bytes() <= cache.max_bytes
+    assert cache.get(entries[0][0], PARAMS) is not None
+    assert cache.get(entries[1][0], PARAMS) is None
+    assert cache.get(entries[3][0], PARAMS) is not None
+
+def disk_usage(path) -> int:
+    """
+    Soma o tamanho das entradas gravadas no diretório do cache.
+    """
+    return sum(os.path.getsize(os.path.join(root, file))
+               for root, _, files in os.walk(path) for file in files if file.endswith('.npy'))
+
+def test_size_limit_is_shared_between_processes(tmp_path):
+    max_bytes = make_entry(0)[1].nbytes * 50
+    # Caches no mesmo diretório simulam os workers do DataLoader
+    caches = [FeatureCache(str(tmp_path), max_bytes=max_bytes) for _ in range(4)]
+
+    for seed in range(200):
+        waveform, spectrogram = make_entry(seed)
+        caches[seed % len(caches)].put(waveform, PARAMS, spectrogram)
+        assert disk_usage(tmp_path) <= max_bytes
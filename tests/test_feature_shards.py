@@ -0,0 +1,50 @@
+"""
+Testes da gravação e leitura dos shards Arrow de espectrogramas.
+"""
+
+import numpy as np
+import pytest
+from controller.wav_controller import WavController
+from data.feature_shards import FeatureShardWriter, ShardedSpectrogramDataset
+from midi.midi_converter import MidiConverter
+
+def make_items(count: int):
+    """
+    Áudios sintéticos de durações diferentes, no formato de um split do Hugging Face.
+    """
+    rng = np.random.default_rng(0)
+    return [
+        {'audio': {
+            'path': f'keyboard_acoustic_{i:03d}-{60 + i:03d}-100.wav',
+            'array': rng.standard_normal(4000 + 1000 * i).astype(np.float32),
+        }}
+        for i in range(count)
+    ]
+
+def test_shards_round_trip(tmp_path):
+    wav_controller = WavController(MidiConverter(), feature_type='mel', n_bins=32)
+    items = make_items(5)
+
+    manifest = FeatureShardWriter(wav_controller, shard_size=2, num_workers=1).write(items, str(tmp_path))
+    assert manifest['num_samples'] == 5
+    assert len(manifest['shards']) == 3
+
+    dataset = ShardedSpectrogramDataset(str(tmp_path), expected_params=wav_controller.feature_params())
+    assert len(dataset) == 5
+
+    for idx, item in enumerate(items):
+        expected, pitch = wav_controller.load_wav(item['audio'])
+        spectrogram, label = dataset[idx]
+
+        assert spectrogram.shape == (1, *expected.shape)
+        assert dataset.lengths()[idx] == expected.shape[1]
+        assert label.item() == pitch
+        np.testing.assert_allclose(spectrogram[0].float().numpy(), expected, atol=0.05)
+
+def test_shards_reject_other_feature_params(tmp_path):
+    wav_controller = WavController(MidiConverter(), feature_type='mel', n_bins=32)
+    FeatureShardWriter(wav_controller, shard_size=2, num_workers=1).write(make_items(2), str(tmp_path))
+
+    other = WavController(MidiConverter(), feature_type='mel', n_bins=64)
+    with pytest.raises(ValueError):
+        ShardedSpectrogramDataset(str(tmp_path), expected_params=other.feature_params())
@@ -0,0 +1,57 @@
+"""
+Testes do armazenamento de espectrogramas em um arquivo contíguo mapeado em memória.
+"""
+
+import pickle
+
+import numpy as np
+import pytest
+import torch
+from data.memmap_dataset import MemmapSpectrogramDataset
+
+def make_spectrograms():
+    """
+    Espectrogramas com durações diferentes e os rótulos correspondentes.
+    """
+    rng = np.random.default_rng(0)
+    return [rng.standard_normal((16, n_frames)).astype(np.float32) for n_frames in (5, 12, 1, 30)], [60, 61, 62, 63]
+
+@pytest.mark.parametrize('dtype', ['float32', 'float16'])
+def test_round_trip(tmp_path, dtype):
+    spectrograms, labels = make_spectrograms()
+    dataset = MemmapSpectrogramDataset(str(tmp_path), dtype=dtype)
+    for spectrogram, label in zip(spectrograms, labels):
+        dataset.add_sample(spectrogram, label)
+    dataset.finalize()
+
+    reopened = MemmapSpectrogramDataset.open(str(tmp_path))
+
+    assert len(reopened) == len(spectrograms)
+    assert reopened.lengths() == [5, 12, 1, 30]
+    for i, (spectrogram, label) in enumerate(zip(spectrograms, labels)):
+        stored, stored_label = reopened[i]
+        assert stored.shape == (1, *spectrogram.shape)
+        assert stored.dtype == getattr(torch, dtype)
+        np.testing.assert_array_equal(stored[0].numpy(), spectrogram.astype(dtype))
+        assert stored_label.item() == label
+
+def test_pickled_dataset_reopens_the_map(tmp_path):
+    spectrograms, labels = make_spectrograms()
+    dataset = MemmapSpectrogramDataset(str(tmp_path))
+    for spectrogram, label in zip(spectrograms, labels):
+        dataset.add_sample(spectrogram, label)
+    dataset.finalize()
+    assert dataset[0][0].shape == (1, 16, 5)
+
+    # Como nos workers do DataLoader: o mapa não é serializado, cada processo abre o seu
+    copy = pickle.loads(pickle.dumps(dataset))
+    np.testing.assert_array_equal(copy[3][0][0].numpy(), spectrograms[3])
+
+def test_rejects_reads_before_finalize(tmp_path):
+    dataset = MemmapSpectrogramDataset(str(tmp_path))
+    dataset.add_sample(np.zeros((4, 4), dtype=np.float32), 60)
+
+    with pytest.raises(RuntimeError):
+        dataset[0]
+    with pytest.raises(RuntimeError):
+        pickle.dumps(dataset)
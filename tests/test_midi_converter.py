@@ -0,0 +1,54 @@
+"""
+Testes das conversões vetorizadas do MidiConverter contra as conversões escalares.
+"""
+
+import numpy as np
+import pytest
+import torch
+from midi.midi_converter import MIDI_RANGE, MidiConverter
+
+MIDI = np.arange(MIDI_RANGE)
+
+def test_note_names_match_scalar():
+    converter = MidiConverter()
+    expected = [converter.midi_to_note_name(midi) for midi in MIDI]
+
+    assert converter.midi_to_note_names(MIDI).tolist() == expected
+    assert converter.midi_to_note_names(torch.from_numpy(MIDI).reshape(8, 16)).ravel().tolist() == expected
+    assert converter.midi_to_note_names(MIDI.astype(np.float32) + 0.3).tolist() == expected
+
+def test_note_names_to_midi_matches_scalar():
+    converter = MidiConverter()
+    # Nomes da tabela (busca binária) misturados a bemóis e oitavas fora da faixa (conversão escalar)
+    names = np.array([['C4', 'Db5', 'A-1', 'B10'], ['G9', 'C#0', 'Bb3', 'C4']])
+
+    midi = converter.note_names_to_midi(names)
+
+    assert midi.shape == names.shape
+    assert midi.dtype == np.int64
+    assert midi.tolist() == [[converter.note_name_to_midi(name) for name in row] for row in names]
+
+def test_note_names_round_trip():
+    converter = MidiConverter()
+    np.testing.assert_array_equal(converter.note_names_to_midi(converter.midi_to_note_names(MIDI)), MIDI)
+
+def test_pitch_classes_and_octaves():
+    converter = MidiConverter()
+    names = [converter.midi_to_note_name(midi) for midi in MIDI]
+
+    pitch_classes = converter.midi_to_pitch_classes(torch.from_numpy(MIDI))
+    assert [converter.note_names[i] for i in pitch_classes.tolist()] == [name.rstrip('-0123456789') for name in names]
+    assert converter.midi_to_octaves(MIDI).tolist() == [int(name.lstrip('ABCDEFG#')) for name in names]
+
+def test_frequency_round_trip():
+    frequencies = MidiConverter.midi_to_frequency(MIDI.astype(np.float64))
+
+    assert frequencies[69] == pytest.approx(440.0)
+    np.testing.assert_array_equal(MidiConverter.frequency_to_midi(frequencies), MIDI)
+    assert MidiConverter.frequency_to_midi(torch.from_numpy(frequencies)).tolist() == MIDI.tolist()
+
+def test_rejects_out_of_range():
+    with pytest.raises(ValueError):
+        MidiConverter().midi_to_note_names([0, 128])
+    with pytest.raises(ValueError):
+        MidiConverter().note_names_to_midi(['H4'])
@@ -0,0 +1,137 @@
+"""
+Testes do micro-batching e do cálculo de features do servidor de inferência.
+"""
+
+import asyncio
+import concurrent.futures
+import time
+from concurrent.futures.process import BrokenProcessPool
+from http import HTTPStatus
+
+import numpy as np
+import pytest
+import torch
+import torch.nn as nn
+from controller.wav_controller import WavController
+from inference.server import HTTPError, InferenceServer, MicroBatcher, _compute_features, _init_worker
+from midi.midi_converter import MidiConverter
+
+class RecordingModel(nn.Module):
+    """
+    Modelo que devolve a média de cada espectrograma e registra o tamanho de cada lote.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.batch_sizes = []
+
+    def forward(self, spectrograms: torch.Tensor) -> torch.Tensor:
+        self.batch_sizes.append(spectrograms.size(0))
+        return spectrograms.mean(dim=(1, 2, 3)).unsqueeze(1)
+
+class BrokenPool(concurrent.futures.ThreadPoolExecutor):
+    """
+    Executor que simula um pool de processos cujo worker morreu.
+    """
+
+    def submit(self, fn, /, *args, **kwargs):
+        raise BrokenProcessPool('worker morreu')
+
+def make_server(pool: concurrent.futures.Executor) -> InferenceServer:
+    """
+    Servidor pronto para atender, com o pool de features informado.
+    """
+    wav_controller = WavController(MidiConverter(), feature_type='mel', n_bins=32)
+    _init_worker(wav_controller)
+
+    server = InferenceServer(RecordingModel(), wav_controller, MidiConverter(), wav_controller.feature_shape(16000))
+    server._pool = pool
+    server.ready = True
+    return server
+
+async def submit_all(batcher: MicroBatcher, spectrograms, deadline: float = float('inf')):
+    """
+    Envia os espectrogramas ao mesmo tempo e espera as respostas, encerrando o batcher no final.
+    """
+    batcher.start()
+    try:
+        return await asyncio.gather(
+            *(batcher.submit(spectrogram, deadline) for spectrogram in spectrograms),
+            return_exceptions=True
+        )
+    finally:
+        await batcher.stop()
+
+def test_concurrent_requests_are_coalesced():
+    model = RecordingModel()
+    batcher = MicroBatcher(model, max_batch_size=32, max_wait_ms=200.0)
+    spectrograms = [np.full((4, 8), i, dtype=np.float32) for i in range(10)]
+
+    outputs = asyncio.run(submit_all(batcher, spectrograms))
+
+    assert model.batch_sizes == [10]
+    assert outputs == pytest.approx(list(range(10)))
+
+def test_batches_are_limited_to_max_batch_size():
+    model = RecordingModel()
+    batcher = MicroBatcher(model, max_batch_size=4, max_wait_ms=200.0)
+    spectrograms = [np.full((4, 8), i, dtype=np.float32) for i in range(10)]
+
+    outputs = asyncio.run(submit_all(batcher, spectrograms))
+
+    assert sorted(model.batch_sizes) == [2, 4, 4]
+    assert outputs == pytest.approx(list(range(10)))
+
+def test_shapes_are_batched_separately():
+    model = RecordingModel()
+    batcher = MicroBatcher(model, max_batch_size=32, max_wait_ms=200.0)
+    spectrograms = [np.ones((4, 8), dtype=np.float32)] * 3 + [np.zeros((4, 6), dtype=np.float32)] * 2
+
+    outputs = asyncio.run(submit_all(batcher, spectrograms))
+
+    assert sorted(model.batch_sizes) == [2, 3]
+    assert outputs == pytest.approx([1, 1, 1, 0, 0])
+
+def test_expired_requests_skip_the_model():
+    model = RecordingModel()
+    batcher = MicroBatcher(model, max_batch_size=32, max_wait_ms=1.0)
+    spectrograms = [np.ones((4, 8), dtype=np.float32)] * 3
+
+    outputs = asyncio.run(submit_all(batcher, spectrograms, deadline=time.perf_counter() - 1.0))
+
+    assert model.batch_sizes == []
+    assert all(isinstance(output, asyncio.TimeoutError) for output in outputs)
+
+@pytest.mark.parametrize('num_samples', [8000, 16000, 32000])
+def test_features_fit_the_model_input(num_samples):
+    wav_controller = WavController(MidiConverter(), feature_type='mel', n_bins=32)
+    n_frames = wav_controller.feature_shape(16000)[1]
+    _init_worker(wav_controller)
+
+    waveform = np.sin(np.arange(num_samples) * 0.1).astype(np.float32)
+    spectrogram = _compute_features(waveform.tobytes(), 'float32', n_frames)
+
+    assert spectrogram.shape == (32, n_frames)
+
+    expected = wav_controller.compute_spectrogram(waveform)
+    frames = min(expected.shape[1], n_frames)
+    np.testing.assert_array_equal(spectrogram[:, :frames], expected[:, :frames])
+    assert np.all(spectrogram[:, frames:] == -wav_controller.top_db)
+
+def test_invalid_audio_is_a_client_error():
+    server = make_server(concurrent.futures.ThreadPoolExecutor(max_workers=1))
+
+    with pytest.raises(HTTPError) as error:
+        asyncio.run(server.predict(b'nao e um wav', None))
+
+    assert error.value.status == HTTPStatus.BAD_REQUEST
+    assert server.ready
+
+def test_broken_pool_marks_server_not_ready():
+    server = make_server(BrokenPool(max_workers=1))
+
+    with pytest.raises(HTTPError) as error:
+        asyncio.run(server.predict(np.zeros(16000, dtype=np.float32).tobytes(), 'float32'))
+
+    assert error.value.status == HTTPStatus.SERVICE_UNAVAILABLE
+    assert not server.ready
@@ -0,0 +1,54 @@
+"""
+Testes do front end em PyTorch contra o caminho do WavController (librosa).
+"""
+
+import librosa
+import numpy as np
+import pytest
+import torch
+from controller.wav_controller import WavController
+from midi.midi_converter import MidiConverter
+from model.spectrogram_frontend import TorchSpectrogram
+
+def make_waveforms(count: int = 3, num_samples: int = 16000):
+    """
+    Senoides com ruído, de frequências diferentes.
+    """
+    rng = np.random.default_rng(0)
+    t = np.arange(num_samples) / 16000
+    return [
+        (0.5 * np.sin(2 * np.pi * (220 * (i + 1)) * t) + 0.01 * rng.standard_normal(num_samples)).astype(np.float32)
+        for i in range(count)
+    ]
+
+@pytest.mark.parametrize('feature_type', ['stft', 'mel'])
+def test_matches_wav_controller(feature_type):
+    wav_controller = WavController(MidiConverter(), feature_type=feature_type)
+    frontend = TorchSpectrogram.from_wav_controller(wav_controller)
+    waveforms = make_waveforms()
+
+    batch = frontend.batch_from_numpy(waveforms)
+
+    for waveform, spectrogram in zip(waveforms, batch):
+        expected = wav_controller.compute_spectrogram(waveform)
+        assert spectrogram.shape == (1, *expected.shape)
+        np.testing.assert_allclose(spectrogram[0].numpy(), expected, atol=1e-2)
+
+def test_matches_librosa_amplitude_to_db():
+    waveform = make_waveforms(count=1)[0]
+    frontend = TorchSpectrogram(n_fft=1024, hop_length=256, top_db=80.0)
+
+    expected = librosa.amplitude_to_db(
+        np.abs(librosa.stft(waveform, n_fft=1024, hop_length=256)),
+        ref=np.max,
+        top_db=80.0
+    )
+
+    with torch.no_grad():
+        spectrogram = frontend(torch.from_numpy(waveform))[0, 0].numpy()
+
+    np.testing.assert_allclose(spectrogram, expected, atol=1e-2)
+
+def test_rejects_cqt():
+    with pytest.raises(ValueError):
+        TorchSpectrogram.from_wav_controller(WavController(MidiConverter(), feature_type='cqt'))
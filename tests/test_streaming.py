@@ -0,0 +1,68 @@
+"""
+Testes da STFT incremental do transcritor em tempo real contra a STFT do librosa.
+"""
+
+import librosa
+import numpy as np
+import pytest
+import torch
+import torch.nn as nn
+from controller.wav_controller import WavController
+from inference.streaming import StreamingTranscriber
+from midi.midi_converter import MidiConverter
+
+class CapturingModel(nn.Module):
+    """
+    Modelo que guarda a última janela recebida e sempre prevê A4.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.window = None
+
+    def forward(self, spectrograms: torch.Tensor) -> torch.Tensor:
+        self.window = spectrograms[0, 0].clone().numpy()
+        return torch.full((spectrograms.size(0), 1), 69.0)
+
+def make_waveform(num_samples: int) -> np.ndarray:
+    """
+    Senoide com vibrato e ruído.
+    """
+    t = np.arange(num_samples) / 16000
+    noise = 0.01 * np.random.default_rng(0).standard_normal(num_samples)
+    return (0.5 * np.sin(2 * np.pi * 440 * t + 3 * np.sin(2 * np.pi * 5 * t)) + noise).astype(np.float32)
+
+def reference_window(wav_controller: WavController, waveform: np.ndarray, last_frame: int, n_frames: int) -> np.ndarray:
+    """
+    Janela equivalente calculada sobre o áudio inteiro com librosa.stft.
+    """
+    magnitude = np.abs(librosa.stft(waveform, n_fft=wav_controller.n_fft, hop_length=wav_controller.hop_length))
+    magnitude = magnitude[:, last_frame - n_frames:last_frame]
+
+    if wav_controller.feature_type == 'mel':
+        magnitude = wav_controller._mel_basis @ magnitude  # pylint: disable=protected-access
+
+    return librosa.amplitude_to_db(magnitude, ref=np.max, top_db=wav_controller.top_db)
+
+@pytest.mark.parametrize('feature_type', ['stft', 'mel'])
+@pytest.mark.parametrize('chunk_size', [160, 1000, 4096])
+def test_incremental_stft_matches_librosa(feature_type, chunk_size):
+    wav_controller = WavController(MidiConverter(), feature_type=feature_type)
+    model = CapturingModel()
+    transcriber = StreamingTranscriber(model, wav_controller, window_seconds=1.0, silence_db=None)
+    waveform = make_waveform(3 * 16000)
+
+    for start in range(0, len(waveform), chunk_size):
+        transcriber.push(waveform[start:start + chunk_size])
+
+    # Frames calculados até a última atualização do modelo
+    last_frame = transcriber._frames_seen  # pylint: disable=protected-access
+    n_frames = transcriber.input_shape[1]
+    assert model.window.shape == transcriber.input_shape
+
+    expected = reference_window(wav_controller, waveform, last_frame, n_frames)
+    np.testing.assert_allclose(model.window, expected, atol=1e-3)
+
+def test_rejects_cqt():
+    with pytest.raises(ValueError):
+        StreamingTranscriber(CapturingModel(), WavController(MidiConverter(), feature_type='cqt'))
@@ -0,0 +1,61 @@
+"""
+Testes da ingestão direta de um .tar.gz de áudios no armazenamento memory-mapped.
+"""
+
+import io
+import tarfile
+
+import numpy as np
+import soundfile as sf
+from controller.feature_extractor import FeatureExtractor
+from controller.wav_controller import WavController
+from data.memmap_dataset import MemmapSpectrogramDataset
+from data.tar_ingest import TarIngestor
+from midi.midi_converter import MidiConverter
+
+def make_archive(path: str, count: int = 3):
+    """
+    Cria um .tar.gz com áudios WAV sintéticos e retorna as amostras de cada um.
+    """
+    rng = np.random.default_rng(0)
+    waveforms = []
+
+    with tarfile.open(path, 'w:gz') as tar:
+        for i in range(count):
+            waveform = rng.uniform(-0.5, 0.5, 4000 + 1000 * i).astype(np.float32)
+            buffer = io.BytesIO()
+            sf.write(buffer, waveform, 16000, format='WAV', subtype='FLOAT')
+
+            info = tarfile.TarInfo(f'audio/keyboard_acoustic_{i:03d}-{60 + i:03d}-100.wav')
+            info.size = len(buffer.getvalue())
+            tar.addfile(info, io.BytesIO(buffer.getvalue()))
+            waveforms.append(waveform)
+
+    return waveforms
+
+def test_ingest_matches_direct_extraction(tmp_path):
+    archive = str(tmp_path / 'train.tar.gz')
+    waveforms = make_archive(archive)
+    wav_controller = WavController(MidiConverter(), feature_type='mel', n_bins=32)
+
+    storage_path = str(tmp_path / 'storage')
+    dataset = TarIngestor(FeatureExtractor(wav_controller, num_workers=1)).ingest(archive, storage_path)
+
+    assert len(dataset) == len(waveforms)
+    for (spectrogram, label), waveform, pitch in zip(dataset, waveforms, range(60, 63)):
+        np.testing.assert_allclose(spectrogram[0].numpy(), wav_controller.compute_spectrogram(waveform), atol=1e-5)
+        assert label.item() == pitch
+
+def test_storage_records_feature_params(tmp_path):
+    archive = str(tmp_path / 'train.tar.gz')
+    make_archive(archive, count=1)
+    wav_controller = WavController(MidiConverter(), feature_type='mel', n_bins=32)
+
+    storage_path = str(tmp_path / 'storage')
+    TarIngestor(FeatureExtractor(wav_controller, num_workers=1)).ingest(archive, storage_path)
+
+    assert MemmapSpectrogramDataset.is_compatible(storage_path, wav_controller.feature_params(), 'float32')
+    assert not MemmapSpectrogramDataset.is_compatible(storage_path, wav_controller.feature_params(), 'float16')
+
+    other = WavController(MidiConverter(), feature_type='mel', n_bins=64)
+    assert not MemmapSpectrogramDataset.is_compatible(storage_path, other.feature_params())
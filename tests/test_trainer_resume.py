@@ -0,0 +1,74 @@
+"""
+Testes da retomada do treinamento a partir de um checkpoint no meio de uma época.
+"""
+
+import pytest
+import torch
+import torch.nn as nn
+from torch.utils.data import TensorDataset
+from data.loader import LoaderConfig, build_data_loader
+from model.checkpoint import CheckpointManager
+from model.trainer import ModelTrainer
+
+NUM_SAMPLES = 40
+BATCH_SIZE = 4
+
+class Interrupted(Exception):
+    """
+    Simula a interrupção do treinamento.
+    """
+
+class RecordingModel(nn.Module):
+    """
+    Modelo que registra os índices das amostras de cada lote e pode interromper o treinamento.
+    """
+
+    def __init__(self, fail_at: int = -1) -> None:
+        super().__init__()
+        self.linear = nn.Linear(1, 1)
+        self.batches = []
+        self.fail_at = fail_at
+
+    def forward(self, spectrograms: torch.Tensor) -> torch.Tensor:
+        if len(self.batches) == self.fail_at:
+            raise Interrupted()
+
+        self.batches.append(spectrograms[:, 0, 0, 0].long().tolist())
+        return self.linear(spectrograms.mean(dim=(1, 2, 3)).unsqueeze(1))
+
+def make_loader(num_workers: int):
+    """
+    DataLoader em que cada espectrograma é preenchido com o próprio índice.
+    """
+    spectrograms = torch.arange(NUM_SAMPLES, dtype=torch.float32).reshape(-1, 1, 1, 1).expand(-1, 1, 2, 2)
+    dataset = TensorDataset(spectrograms.contiguous(), torch.zeros(NUM_SAMPLES))
+    config = LoaderConfig(num_workers=num_workers, persistent_workers=True, seed=7)
+    return build_data_loader(dataset, config, batch_size=BATCH_SIZE, shuffle=True)
+
+def train(model: RecordingModel, checkpoint_dir: str, num_workers: int) -> None:
+    """
+    Treina por 3 épocas, com checkpoints a cada 3 lotes.
+    """
+    checkpoints = CheckpointManager(checkpoint_dir, interval_steps=3)
+    trainer = ModelTrainer(model, num_epochs=3, learning_rate=0.01, checkpoints=checkpoints)
+
+    try:
+        trainer.train(make_loader(num_workers))
+    finally:
+        checkpoints.wait()
+
+@pytest.mark.parametrize('num_workers', [0, 2])
+def test_resume_continues_with_the_same_batches(tmp_path, num_workers):
+    reference = RecordingModel()
+    train(reference, str(tmp_path / 'reference'), num_workers)
+    assert len(reference.batches) == 3 * NUM_SAMPLES // BATCH_SIZE
+
+    # Interrompe no 6º lote da segunda época; o último checkpoint é o do 3º lote
+    interrupted = RecordingModel(fail_at=15)
+    with pytest.raises(Interrupted):
+        train(interrupted, str(tmp_path / 'resumed'), num_workers)
+
+    resumed = RecordingModel()
+    train(resumed, str(tmp_path / 'resumed'), num_workers)
+
+    assert resumed.batches == reference.batches[13:]
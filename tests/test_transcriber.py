@@ -0,0 +1,62 @@
+"""
+Testes da união das predições das janelas deslizantes em notas.
+"""
+
+import numpy as np
+import torch
+import torch.nn as nn
+from controller.wav_controller import WavController
+from inference.transcriber import NoteEvent, SlidingWindowTranscriber
+from midi.midi_converter import MidiConverter
+
+SAMPLE_RATE = 16000
+
+class ScriptedModel(nn.Module):
+    """
+    Modelo que devolve, em ordem, as notas de uma lista, uma por janela.
+    """
+
+    def __init__(self, notes) -> None:
+        super().__init__()
+        self.notes = list(notes)
+
+    def forward(self, spectrograms: torch.Tensor) -> torch.Tensor:
+        batch, self.notes = self.notes[:spectrograms.size(0)], self.notes[spectrograms.size(0):]
+        return torch.tensor(batch, dtype=torch.float32).unsqueeze(1)
+
+def make_transcriber(notes, batch_size: int = 4) -> SlidingWindowTranscriber:
+    """
+    Janelas de 1 s com passo de 0,5 s.
+    """
+    midi_converter = MidiConverter()
+    return SlidingWindowTranscriber(
+        ScriptedModel(notes),
+        WavController(midi_converter, feature_type='mel', n_bins=32),
+        sample_rate=SAMPLE_RATE,
+        window_seconds=1.0,
+        hop_seconds=0.5,
+        batch_size=batch_size
+    )
+
+def note(start: float, end: float, midi: int) -> NoteEvent:
+    """
+    NoteEvent com o nome da nota preenchido.
+    """
+    return NoteEvent(start, end, midi, MidiConverter().midi_to_note_name(midi))
+
+# 3,5 s de áudio: exatamente 6 janelas, sem janela parcial no final
+WAVEFORM = np.zeros(int(3.5 * SAMPLE_RATE), dtype=np.float32)
+NOTES = [60, 60, 60, 62, 62, 60]
+EXPECTED = [note(0.0, 1.75, 60), note(1.75, 2.75, 62), note(2.75, 3.25, 60)]
+
+def test_consecutive_windows_are_merged():
+    # Lotes de 4 janelas: a segunda nota começa em um lote e termina no seguinte
+    assert make_transcriber(NOTES).transcribe_array(WAVEFORM) == EXPECTED
+
+def test_merging_does_not_depend_on_chunking():
+    chunks = np.split(WAVEFORM, [1000, 9000, 9001, 30000])
+    assert list(make_transcriber(NOTES, batch_size=1).transcribe_stream(chunks)) == EXPECTED
+
+def test_short_audio_is_a_single_window():
+    events = make_transcriber([64]).transcribe_array(np.zeros(SAMPLE_RATE // 4, dtype=np.float32))
+    assert events == [note(0.0, 0.75, 64)]
@@ -0,0 +1,53 @@
+"""
+Testes dos espectrogramas mel e CQT do WavController.
+"""
+
+import librosa
+import numpy as np
+import pytest
+from controller.wav_controller import WavController
+from midi.midi_converter import MidiConverter
+
+def make_waveform(num_samples: int) -> np.ndarray:
+    """
+    Soma de duas senoides (A4 e E5) com ruído.
+    """
+    t = np.arange(num_samples) / 16000
+    noise = 0.01 * np.random.default_rng(0).standard_normal(num_samples)
+    return (0.4 * np.sin(2 * np.pi * 440 * t) + 0.2 * np.sin(2 * np.pi * 659.26 * t) + noise).astype(np.float32)
+
+@pytest.mark.parametrize('feature_type, n_bins', [('stft', None), ('mel', None), ('mel', 64), ('cqt', None), ('cqt', 60)])
+@pytest.mark.parametrize('num_samples', [8000, 16000, 16000 + 511])
+def test_shape_matches_feature_shape(feature_type, n_bins, num_samples):
+    wav_controller = WavController(MidiConverter(), feature_type=feature_type, n_bins=n_bins)
+    spectrogram = wav_controller.compute_spectrogram(make_waveform(num_samples))
+
+    assert spectrogram.shape == wav_controller.feature_shape(num_samples)
+    assert spectrogram.dtype == np.float32
+
+@pytest.mark.parametrize('feature_type', ['mel', 'cqt'])
+def test_float16_features(feature_type):
+    wav_controller = WavController(MidiConverter(), feature_type=feature_type, dtype='float16')
+    spectrogram = wav_controller.compute_spectrogram(make_waveform(16000))
+
+    assert spectrogram.dtype == np.float16
+    assert spectrogram.shape == wav_controller.feature_shape(16000)
+
+def test_mel_matches_librosa():
+    wav_controller = WavController(MidiConverter(), feature_type='mel', n_bins=64)
+    waveform = make_waveform(16000)
+
+    expected = librosa.amplitude_to_db(
+        librosa.feature.melspectrogram(y=waveform, sr=16000, n_fft=2048, hop_length=512, n_mels=64, power=1.0),
+        ref=np.max,
+        top_db=80.0
+    )
+
+    np.testing.assert_allclose(wav_controller.compute_spectrogram(waveform), expected, atol=1e-3)
+
+def test_cqt_peak_is_on_the_note():
+    wav_controller = WavController(MidiConverter(), feature_type='cqt')
+    spectrogram = wav_controller.compute_spectrogram(make_waveform(16000))
+
+    # A primeira faixa é a nota mais grave do piano (A0, MIDI 21); A4 (MIDI 69) fica 48 faixas acima
+    assert np.argmax(spectrogram.mean(axis=1)) == 69 - 21